@@ -1,15 +1,21 @@
-from continuum_deployer.utils.plugin_loader import PluginLoader
-
 app_version = "v1.0.0"
 
-global plugins
-
 
 def init_plugins():
+    """(Re)creates the plugin loader and triggers the plugin discovery.
+    This is done on first access of `continuum_deployer.plugins`,
+    so importing the package stays cheap.
+    """
     global plugins
+    from continuum_deployer.utils.plugin_loader import PluginLoader
     pl = PluginLoader()
     pl.load_plugins()
     plugins = pl
 
 
-init_plugins()
+def __getattr__(name):
+    if name == 'plugins':
+        init_plugins()
+        return plugins
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
@@ -1,33 +1,76 @@
 # pylint: disable=no-member
 
+import sys
+
 import click
 
 import continuum_deployer
-from continuum_deployer import plugins as plugins_loader
 from continuum_deployer.dsl.importer.importer import Importer
-from continuum_deployer.dsl.importer.helm import Helm
-from continuum_deployer.resources.resources import Resources
-from continuum_deployer.utils.match_cli import MatchCli
+from continuum_deployer.utils.batch_cli import BatchCli
 from continuum_deployer.utils.ui import UI
 
 
 _HELPTEXT_TYPE = 'Type of helm definition'
 _HELPTEXT_TYPEDSL = 'Type of DSL definition'
 _HELPTEXT_DSL = 'Path to Helm definition'
+_HELPTEXT_DSLMULTIPLE = 'Path to Helm definition, chart or directory of charts, can be repeated'
 _HELPTEXT_RESOURCES = 'Path to resources file'
 _HELPTEXT_OUTPUT = 'Path to output file'
 _HELPTEXT_PLUGINS = 'Additional plugins directory path'
 _HELPTEXT_SOLVER = 'Type of solver'
 _HELPTEXT_SOLVERMODE = 'Mode (target) of solver'
+_HELPTEXT_SOLVERCONFIG = 'Solver setting as name=value, can be repeated'
+_HELPTEXT_IMPORTERCONFIG = 'Importer setting as name=value, can be repeated'
+_HELPTEXT_FORMAT = 'Output format of the results'
+_HELPTEXT_EXPORTER = 'Exporter used for manifest output'
+_HELPTEXT_SOLVEOUTPUT = 'Path to output file, defaults to stdout'
+_HELPTEXT_METRICS = 'Path to write stage timers and counters to'
+_HELPTEXT_METRICSFORMAT = 'Format of the metrics file'
+_HELPTEXT_INVENTORY = 'Resource inventory as name=path (or path for the default inventory), can be repeated'
+_HELPTEXT_HOST = 'Host to listen on'
+_HELPTEXT_PORT = 'Port to listen on'
+_HELPTEXT_SOCKET = 'Path of an Unix domain socket to listen on instead of host and port'
+_HELPTEXT_DSLROOT = 'Directory that deployment paths of requests are resolved in, path requests are rejected if not set'
+_HELPTEXT_PROFILE = 'Directory to write cProfile and tracemalloc reports of the command to'
+
+
+def _deployment_paths(deployment):
+    """Helper that passes a single deployment path on as str and multiple paths as list
+
+    :param deployment: values of the repeatable deployment option
+    :type deployment: tuple
+    :return: None, a single path or a list of paths
+    :rtype: str or list
+    """
+    if not deployment:
+        return None
+    if len(deployment) == 1:
+        return deployment[0]
+    return list(deployment)
 
 
 @click.group()
-def cli():
+@click.option('--profile', 'profile_dir', default=None, help=_HELPTEXT_PROFILE)
+@click.pass_context
+def cli(ctx, profile_dir):
     """
     Prototypical Continuum Computing Deployer\n
     Authors: Daniel Hass
     """
-    pass
+    if profile_dir is None:
+        return
+
+    from continuum_deployer.utils.profiling import Profiler
+
+    profiler = Profiler(profile_dir)
+
+    def _write_reports():
+        for path in profiler.stop():
+            click.echo('Profile written to {}'.format(path), err=True)
+
+    # called when the command returns, exits or fails
+    ctx.call_on_close(_write_reports)
+    profiler.start()
 
 
 @cli.command()
@@ -35,6 +78,7 @@ def cli():
 @click.option('-t', '--type', type=click.Choice(['yaml', 'chart']), default='yaml', help=_HELPTEXT_TYPE)
 def parse_helm(path, type):
     """Parses helm deployment definitions and prints result"""
+    from continuum_deployer.dsl.importer.helm import Helm
 
     helm = Helm()
     config = helm.get_config()
@@ -59,6 +103,7 @@ def parse_helm(path, type):
 @click.option('-f', '--file', required=True, help=_HELPTEXT_RESOURCES)
 def parse_resources(file):
     """Parses resources YAML and prints result"""
+    from continuum_deployer.resources.resources import Resources
 
     stream = open(file, 'r')
     resources = Resources()
@@ -68,24 +113,93 @@ def parse_resources(file):
 
 @cli.command()
 @click.option('-r', '--resources', required=False, default=None, help=_HELPTEXT_RESOURCES)
-@click.option('-d', '--deployment', required=False, default=None, help=_HELPTEXT_DSL)
+@click.option('-d', '--deployment', required=False, multiple=True, help=_HELPTEXT_DSLMULTIPLE)
 @click.option('-T', '--dsltype', type=click.Choice(Importer.DSL_TYPES), default=None, show_default=True, help=_HELPTEXT_TYPEDSL)
 @click.option('-t', '--type', type=click.Choice(['yaml', 'chart']), default=None, help=_HELPTEXT_TYPE)
 @click.option('-p', '--plugins', type=str, default=None, show_default=True, help=_HELPTEXT_PLUGINS)
-@click.option('-s', '--solver', type=click.Choice(['0', '1']), default=None, help=_HELPTEXT_SOLVER)
-@click.option('-m', '--solver-mode', type=click.Choice(['0', '1', '2', '3', '4', '5']), default=None, help=_HELPTEXT_SOLVERMODE)
+@click.option('-s', '--solver', type=click.Choice(['0', '1', '2']), default=None, help=_HELPTEXT_SOLVER)
+@click.option('-m', '--solver-mode', type=click.Choice(['0', '1', '2', '3', '4', '5', '6']), default=None, help=_HELPTEXT_SOLVERMODE)
 def match(resources, deployment, dsltype, type, plugins, solver, solver_mode):
     """Match deployments interactively"""
+    from continuum_deployer.utils.match_cli import MatchCli
 
     # FIXME: -t and -s should be linked to what plugins provide
     if plugins != None:
-        plugins_loader.add_plugins_path(plugins)
-        plugins_loader.load_plugins()
+        continuum_deployer.plugins.add_plugins_path(plugins)
+        continuum_deployer.plugins.load_plugins()
 
-    match_cli = MatchCli(resources, deployment, dsltype, type, solver, solver_mode)
+    match_cli = MatchCli(resources, _deployment_paths(deployment), dsltype, type, solver, solver_mode)
     match_cli.start()
 
 
+@cli.command()
+@click.option('-r', '--resources', required=True, help=_HELPTEXT_RESOURCES)
+@click.option('-d', '--deployment', required=True, multiple=True, help=_HELPTEXT_DSLMULTIPLE)
+@click.option('-T', '--dsltype', type=click.Choice(Importer.DSL_TYPES), default='helm', show_default=True, help=_HELPTEXT_TYPEDSL)
+@click.option('-t', '--type', type=click.Choice(['yaml', 'chart']), default=None, help=_HELPTEXT_TYPE)
+@click.option('-p', '--plugins', type=str, default=None, show_default=True, help=_HELPTEXT_PLUGINS)
+@click.option('-s', '--solver', type=click.IntRange(0), default=0, show_default=True, help=_HELPTEXT_SOLVER)
+@click.option('-m', '--solver-mode', type=click.Choice(['0', '1', '2', '3', '4', '5', '6']), default=None, help=_HELPTEXT_SOLVERMODE)
+@click.option('-c', '--config', 'solver_config', multiple=True, help=_HELPTEXT_SOLVERCONFIG)
+@click.option('-C', '--importer-config', multiple=True, help=_HELPTEXT_IMPORTERCONFIG)
+@click.option('-f', '--format', 'output_format', type=click.Choice(BatchCli.OUTPUT_FORMATS), default='json', show_default=True, help=_HELPTEXT_FORMAT)
+@click.option('-e', '--exporter', type=str, default='kubernetes', show_default=True, help=_HELPTEXT_EXPORTER)
+@click.option('-o', '--output', default=None, help=_HELPTEXT_SOLVEOUTPUT)
+@click.option('--metrics', 'metrics_path', default=None, help=_HELPTEXT_METRICS)
+@click.option('--metrics-format', type=click.Choice(['json', 'prometheus']), default='json', show_default=True, help=_HELPTEXT_METRICSFORMAT)
+def solve(resources, deployment, dsltype, type, plugins, solver, solver_mode, solver_config,
+          importer_config, output_format, exporter, output, metrics_path, metrics_format):
+    """Match deployments non-interactively"""
+
+    if plugins != None:
+        continuum_deployer.plugins.add_plugins_path(plugins)
+        continuum_deployer.plugins.load_plugins()
+
+    batch_cli = BatchCli(resources, _deployment_paths(deployment), dsltype, type, solver, solver_mode,
+                         solver_options=solver_config, importer_options=importer_config,
+                         output_format=output_format, output_path=output, exporter_type=exporter,
+                         metrics_path=metrics_path, metrics_format=metrics_format)
+    sys.exit(batch_cli.run())
+
+
+@cli.command()
+@click.option('-r', '--resources', multiple=True, help=_HELPTEXT_INVENTORY)
+@click.option('-p', '--plugins', type=str, default=None, show_default=True, help=_HELPTEXT_PLUGINS)
+@click.option('-H', '--host', type=str, default='127.0.0.1', show_default=True, help=_HELPTEXT_HOST)
+@click.option('-P', '--port', type=int, default=8080, show_default=True, help=_HELPTEXT_PORT)
+@click.option('-S', '--socket', 'socket_path', type=str, default=None, help=_HELPTEXT_SOCKET)
+@click.option('-D', '--dsl-root', type=click.Path(exists=True, file_okay=False), default=None, help=_HELPTEXT_DSLROOT)
+def serve(resources, plugins, host, port, socket_path, dsl_root):
+    """Run a long-running placement service"""
+    from continuum_deployer.utils.placement_service import PlacementService
+    from continuum_deployer.utils.file_handling import FileHandling
+
+    if plugins != None:
+        continuum_deployer.plugins.add_plugins_path(plugins)
+        continuum_deployer.plugins.load_plugins()
+
+    # warm up plugin discovery and the solver imports before serving
+    BatchCli.get_importers()
+    BatchCli.get_solvers()
+    BatchCli.get_exporters()
+
+    service = PlacementService(dsl_root)
+    for inventory in resources:
+        _name, _, _path = inventory.rpartition('=')
+        service.add_inventory(_name or 'default',
+                              FileHandling.get_file_content(_path))
+
+    server = service.create_server(host, port, socket_path)
+    click.echo('Serving placement requests on {}'.format(
+        socket_path or '{}:{}'.format(host, port)), err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 @cli.command()
 def version():
     """Prints version information"""
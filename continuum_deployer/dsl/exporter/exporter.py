@@ -2,6 +2,8 @@ import yaml
 
 from yapsy.IPlugin import IPlugin
 
+from continuum_deployer.utils.instrumentation import Instrumentation
+
 
 class Exporter(IPlugin):
     """Exports a set of matched resources to a deployable DSL"""
@@ -9,6 +11,8 @@ class Exporter(IPlugin):
     def __init__(self, stdout=False, output_stream=None):
         self.stdout = stdout
         self.output_stream = output_stream
+        # stage timers and counters of the export runs
+        self.instrumentation = Instrumentation()
 
     def export(self, matched_resources):
         """Exports matched resources to target format
@@ -17,3 +21,19 @@ class Exporter(IPlugin):
         :type matched_resources: list
         """
         raise NotImplementedError
+
+    def get_instrumentation(self):
+        """Getter for the stage timers and counters of the exporter
+
+        :return: instrumentation of the exporter
+        :rtype: :class:`continuum_deployer.utils.instrumentation.Instrumentation`
+        """
+        return self.instrumentation
+
+    def set_instrumentation(self, instrumentation):
+        """Setter for the instrumentation, e.g. to share one instance with the solver
+
+        :param instrumentation: instrumentation to record to
+        :type instrumentation: :class:`continuum_deployer.utils.instrumentation.Instrumentation`
+        """
+        self.instrumentation = instrumentation
@@ -1,30 +1,46 @@
-import yaml
-
 from continuum_deployer.dsl.exporter.exporter import Exporter
 from continuum_deployer.resources.deployment import DeploymentEntity
 from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.utils.yaml_handling import YamlHandling
 
 
 class Kubernetes(Exporter):
 
     @staticmethod
-    def _add_hostname_label(hostname, deployment: DeploymentEntity):
-        """Adds Kubernetes hostname label to deployments
+    def _add_hostname_label(hostname, deployment: DeploymentEntity, definition=None):
+        """Adds Kubernetes hostname label to deployments. The yaml definition of
+        the deployment is left untouched as it might be shared between replicas,
+        only the altered parts of the manifest are copied. Replicas are exported
+        as single instance with the name of the replica.
 
         :param hostname: node hostname, content of added label
         :type hostname: str
         :param deployment: deployment objects to add hostname label to
         :type deployment: :class:`continuum_deployer.resources.deployment.DeploymentEntity`
-        :return: deployment object with added labels
-        :rtype: :class:`continuum_deployer.resources.deployment.DeploymentEntity`
+        :param definition: already loaded yaml definition of the deployment, defaults to
+            :meth:`continuum_deployer.resources.deployment.DeploymentEntity.get_yaml`
+        :type definition: dict, optional
+        :return: manifest of the deployment with added labels
+        :rtype: dict
         """
 
         KUBE_HOSTNAME_LABEL_KEY = 'kubernetes.io/hostname'
-        result = deployment.yaml
-        result.get('spec').get('template').get('spec')['nodeSelector'] = {
+        if definition is None:
+            definition = deployment.get_yaml()
+        result = dict(definition)
+        result['spec'] = dict(result.get('spec'))
+        result['spec']['template'] = dict(result['spec'].get('template'))
+        result['spec']['template']['spec'] = dict(
+            result['spec']['template'].get('spec'))
+        result['spec']['template']['spec']['nodeSelector'] = {
             KUBE_HOSTNAME_LABEL_KEY: hostname}
-        deployment.yaml = result
-        return deployment
+
+        if deployment.replica is not None:
+            result['metadata'] = dict(result.get('metadata'))
+            result['metadata']['name'] = deployment.name
+            result['spec']['replicas'] = 1
+
+        return result
 
     def _output(self, content):
         """Helper method that exports content to different output targets
@@ -52,8 +68,33 @@ class Kubernetes(Exporter):
         Args:
             matched_resources (Resources): Array of matched resources to extract
         """
-        for resource in matched_resources:
-            for deployment in resource.get_deployments():
-                deployment = Kubernetes._add_hostname_label(
-                    resource.name, deployment)
-                self._output(yaml.dump(deployment.yaml))
+        _exported = 0
+        with self.instrumentation.timer('export'):
+            # replicas of streamed deployments share their source document, it is
+            # loaded once and kept until the last replica of it was exported
+            _pending = dict()
+            for resource in matched_resources:
+                for deployment in resource.get_deployments():
+                    if deployment.yaml is None and deployment.source is not None:
+                        _key = id(deployment.source)
+                        _pending[_key] = _pending.get(_key, 0) + 1
+            _definitions = dict()
+
+            for resource in matched_resources:
+                for deployment in resource.get_deployments():
+                    _definition = None
+                    if deployment.yaml is None and deployment.source is not None:
+                        _key = id(deployment.source)
+                        _definition = _definitions.get(_key)
+                        if _definition is None:
+                            _definition = deployment.source.load()
+                        _pending[_key] -= 1
+                        if _pending[_key] > 0:
+                            _definitions[_key] = _definition
+                        else:
+                            _definitions.pop(_key, None)
+                    manifest = Kubernetes._add_hostname_label(
+                        resource.name, deployment, _definition)
+                    self._output(YamlHandling.dump(manifest))
+                    _exported += 1
+        self.instrumentation.count('exported_deployments', _exported)
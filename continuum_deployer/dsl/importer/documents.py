@@ -0,0 +1,91 @@
+import io
+import zlib
+
+from continuum_deployer.utils.yaml_handling import YamlHandling
+
+
+class DocumentReference:
+    """Compact reference to a single YAML document of a DSL source.
+    Documents of seekable files are referenced by their byte range, documents
+    read from pipes are kept as compressed bytes.
+    """
+
+    __slots__ = ['path', 'offset', 'length', 'data']
+
+    def __init__(self, path=None, offset=0, length=0, data=None):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.data = data
+
+    def read(self):
+        """Reads the plain text of the referenced document
+
+        :return: YAML document as plain str
+        :rtype: str
+        """
+        if self.data is not None:
+            return zlib.decompress(self.data).decode('utf-8')
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            return file.read(self.length).decode('utf-8')
+
+    def load(self):
+        """Loads the referenced document
+
+        :return: parsed YAML document
+        :rtype: dict
+        """
+        return YamlHandling.load(self.read())
+
+
+def _is_document_start(line):
+    """Helper that checks if a line starts a new YAML document
+
+    :param line: line to check
+    :type line: bytes
+    :return: check result
+    :rtype: bool
+    """
+    return line.startswith(b'---') and (len(line) == 3 or line[3:4] in b' \t\r\n')
+
+
+def iter_documents(stream):
+    """Reads a multi-document YAML stream document by document without
+    holding more than the current document in memory.
+
+    :param stream: text or binary stream to read, e.g. a file or pipe
+    :type stream: io.IOBase
+    :return: generator of tuples with plain document text and a reference to the document
+    :rtype: generator
+    """
+    _path = getattr(stream, 'name', None)
+    _by_offset = isinstance(_path, str) and stream.seekable() and \
+        not isinstance(stream, io.TextIOBase)
+
+    _offset = 0
+    _start = 0
+    _lines = []
+
+    def _document():
+        _data = b''.join(_lines)
+        if _by_offset:
+            _reference = DocumentReference(
+                path=_path, offset=_start, length=len(_data))
+        else:
+            _reference = DocumentReference(data=zlib.compress(_data))
+        return _data.decode('utf-8'), _reference
+
+    for line in stream:
+        if isinstance(line, str):
+            line = line.encode('utf-8')
+        if _is_document_start(line) and _lines:
+            yield _document()
+            _lines = []
+            _start = _offset
+        _lines.append(line)
+        _offset += len(line)
+
+    if _lines:
+        yield _document()
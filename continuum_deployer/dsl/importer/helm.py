@@ -1,19 +1,23 @@
+import io
 import os
+import sys
 import copy
-import yaml
 import json
 import click
 import tempfile
 import shutil
 import subprocess
 import filetype
+from concurrent.futures import ThreadPoolExecutor
 from bitmath import KiB, MiB, GiB, TiB, PiB, EiB, kB, MB, GB, TB, PB, EB
 from progress.spinner import Spinner
 
+from continuum_deployer.dsl.importer.documents import iter_documents
 from continuum_deployer.dsl.importer.importer import Importer
 from continuum_deployer.resources.deployment import DeploymentEntity
 from continuum_deployer.utils.config import Config, Setting, SettingValue
 from continuum_deployer.utils.file_handling import FileHandling
+from continuum_deployer.utils.yaml_handling import YamlHandling
 from continuum_deployer.utils.exceptions import RequirementsError, FileTypeNotSupported, ImporterError
 
 
@@ -22,6 +26,7 @@ class Helm(Importer):
     K8S_OBJECTS = ['Deployment', 'ReplicaSet',
                    'StatefulSet', 'DaemonSet', 'Jobs', 'CronJob']
     K8S_SCALE_CONTROLLER = ['Deployment', 'ReplicaSet', 'StatefulSet']
+    CHART_ARCHIVE_SUFFIXES = ('.tgz', '.tar.gz')
 
     @staticmethod
     def parse_k8s_cpu_value(cpu_value):
@@ -130,9 +135,50 @@ class Helm(Importer):
                     'chart', description='Takes a local helm chart or archive as input'),
                 SettingValue(
                     'yaml', 'Reads an already templated YAML file', default=True),
+            ]),
+            Setting('parse_mode', [
+                SettingValue(
+                    'full', description='Reads the whole DSL into memory before parsing', default=True),
+                SettingValue(
+                    'streaming', description='Parses the DSL document by document, keeps only references to the documents'),
+            ]),
+            Setting('render_workers', [
+                SettingValue(
+                    1, description='Renders multiple charts one after another'),
+                SettingValue(
+                    4, description='Renders up to 4 charts concurrently', default=True),
+                SettingValue(
+                    8, description='Renders up to 8 charts concurrently'),
+                SettingValue(
+                    16, description='Renders up to 16 charts concurrently'),
             ])
         ])
 
+    @staticmethod
+    def get_chart_paths(helm_path):
+        """Resolves a path to the Helm charts it contains. A directory without a
+        Chart.yaml is treated as collection of charts, its chart directories and
+        chart archives are returned in name order.
+
+        :param helm_path: filesystem path to a chart, chart archive or directory of charts
+        :type helm_path: str
+        :raises ImporterError: raised if a directory of charts contains no chart
+        :return: list of chart paths
+        :rtype: list
+        """
+        if not os.path.isdir(helm_path) or os.path.isfile(os.path.join(helm_path, 'Chart.yaml')):
+            return [helm_path]
+
+        _charts = []
+        for name in sorted(os.listdir(helm_path)):
+            _path = os.path.join(helm_path, name)
+            if os.path.isfile(os.path.join(_path, 'Chart.yaml')) or \
+                    (os.path.isfile(_path) and name.endswith(Helm.CHART_ARCHIVE_SUFFIXES)):
+                _charts.append(_path)
+        if not _charts:
+            raise ImporterError('No Helm charts found in {}'.format(helm_path))
+        return _charts
+
     def template_chart_archive(self, helm_path):
         """Templates given Helm chart to YAML
 
@@ -166,14 +212,73 @@ class Helm(Importer):
 
         return _templated_yaml.stdout
 
+    def template_charts(self, helm_paths):
+        """Templates multiple Helm charts concurrently with a bounded number of
+        helm processes, see the render_workers setting
+
+        :param helm_paths: filesystem paths to the helm charts or archives
+        :type helm_paths: list
+        :raises ImporterError: raised if helm template failed for one of the charts
+        :return: templated yaml definitions in the order of the given paths
+        :rtype: list
+        """
+
+        _workers = min(self.config.get_setting(
+            'render_workers').get_value().value, len(helm_paths))
+        # the threads only wait for the helm processes
+        with ThreadPoolExecutor(max_workers=_workers) as executor:
+            _futures = [executor.submit(self.template_chart_archive, path)
+                        for path in helm_paths]
+            try:
+                _contents = []
+                for path, future in zip(helm_paths, _futures):
+                    try:
+                        _contents.append(future.result())
+                    except ImporterError as e:
+                        raise ImporterError('{}: {}'.format(path, e.message))
+                return _contents
+            except BaseException:
+                # charts that are not rendered yet are skipped on errors
+                for future in _futures:
+                    future.cancel()
+                raise
+
+    def stream_chart_archive(self, helm_path):
+        """Templates given Helm chart to YAML and streams the output
+
+        :param helm_path: filesystem path to the helm chart or archive
+        :type helm_path: str
+        :raises FileTypeNotSupported: raised if filetype found at path not supported
+        :return: binary stream of the templated yaml definition
+        :rtype: io.BufferedReader
+        """
+
+        if os.path.isfile(helm_path):
+            _file_type = filetype.guess(helm_path)
+            if _file_type is None:
+                raise FileTypeNotSupported("File type is not supported")
+            elif _file_type.MIME != 'application/gzip':
+                raise FileTypeNotSupported(
+                    "File type {} is not supported".format(_file_type.MIME))
+
+        _helm = shutil.which("helm")
+        _command = [
+            _helm,
+            'template',
+            helm_path
+        ]
+        return io.BufferedReader(HelmTemplateStream(_command))
+
     def get_dsl_content(self, dsl_path, helmtype):
-        """Read content from different Helm input types
+        """Read content from different Helm input types. Multiple paths and
+        directories of charts are read into a list of contents, multiple charts are
+        rendered concurrently.
 
-        :param dsl_path: filesystem path to the Helm resource
-        :type dsl_path: str
+        :param dsl_path: filesystem path or list of paths to the Helm resources
+        :type dsl_path: str or list
         :raises NotImplementedError: raised if current config is not supported
-        :return: content of given DSL resource
-        :rtype: str
+        :return: content of given DSL resource, list of contents for multiple resources
+        :rtype: str or list
         """
 
         if not helmtype:
@@ -181,6 +286,30 @@ class Helm(Importer):
                 'chart_origin').get_value().value
         else:
             _chart_origin = helmtype
+
+        _paths = list(dsl_path) if isinstance(dsl_path, (list, tuple)) else [dsl_path]
+        if _chart_origin == 'chart':
+            _paths = [c for path in _paths for c in Helm.get_chart_paths(path)]
+            if len(_paths) > 1:
+                with self.instrumentation.timer('render'):
+                    _contents = self.template_charts(_paths)
+                self.instrumentation.count('rendered_charts', len(_paths))
+                return _contents
+        elif len(_paths) > 1:
+            return [self.get_dsl_content(path, _chart_origin) for path in _paths]
+        dsl_path = _paths[0]
+
+        if self.config.get_setting('parse_mode').get_value().value == 'streaming':
+            # streaming mode hands over streams instead of the whole content
+            if _chart_origin == 'yaml':
+                if dsl_path == '-':
+                    return sys.stdin.buffer
+                return open(dsl_path, 'rb')
+            elif _chart_origin == 'chart':
+                return self.stream_chart_archive(dsl_path)
+            else:
+                raise NotImplementedError
+
         if _chart_origin == 'yaml':
             return FileHandling.get_file_content(dsl_path)
         elif _chart_origin == 'chart':
@@ -191,86 +320,166 @@ class Helm(Importer):
     def parse(self, dsl_input):
         """Does the actual parsing of the provided DSL input
 
-        :param dsl_input: already parsed plain DSL input
-        :type dsl_input: str
+        :param dsl_input: already parsed plain DSL input, or a list of inputs
+            that are parsed in order
+        :type dsl_input: str or list
         """
 
-        # see default loader deprecation
-        # https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
-        docs = yaml.load_all(dsl_input, Loader=yaml.SafeLoader)
+        _modules = len(self.app_modules)
+        _inputs = dsl_input if isinstance(dsl_input, list) else [dsl_input]
+        with self.instrumentation.timer('import'):
+            for _input in _inputs:
+                if self.config.get_setting('parse_mode').get_value().value == 'streaming':
+                    self.parse_stream(_input)
+                else:
+                    docs = YamlHandling.load_all(_input)
+
+                    spinner = Spinner('Parsing DSL ')
+
+                    for doc in docs:
+
+                        spinner.next()
+
+                        self._parse_document(doc)
+        self.instrumentation.count(
+            'imported_deployments', len(self.app_modules) - _modules)
+
+    def parse_stream(self, dsl_input):
+        """Parses the provided DSL input document by document. Only the fields
+        necessary for solving and a reference to the source document are kept.
+
+        :param dsl_input: DSL input as stream (e.g. file or pipe) or plain str
+        :type dsl_input: io.IOBase or str
+        """
+
+        if isinstance(dsl_input, str):
+            dsl_input = io.StringIO(dsl_input)
 
         spinner = Spinner('Parsing DSL ')
 
-        for doc in docs:
+        try:
+            for text, reference in iter_documents(dsl_input):
+
+                spinner.next()
 
-            spinner.next()
+                self._parse_document(YamlHandling.load(text), reference)
+        finally:
+            if dsl_input is not sys.stdin.buffer:
+                dsl_input.close()
 
-            if doc is None:
-                continue
-            if doc['kind'] in self.K8S_OBJECTS:
+    def _parse_document(self, doc, source=None):
+        """Parses a single YAML document and adds the extracted deployments
 
-                deployment = DeploymentEntity()
+        :param doc: parsed YAML document
+        :type doc: dict
+        :param source: reference to the source document, if given the document itself is not kept
+        :type source: :class:`continuum_deployer.dsl.importer.documents.DocumentReference`, optional
+        """
+
+        if doc is None:
+            return
+        if doc['kind'] in self.K8S_OBJECTS:
+
+            deployment = DeploymentEntity()
+            if source is not None:
+                # keep reference only, document is loaded again on export
+                deployment.source = source
+            else:
                 # save YAML doc representation
                 deployment.yaml = doc
-                _name = doc.get('metadata', None).get('name', None)
-                if _name != None:
-                    deployment.name = _name
+            _name = (doc.get('metadata', None) or {}).get('name', None)
+            if _name != None:
+                deployment.name = _name
+            else:
+                # https://kubernetes.io/docs/concepts/overview/working-with-objects/names/
+                raise ImporterError('No name provided in object metadata of {} object'.format(
+                    doc['kind']))
+
+            _labels = doc['spec']['template']['spec'].get(
+                'nodeSelector', None)
+            if _labels is not None:
+                deployment.labels = _labels
+
+            for container in doc['spec']['template']['spec']['containers']:
+                if 'resources' in container:
+                    if container['resources'] is not None:
+                        _request = container.get(
+                            'resources', None).get('requests', None)
+                        if _request != None:
+                            deployment.memory = Helm.parse_k8s_memory_value(
+                                _request.get('memory', 0))
+                            deployment.cpu = Helm.parse_k8s_cpu_value(
+                                _request.get('cpu', 0))
+                        else:
+                            click.echo(click.style(
+                                ('\n[Warning] No resource request provided for module {}. This can result '
+                                 'in suboptimal deployment placement.').format(_name), fg='yellow'), err=True)
+
+                        _limits = container.get(
+                            'resources', None).get('limits', None)
+                        if _limits != None and _limits != {}:
+                            deployment.memory_limit = Helm.parse_k8s_memory_value(
+                                _limits.get('memory', 0))
+                            deployment.cpu_limit = Helm.parse_k8s_cpu_value(
+                                _limits.get('cpu', 0))
+                        else:
+                            # as this is not an hard error just pass
+                            pass
                 else:
-                    # https://kubernetes.io/docs/concepts/overview/working-with-objects/names/
                     click.echo(click.style(
-                        '[Error] No name provided in object metadata', fg='red'), err=True)
-                    exit(1)
-
-                _labels = doc['spec']['template']['spec'].get(
-                    'nodeSelector', None)
-                if _labels is not None:
-                    deployment.labels = _labels
-
-                for container in doc['spec']['template']['spec']['containers']:
-                    if 'resources' in container:
-                        if container['resources'] is not None:
-                            _request = container.get(
-                                'resources', None).get('requests', None)
-                            if _request != None:
-                                deployment.memory = Helm.parse_k8s_memory_value(
-                                    _request.get('memory', 0))
-                                deployment.cpu = Helm.parse_k8s_cpu_value(
-                                    _request.get('cpu', 0))
-                            else:
-                                click.echo(click.style(
-                                    ('\n[Warning] No resource request provided for module {}. This can result '
-                                     'in suboptimal deployment placement.').format(_name), fg='yellow'))
-
-                            _limits = container.get(
-                                'resources', None).get('limits', None)
-                            if _limits != None and _limits != {}:
-                                deployment.memory_limit = Helm.parse_k8s_memory_value(
-                                    _limits.get('memory', 0))
-                                deployment.cpu_limit = Helm.parse_k8s_cpu_value(
-                                    _limits.get('cpu', 0))
-                            else:
-                                # as this is not an hard error just pass
-                                pass
-                    else:
-                        click.echo(click.style(
-                            ('\n[Warning] No resource request provided for module {}. This can result '
-                             'in suboptimal deployment placement.').format(_name), fg='yellow'))
-
-                # check if we have a scalable controller
-                if doc['kind'] in Helm.K8S_SCALE_CONTROLLER:
-                    _number_replicas = doc['spec'].get('replicas', 1)
-
-                    # check if we need to scale higher than 1
-                    # case 'is None': empty replicas field in yaml
-                    if _number_replicas == 1 or _number_replicas is None:
-                        self.app_modules.append(deployment)
-                    else:
-                        _deployment_name = deployment.name
-                        for i in range(_number_replicas):
-                            # extent deployment name with replica number
-                            deployment.name = '{}-{}'.format(
-                                _deployment_name, i)
-                            # we need deepcopy to create new objects here in order to call append multiple times
-                            self.app_modules.append(copy.deepcopy(deployment))
-                else:
+                        ('\n[Warning] No resource request provided for module {}. This can result '
+                         'in suboptimal deployment placement.').format(_name), fg='yellow'), err=True)
+
+            # check if we have a scalable controller
+            if doc['kind'] in Helm.K8S_SCALE_CONTROLLER:
+                _number_replicas = doc['spec'].get('replicas', 1)
+
+                # check if we need to scale higher than 1
+                # case 'is None': empty replicas field in yaml
+                if _number_replicas == 1 or _number_replicas is None:
                     self.app_modules.append(deployment)
+                else:
+                    for i in range(_number_replicas):
+                        # replicas share the yaml definition as template,
+                        # the per replica manifest is created on export
+                        _replica = copy.copy(deployment)
+                        # extent deployment name with replica number
+                        _replica.name = '{}-{}'.format(deployment.name, i)
+                        _replica.replica = i
+                        self.app_modules.append(_replica)
+            else:
+                self.app_modules.append(deployment)
+
+
+class HelmTemplateStream(io.RawIOBase):
+    """Binary stream of the output of a running helm template process
+
+    :raises ImporterError: raised on end of stream if helm template had an error
+    """
+
+    def __init__(self, command):
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=self._stderr)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        _data = self._process.stdout.read1(len(buffer))
+        if not _data:
+            self._check_returncode()
+        buffer[:len(_data)] = _data
+        return len(_data)
+
+    def _check_returncode(self):
+        if self._process.wait() != 0:
+            self._stderr.seek(0)
+            raise ImporterError(self._stderr.read().decode('utf-8'))
+
+    def close(self):
+        if not self.closed:
+            self._process.stdout.close()
+            self._process.wait()
+            self._stderr.close()
+        super().close()
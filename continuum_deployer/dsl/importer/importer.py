@@ -4,6 +4,7 @@ from yapsy.IPlugin import IPlugin
 
 from continuum_deployer.resources.deployment import DeploymentEntity
 from continuum_deployer.utils.config import Config, Setting, SettingValue
+from continuum_deployer.utils.instrumentation import Instrumentation
 
 
 class Importer(IPlugin):
@@ -13,6 +14,8 @@ class Importer(IPlugin):
 
     def __init__(self):
         self.app_modules = []
+        # stage timers and counters of the parsing runs
+        self.instrumentation = Instrumentation()
 
         self._check_requirements()
 
@@ -43,6 +46,22 @@ class Importer(IPlugin):
         """
         return self.config
 
+    def get_instrumentation(self):
+        """Getter for the stage timers and counters of the importer
+
+        :return: instrumentation of the importer
+        :rtype: :class:`continuum_deployer.utils.instrumentation.Instrumentation`
+        """
+        return self.instrumentation
+
+    def set_instrumentation(self, instrumentation):
+        """Setter for the instrumentation, e.g. to share one instance with the solver
+
+        :param instrumentation: instrumentation to record to
+        :type instrumentation: :class:`continuum_deployer.utils.instrumentation.Instrumentation`
+        """
+        self.instrumentation = instrumentation
+
     def reset_app_modules(self):
         """Delete already parsed app modules"""
         self.app_modules = []
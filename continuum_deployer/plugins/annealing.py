@@ -0,0 +1,311 @@
+import math
+import random
+import time
+
+import click
+
+from continuum_deployer.solving.greedy import Greedy
+from continuum_deployer.solving.solver import Solver
+from continuum_deployer.utils.config import Config, Setting, SettingValue
+
+
+class Annealing(Solver):
+    """Simulated annealing solver that starts from a Greedy placement and improves it
+    with relocate and swap moves within a time budget. Every move only touches the
+    source and the target resource, so it is evaluated in constant time.
+    """
+
+    # weight of the load balance term of the min_nodes target, kept below 1
+    # so that freeing a whole resource outweighs the load changes
+    BALANCE_WEIGHT = 0.5
+    # energy of a deployment without resource, more than a whole resource
+    UNPLACED_PENALTY = 2.0
+    # start and end temperature of the geometric cooling schedule
+    START_TEMPERATURE = 0.3
+    END_TEMPERATURE = 0.0001
+    # moves between two checks of the time budget
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, deployment_entities, resources):
+        super().__init__(deployment_entities, resources)
+        # energies and move counts of the searches per matching group
+        self.search_stats = []
+
+    def _gen_config(self):
+        return Config([
+            Setting('target', [
+                SettingValue(
+                    'min_nodes', description='Frees whole resources by packing workloads on few resources', default=True),
+                SettingValue(
+                    'balance', description='Spreads workloads evenly over the resources'),
+            ]),
+            Setting('max_time', [
+                SettingValue(
+                    1, description='Stops search after 1 second'),
+                SettingValue(
+                    5, description='Stops search after 5 seconds', default=True),
+                SettingValue(
+                    30, description='Stops search after 30 seconds'),
+                SettingValue(
+                    60, description='Stops search after 60 seconds'),
+            ]),
+            Setting('max_moves', [
+                SettingValue(
+                    100000, description='Stops search after 100k moves'),
+                SettingValue(
+                    1000000, description='Stops search after 1M moves', default=True),
+                SettingValue(
+                    10000000, description='Stops search after 10M moves'),
+            ]),
+            Setting('seed', [
+                SettingValue(
+                    0, description='Seed of the random moves, equal settings give equal results within the move limit', default=True),
+                SettingValue(
+                    1, description='Alternative seed of the random moves'),
+                SettingValue(
+                    2, description='Alternative seed of the random moves'),
+            ])
+        ])
+
+    def _initial_placement(self, deployment_entities, resources):
+        """Helper that places the deployments with the Greedy solver
+
+        :param deployment_entities: deployments to place
+        :type deployment_entities: list
+        :param resources: resources to place the deployments on
+        :type resources: list
+        :return: resource index per deployment, -1 for deployments that did not fit
+        :rtype: list
+        """
+        _greedy = Greedy(deployment_entities, resources)
+        _config = _greedy.get_config()
+        if self.config.get_setting('target').get_value().value == 'min_nodes':
+            _options = [('target', 'min_nodes'), ('fit', 'best_fit')]
+        else:
+            _options = [('target', 'dominant_resource'), ('fit', 'worst_fit')]
+        for name, value in _options:
+            _setting = _config.get_setting(name)
+            _setting.set_value(
+                next(o for o in _setting.get_options() if o.value == value))
+        _greedy.do_matching(deployment_entities, resources)
+
+        _index = {id(d): j for j, d in enumerate(deployment_entities)}
+        _assignment = [-1] * len(deployment_entities)
+        for i, resource in enumerate(resources):
+            for deployment in resource.get_deployments():
+                j = _index.get(id(deployment))
+                if j is not None:
+                    _assignment[j] = i
+        return _assignment
+
+    def do_matching(self, deployment_entities, resources):
+        """Does actual deployment to resource matching
+        """
+        if len(resources) == 0:
+            self.placement_errors.extend(deployment_entities)
+            return
+
+        _min_nodes = self.config.get_setting(
+            'target').get_value().value == 'min_nodes'
+        _max_time = self.config.get_setting('max_time').get_value().value
+        _max_moves = self.config.get_setting('max_moves').get_value().value
+        _random = random.Random(
+            self.config.get_setting('seed').get_value().value)
+
+        _start = time.perf_counter()
+        _initial = self._initial_placement(deployment_entities, resources)
+        _assignment = list(_initial)
+
+        # plain lists of the resource state, deployments of earlier groups are fixed load
+        _num = len(resources)
+        _cpu = [d.cpu for d in deployment_entities]
+        _memory = [d.memory for d in deployment_entities]
+        _idle_cpu = [r.get_idle_cpu() for r in resources]
+        _idle_memory = [r.get_idle_memory() for r in resources]
+        _inv_cpu = [1 / r.cpu if r.cpu else 0 for r in resources]
+        _inv_memory = [1 / r.memory if r.memory else 0 for r in resources]
+        _count = [len(r.get_deployments()) for r in resources]
+        # moves keep a small margin, the final placement is booked on the
+        # resource entities with a different order of float operations
+        _margin_cpu = [r.cpu * 1e-9 for r in resources]
+        _margin_memory = [r.memory * 1e-9 for r in resources]
+
+        _placed = [j for j, i in enumerate(_assignment) if i >= 0]
+        _unplaced = [j for j, i in enumerate(_assignment) if i < 0]
+        # used resources with their list position for constant time sampling and removal
+        _used = [i for i in range(_num) if _count[i] > 0]
+        _used_pos = {i: n for n, i in enumerate(_used)}
+
+        def _cost(i, idle_cpu, idle_memory, count):
+            _load_cpu = 1 - idle_cpu * _inv_cpu[i] if _inv_cpu[i] else 0
+            _load_memory = 1 - idle_memory * \
+                _inv_memory[i] if _inv_memory[i] else 0
+            _balance = (_load_cpu * _load_cpu +
+                        _load_memory * _load_memory) / 2
+            if _min_nodes:
+                return (1 if count > 0 else 0) - self.BALANCE_WEIGHT * _balance
+            return _balance
+
+        def _set_used(i, count):
+            if count > 0 and i not in _used_pos:
+                _used_pos[i] = len(_used)
+                _used.append(i)
+            elif count == 0 and i in _used_pos:
+                _last = _used.pop()
+                if _last != i:
+                    _n = _used_pos[i]
+                    _used[_n] = _last
+                    _used_pos[_last] = _n
+                del _used_pos[i]
+
+        _energy = sum(_cost(i, _idle_cpu[i], _idle_memory[i], _count[i]) for i in range(_num)) + \
+            self.UNPLACED_PENALTY * len(_unplaced)
+        _initial_energy = _energy
+        _best_energy = _energy
+        _best_assignment = list(_assignment)
+
+        _temperature = self.START_TEMPERATURE
+        _cooling = math.log(self.END_TEMPERATURE / self.START_TEMPERATURE)
+        _moves = 0
+        _accepted = 0
+        while _moves < _max_moves and len(deployment_entities) > 0:
+            if _moves % self.CHECK_INTERVAL == 0:
+                _progress = max(_moves / _max_moves,
+                                (time.perf_counter() - _start) / _max_time)
+                if _progress >= 1:
+                    break
+                _temperature = self.START_TEMPERATURE * \
+                    math.exp(_cooling * _progress)
+            _moves += 1
+
+            if _unplaced and _random.random() < 0.5:
+                # relocate a deployment without resource
+                _u = _random.randrange(len(_unplaced))
+                j = _unplaced[_u]
+                b = _random.randrange(_num)
+                _new_cpu_b = _idle_cpu[b] - _cpu[j]
+                _new_memory_b = _idle_memory[b] - _memory[j]
+                if _new_cpu_b < _margin_cpu[b] or _new_memory_b < _margin_memory[b]:
+                    continue
+                _delta = _cost(b, _new_cpu_b, _new_memory_b, _count[b] + 1) - \
+                    _cost(b, _idle_cpu[b], _idle_memory[b], _count[b]) - self.UNPLACED_PENALTY
+                if _delta > 0 and _random.random() >= math.exp(-_delta / _temperature):
+                    continue
+                _idle_cpu[b], _idle_memory[b] = _new_cpu_b, _new_memory_b
+                _count[b] += 1
+                _set_used(b, _count[b])
+                _assignment[j] = b
+                _unplaced[_u] = _unplaced[-1]
+                _unplaced.pop()
+                _placed.append(j)
+            elif not _placed:
+                continue
+            elif _random.random() < 0.5:
+                # relocate a placed deployment, packing prefers used resources
+                j = _placed[_random.randrange(len(_placed))]
+                a = _assignment[j]
+                if _min_nodes and _random.random() < 0.9:
+                    b = _used[_random.randrange(len(_used))]
+                else:
+                    b = _random.randrange(_num)
+                if a == b:
+                    continue
+                _new_cpu_b = _idle_cpu[b] - _cpu[j]
+                _new_memory_b = _idle_memory[b] - _memory[j]
+                if _new_cpu_b < _margin_cpu[b] or _new_memory_b < _margin_memory[b]:
+                    continue
+                _new_cpu_a = _idle_cpu[a] + _cpu[j]
+                _new_memory_a = _idle_memory[a] + _memory[j]
+                _delta = _cost(a, _new_cpu_a, _new_memory_a, _count[a] - 1) + \
+                    _cost(b, _new_cpu_b, _new_memory_b, _count[b] + 1) - \
+                    _cost(a, _idle_cpu[a], _idle_memory[a], _count[a]) - \
+                    _cost(b, _idle_cpu[b], _idle_memory[b], _count[b])
+                if _delta > 0 and _random.random() >= math.exp(-_delta / _temperature):
+                    continue
+                _idle_cpu[a], _idle_memory[a] = _new_cpu_a, _new_memory_a
+                _idle_cpu[b], _idle_memory[b] = _new_cpu_b, _new_memory_b
+                _count[a] -= 1
+                _count[b] += 1
+                _set_used(a, _count[a])
+                _set_used(b, _count[b])
+                _assignment[j] = b
+            else:
+                # swap two placed deployments of different resources
+                j = _placed[_random.randrange(len(_placed))]
+                k = _placed[_random.randrange(len(_placed))]
+                a, b = _assignment[j], _assignment[k]
+                if a == b:
+                    continue
+                _new_cpu_a = _idle_cpu[a] + _cpu[j] - _cpu[k]
+                _new_memory_a = _idle_memory[a] + _memory[j] - _memory[k]
+                _new_cpu_b = _idle_cpu[b] + _cpu[k] - _cpu[j]
+                _new_memory_b = _idle_memory[b] + _memory[k] - _memory[j]
+                if _new_cpu_a < _margin_cpu[a] or _new_memory_a < _margin_memory[a] or \
+                        _new_cpu_b < _margin_cpu[b] or _new_memory_b < _margin_memory[b]:
+                    continue
+                _delta = _cost(a, _new_cpu_a, _new_memory_a, _count[a]) + \
+                    _cost(b, _new_cpu_b, _new_memory_b, _count[b]) - \
+                    _cost(a, _idle_cpu[a], _idle_memory[a], _count[a]) - \
+                    _cost(b, _idle_cpu[b], _idle_memory[b], _count[b])
+                if _delta > 0 and _random.random() >= math.exp(-_delta / _temperature):
+                    continue
+                _idle_cpu[a], _idle_memory[a] = _new_cpu_a, _new_memory_a
+                _idle_cpu[b], _idle_memory[b] = _new_cpu_b, _new_memory_b
+                _assignment[j], _assignment[k] = b, a
+
+            _accepted += 1
+            _energy += _delta
+            if _energy < _best_energy - 1e-9:
+                _best_energy = _energy
+                _best_assignment = list(_assignment)
+
+        self._apply_assignment(
+            deployment_entities, resources, _initial, _best_assignment)
+
+        _stats = {
+            'deployments': len(deployment_entities),
+            'resources': _num,
+            'initial_energy': _initial_energy,
+            'best_energy': _best_energy,
+            'moves': _moves,
+            'accepted': _accepted,
+            'time': time.perf_counter() - _start,
+        }
+        self.search_stats.append(_stats)
+        click.echo(('Search: {deployments} deployments x {resources} resources, energy {initial_energy:.4f} -> '
+                    '{best_energy:.4f}, {accepted}/{moves} moves accepted in {time:.3f}s').format(**_stats), err=True)
+
+    def _apply_assignment(self, deployment_entities, resources, initial, assignment):
+        """Helper that moves the deployments from their Greedy placement to the
+        best placement found, only resources that changed are touched
+
+        :param deployment_entities: deployments of the matching group
+        :type deployment_entities: list
+        :param resources: resources of the matching group
+        :type resources: list
+        :param initial: resource index per deployment after the Greedy placement
+        :type initial: list
+        :param assignment: resource index per deployment of the best placement
+        :type assignment: list
+        """
+        _moved = [j for j in range(len(deployment_entities))
+                  if initial[j] != assignment[j]]
+        for j in _moved:
+            if initial[j] >= 0:
+                resources[initial[j]].remove_deployment(deployment_entities[j])
+        for j in _moved:
+            if assignment[j] < 0 or not resources[assignment[j]].add_deployment(deployment_entities[j]):
+                self.placement_errors.append(deployment_entities[j])
+        for j in range(len(deployment_entities)):
+            if initial[j] < 0 and initial[j] == assignment[j]:
+                self.placement_errors.append(deployment_entities[j])
+
+    def _get_worker_state(self):
+        return self.search_stats
+
+    def _merge_worker_state(self, state):
+        self.search_stats.extend(state)
+
+    def reset_matching(self):
+        super(Annealing, self).reset_matching()
+        self.search_stats = []
@@ -1,12 +1,15 @@
 from dataclasses import dataclass, field
 import click
 
+from continuum_deployer.utils.slots import add_slots
 from continuum_deployer.utils.ui import UI
 
 
+@add_slots
 @dataclass
 class DeploymentEntity:
-    """Data Class that holds extracted values for deployments."""
+    """Data Class that holds extracted values for deployments.
+    Instances are slotted to keep large numbers of replicas small."""
 
     # name of the deployment
     name: str = field(default=None)
@@ -23,6 +26,22 @@ class DeploymentEntity:
     yaml: dict = field(default=None)
     # assigned labels
     labels: dict = field(default=None)
+    # reference to the source document, used instead of yaml by streaming importers
+    source: object = field(default=None, repr=False)
+    # index of the replica if the deployment is one of multiple replicas,
+    # replicas share their yaml definition as common template
+    replica: int = field(default=None)
+
+    def get_yaml(self):
+        """Returns the yaml definition of the deployment, loads it from the
+        source document if only a reference is kept
+
+        :return: yaml definition
+        :rtype: dict
+        """
+        if self.yaml is None and self.source is not None:
+            return self.source.load()
+        return self.yaml
 
     def print(self):
         """Helper that prints values of current deployment to stdout"""
@@ -0,0 +1,153 @@
+class LabelIndex:
+    """Inverted index that maps labels to the resources having them assigned.
+    Answers which resources have all of a given set of labels by intersecting
+    the posting sets of the single labels.
+    """
+
+    def __init__(self, resources=None):
+        # resources in order of insertion, removed resources are replaced by None
+        self._resources = []
+        # object id of resource -> insertion position
+        self._positions = dict()
+        # (label key, label value) -> set of positions
+        self._postings = dict()
+        # positions of resources that have labels assigned
+        self._labeled = set()
+        # position -> indexed labels, necessary as labels might change before reindexing
+        self._indexed_labels = dict()
+        # bound indexes share their postings and can not be changed
+        self._frozen = False
+
+        if resources is not None:
+            for resource in resources:
+                self.add(resource)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def add(self, resource):
+        """Adds a resource to the index
+
+        :param resource: resource entity to add
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        """
+        self._check_frozen()
+        if id(resource) in self._positions:
+            return
+
+        _position = len(self._resources)
+        self._resources.append(resource)
+        self._positions[id(resource)] = _position
+        self._index_labels(resource, _position)
+
+    def _index_labels(self, resource, position):
+        """Helper that adds the current labels of a resource to the postings
+
+        :param resource: resource entity whose labels should be indexed
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        :param position: index position of the resource
+        :type position: int
+        """
+        if resource.labels is not None:
+            self._labeled.add(position)
+            self._indexed_labels[position] = list(resource.labels.items())
+            for label in self._indexed_labels[position]:
+                self._postings.setdefault(label, set()).add(position)
+
+    def _unindex_labels(self, position):
+        """Helper that removes the indexed labels of a position from the postings
+
+        :param position: index position of the resource
+        :type position: int
+        """
+        self._labeled.discard(position)
+        for label in self._indexed_labels.pop(position, []):
+            self._postings[label].discard(position)
+            if not self._postings[label]:
+                del self._postings[label]
+
+    def remove(self, resource):
+        """Removes a resource from the index
+
+        :param resource: resource entity to remove
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        :return: result of remove operation, False if resource was not indexed
+        :rtype: bool
+        """
+        self._check_frozen()
+        _position = self._positions.pop(id(resource), None)
+        if _position is None:
+            return False
+
+        self._resources[_position] = None
+        self._unindex_labels(_position)
+        return True
+
+    def update(self, resource):
+        """Reindexes a resource, necessary after its labels have been changed.
+        Resources that are not indexed yet are added.
+
+        :param resource: resource entity to reindex
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        """
+        self._check_frozen()
+        _position = self._positions.get(id(resource))
+        if _position is None:
+            self.add(resource)
+            return
+
+        self._unindex_labels(_position)
+        self._index_labels(resource, _position)
+
+    def _check_frozen(self):
+        if self._frozen:
+            raise RuntimeError('Bound label index can not be changed')
+
+    def bind(self, resources):
+        """Creates a read-only index over the given resources that shares the
+        postings of this index, e.g. to query copies of the indexed resources
+        without rebuilding the index.
+
+        :param resources: resources that correspond to the indexed ones in index order
+        :type resources: list
+        :return: read-only label index over the given resources
+        :rtype: :class:`continuum_deployer.resources.label_index.LabelIndex`
+        """
+        _indexed = [r for r in self._resources if r is not None]
+        if len(_indexed) != len(resources):
+            raise ValueError('Number of resources does not match the index')
+
+        _resources = iter(resources)
+        _index = LabelIndex()
+        _index._resources = [None if r is None else next(_resources)
+                             for r in self._resources]
+        _index._positions = {id(r): p for p, r in enumerate(_index._resources)
+                             if r is not None}
+        _index._postings = self._postings
+        _index._labeled = self._labeled
+        _index._indexed_labels = self._indexed_labels
+        _index._frozen = True
+        return _index
+
+    def get_resources(self, labels):
+        """Returns all indexed resources that have all given labels assigned
+
+        :param labels: labels the resources must have
+        :type labels: dict
+        :return: list of matching resources in index order
+        :rtype: list
+        """
+        if not labels:
+            _positions = self._labeled
+        else:
+            _postings = []
+            for label in labels.items():
+                _posting = self._postings.get(label)
+                if _posting is None:
+                    return []
+                _postings.append(_posting)
+            # start with the smallest posting set to keep intersections cheap
+            _postings.sort(key=len)
+            _positions = _postings[0].intersection(*_postings[1:])
+
+        return [self._resources[p] for p in sorted(_positions)]
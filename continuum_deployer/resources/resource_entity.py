@@ -3,12 +3,15 @@ from typing import List
 import click
 
 from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.utils.slots import add_slots
 from continuum_deployer.utils.ui import UI
 
 
+@add_slots
 @dataclass
 class ResourceEntity:
-    """Data Class that hold extracted values for resources."""
+    """Data Class that hold extracted values for resources.
+    Instances are slotted to keep large node fleets small."""
 
     name: str = field(default=None)
     memory: float = field(default=None)
@@ -16,6 +19,47 @@ class ResourceEntity:
     deployments: List[DeploymentEntity] = field(default_factory=list)
     labels: dict = field(default=None)
 
+    # running usage counters that are kept in step with the placed deployments,
+    # initialized lazily as cpu and memory might be set after object creation
+    _used_cpu: float = field(default=None, init=False,
+                             repr=False, compare=False)
+    _used_memory: float = field(default=None, init=False,
+                                repr=False, compare=False)
+    _idle_cpu: float = field(default=None, init=False,
+                             repr=False, compare=False)
+    _idle_memory: float = field(default=None, init=False,
+                                repr=False, compare=False)
+
+    def _init_usage(self):
+        """Helper that (re)calculates the usage counters from the placed deployments
+        """
+        self._used_cpu = 0
+        self._used_memory = 0
+        self._idle_cpu = self.cpu
+        self._idle_memory = self.memory
+        for deployment in self.deployments:
+            self._account_deployment(deployment)
+
+    def _ensure_usage(self):
+        """Helper that initializes the usage counters on first use
+        """
+        if self._idle_cpu is None:
+            self._init_usage()
+
+    def _account_deployment(self, entity):
+        """Helper that books the resource requests of a newly placed
+        deployment entity on the usage counters.
+
+        :param entity: deployment entity that was placed on the resource
+        :type entity: :class:`continuum_deployer.resources.deployment.DeploymentEntity`
+        """
+        self._used_cpu += entity.cpu
+        self._used_memory += entity.memory
+        # idle values are reduced step by step to keep the exact same float
+        # arithmetic as summing up all deployments of the resource
+        self._idle_cpu -= entity.cpu
+        self._idle_memory -= entity.memory
+
     def check_resources_fit(self, entity):
         """Idempotent helper method that checks if given deployment entity 
         can be added to the resource without exceeding the limits.
@@ -25,12 +69,9 @@ class ResourceEntity:
         :return: Check result if deployment entity cloud be placed as boolean
         :rtype: bool
         """
-        available_cpu = self.cpu
-        available_memory = self.memory
-        deployments_proposal = self.deployments + [entity]
-        for deployment in deployments_proposal:
-            available_cpu -= deployment.cpu
-            available_memory -= deployment.memory
+        self._ensure_usage()
+        available_cpu = self._idle_cpu - entity.cpu
+        available_memory = self._idle_memory - entity.memory
 
         if available_memory >= 0 and available_cpu >= 0:
             return True
@@ -46,11 +87,37 @@ class ResourceEntity:
         :rtype: bool
         """
         if self.check_resources_fit(entity):
+            self._ensure_usage()
             self.deployments.append(entity)
+            self._account_deployment(entity)
             return True
         else:
             return False
 
+    def remove_deployment(self, entity):
+        """Remove a placed deployment entity from the current resource.
+        The requests of the entity are given back to the usage counters.
+
+        :param entity: deployment entity that should be removed
+        :type entity: :class:`continuum_deployer.resources.deployment.DeploymentEntity`
+        :return: result of remove operation, False if entity was not placed on resource
+        :rtype: bool
+        """
+        for i, deployment in enumerate(self.deployments):
+            if deployment is entity:
+                self._ensure_usage()
+                del self.deployments[i]
+                if not self.deployments:
+                    # an empty resource gets the exact values without rounding errors
+                    self._init_usage()
+                    return True
+                self._used_cpu -= entity.cpu
+                self._used_memory -= entity.memory
+                self._idle_cpu += entity.cpu
+                self._idle_memory += entity.memory
+                return True
+        return False
+
     def print(self):
         """Helper method that prints resource entity parameters and current deployments to stdout
         """
@@ -59,9 +126,9 @@ class ResourceEntity:
         click.echo(click.style("CPU: {} \t MEMORY: {} MB".format(
             self.cpu, self.memory
         ), fg=None))
-        UI.print_percent_bar('CPU', (sum(d.cpu for d in self.deployments)/self.cpu) * 100
+        UI.print_percent_bar('CPU', (self.get_used_cpu()/self.cpu) * 100
                              if len(self.deployments) != 0 else 0)
-        UI.print_percent_bar('RAM', (sum(d.memory for d in self.deployments)/self.memory) * 100
+        UI.print_percent_bar('RAM', (self.get_used_memory()/self.memory) * 100
                              if len(self.deployments) != 0 else 0)
         _printed_deployments = "\n"
         for deployment in self.deployments:
@@ -76,14 +143,26 @@ class ResourceEntity:
     def get_deployments(self):
         return self.deployments
 
+    def get_used_cpu(self):
+        self._ensure_usage()
+        return self._used_cpu
+
+    def get_used_memory(self):
+        self._ensure_usage()
+        return self._used_memory
+
     def get_idle_cpu(self):
-        return self.cpu - sum(d.cpu for d in self.deployments)
+        self._ensure_usage()
+        return self._idle_cpu
 
     def get_idle_memory(self):
-        return self.memory - sum(d.memory for d in self.deployments)
+        self._ensure_usage()
+        return self._idle_memory
 
     def clear_deployments(self):
         """ Removes all placed deployments
         """
 
         self.deployments = []
+        # reset counters, they are reinitialized on next use
+        self._idle_cpu = None
@@ -1,7 +1,8 @@
-import yaml
 import click
 
+from continuum_deployer.resources.label_index import LabelIndex
 from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.utils.yaml_handling import YamlHandling
 
 
 class Resources:
@@ -10,6 +11,7 @@ class Resources:
 
     def __init__(self):
         self.resources = list()
+        self.label_index = LabelIndex()
 
     def check_mandatory_fields(self, node):
         """Checks if all mandatory resource entity fields are set
@@ -31,9 +33,7 @@ class Resources:
         :type definition: str
         """
 
-        # see default loader deprecation
-        # https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
-        nodes = yaml.load(definition, Loader=yaml.SafeLoader)['resources']
+        nodes = YamlHandling.load(definition)['resources']
 
         for node in nodes:
             self.check_mandatory_fields(node)
@@ -42,7 +42,39 @@ class Resources:
             _resource.memory = node.get('memory')
             _resource.cpu = node.get('cpu')
             _resource.labels = node.get('labels', None)
-            self.resources.append(_resource)
+            self.add_resource(_resource)
+
+    def add_resource(self, resource):
+        """Adds a resource entity and updates the label index
+
+        :param resource: resource entity to add
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        """
+        self.resources.append(resource)
+        self.label_index.add(resource)
+
+    def remove_resource(self, resource):
+        """Removes a resource entity and updates the label index
+
+        :param resource: resource entity to remove
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        """
+        for i, _resource in enumerate(self.resources):
+            if _resource is resource:
+                del self.resources[i]
+                break
+        self.label_index.remove(resource)
+
+    def set_labels(self, resource, labels):
+        """Changes the labels of a resource entity and updates the label index
+
+        :param resource: resource entity to change
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        :param labels: new labels of the resource
+        :type labels: dict
+        """
+        resource.labels = labels
+        self.label_index.update(resource)
 
     def print_resources(self):
         """Helper function that prints each resource to stdout 
@@ -53,3 +85,11 @@ class Resources:
 
     def get_resources(self):
         return self.resources
+
+    def get_label_index(self):
+        """Getter for the label index of the resources
+
+        :return: label index that is kept valid on changes trough this class
+        :rtype: :class:`continuum_deployer.resources.label_index.LabelIndex`
+        """
+        return self.label_index
@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+
+
+@dataclass
+class SolverDelta:
+    """Data Class that holds the changes of the solver input between two matchings.
+    Entities are identified by their name, changed entities are the new versions
+    that replace the current entities with the same name.
+    """
+
+    added_resources: List[ResourceEntity] = field(default_factory=list)
+    removed_resources: List[ResourceEntity] = field(default_factory=list)
+    changed_resources: List[ResourceEntity] = field(default_factory=list)
+    added_deployments: List[DeploymentEntity] = field(default_factory=list)
+    removed_deployments: List[DeploymentEntity] = field(default_factory=list)
+    changed_deployments: List[DeploymentEntity] = field(default_factory=list)
+
+    @staticmethod
+    def _resource_key(resource):
+        return (resource.cpu, resource.memory, resource.labels)
+
+    @staticmethod
+    def _deployment_key(deployment):
+        # the source reference is compared by identity, streamed deployments
+        # are therefore always considered as changed
+        _source = id(deployment.source) if deployment.source is not None else None
+        return (deployment.cpu, deployment.memory, deployment.cpu_limit, deployment.memory_limit,
+                deployment.labels, deployment.replica, deployment.yaml, _source)
+
+    @staticmethod
+    def _diff(old, new, key):
+        _old = {e.name: e for e in old}
+        _new_names = set()
+        _added = []
+        _changed = []
+        for entity in new:
+            _new_names.add(entity.name)
+            _current = _old.get(entity.name)
+            if _current is None:
+                _added.append(entity)
+            elif key(_current) != key(entity):
+                _changed.append(entity)
+        _removed = [e for e in old if e.name not in _new_names]
+        return _added, _removed, _changed
+
+    @staticmethod
+    def diff(old_resources, new_resources, old_deployments, new_deployments):
+        """Compares the current solver input with a new version of it,
+        e.g. after the definitions were edited and parsed again.
+
+        :param old_resources: resource entities the solver currently works on
+        :type old_resources: list
+        :param new_resources: new version of the resource entities
+        :type new_resources: list
+        :param old_deployments: deployment entities the solver currently works on
+        :type old_deployments: list
+        :param new_deployments: new version of the deployment entities
+        :type new_deployments: list
+        :return: delta between both versions
+        :rtype: :class:`continuum_deployer.solving.delta.SolverDelta`
+        """
+        _delta = SolverDelta()
+        _delta.added_resources, _delta.removed_resources, _delta.changed_resources = \
+            SolverDelta._diff(old_resources, new_resources,
+                              SolverDelta._resource_key)
+        _delta.added_deployments, _delta.removed_deployments, _delta.changed_deployments = \
+            SolverDelta._diff(old_deployments, new_deployments,
+                              SolverDelta._deployment_key)
+        return _delta
+
+    def has_resource_changes(self):
+        return bool(self.added_resources or self.removed_resources or self.changed_resources)
+
+    def is_empty(self):
+        return not (self.has_resource_changes() or self.added_deployments
+                    or self.removed_deployments or self.changed_deployments)
@@ -7,6 +7,8 @@ from continuum_deployer.utils.config import Config, Setting, SettingValue
 
 class Greedy(Solver):
 
+    VECTOR_TARGETS = ['dot_product', 'l2_norm', 'dominant_resource']
+
     @staticmethod
     def sort_by_attr(items, attr):
         """Helper function that sorts list of items based on configurable attribute
@@ -20,6 +22,92 @@ class Greedy(Solver):
         """
         return sorted(items, key=lambda x: getattr(x, attr), reverse=True)
 
+    @staticmethod
+    def get_vector_weights(entities, resources, target):
+        """Helper that returns the weights of cpu and memory for the vector targets.
+        Both dimensions are normalized by the largest resource, for the dot product
+        they are additionally weighted by the normalized demand of all workloads.
+
+        :param entities: deployment entities that should be placed
+        :type entities: list
+        :param resources: resource entities that are valid targets
+        :type resources: list
+        :param target: name of the vector target
+        :type target: str
+        :return: tuple of cpu and memory weight
+        :rtype: tuple
+        """
+        _cpu = 1 / (max((r.cpu for r in resources), default=0) or 1)
+        _memory = 1 / (max((r.memory for r in resources), default=0) or 1)
+        if target == 'dot_product':
+            _demand_cpu = sum(e.cpu for e in entities) * _cpu
+            _demand_memory = sum(e.memory for e in entities) * _memory
+            _demand = (_demand_cpu + _demand_memory) or 1
+            return _cpu * _demand_cpu / _demand, _memory * _demand_memory / _demand
+        return _cpu, _memory
+
+    @staticmethod
+    def get_vector_size(target, cpu, memory, weights):
+        """Helper that returns the size of a cpu and memory vector, e.g. the requests
+        of a workload or the idle resources of a resource
+
+        :param target: name of the vector target
+        :type target: str
+        :param cpu: cpu component of the vector
+        :type cpu: float
+        :param memory: memory component of the vector
+        :type memory: float
+        :param weights: weights of both dimensions, see :meth:`get_vector_weights`
+        :type weights: tuple
+        :return: size of the vector
+        :rtype: float
+        """
+        _cpu = cpu * weights[0]
+        _memory = memory * weights[1]
+        if target == 'dot_product':
+            return _cpu + _memory
+        elif target == 'l2_norm':
+            return (_cpu * _cpu + _memory * _memory) ** 0.5
+        elif target == 'dominant_resource':
+            return max(_cpu, _memory)
+        else:
+            raise NotImplementedError
+
+    @staticmethod
+    def sort_by_vector(items, target, weights):
+        """Helper function that sorts list of items based on the size of their cpu
+        and memory vector
+
+        :param items: items to sort
+        :type items: list
+        :param target: name of the vector target
+        :type target: str
+        :param weights: weights of both dimensions, see :meth:`get_vector_weights`
+        :type weights: tuple
+        :return: list of sorted items
+        :rtype: list
+        """
+        return sorted(items, key=lambda x: Greedy.get_vector_size(
+            target, x.cpu, x.memory, weights), reverse=True)
+
+    @staticmethod
+    def get_idle_attr(resource, attr):
+        """Helper function that returns the idle amount of the given attribute of a resource
+
+        :param resource: resource entity to read the idle value from
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        :param attr: name of the attribute, either cpu or memory
+        :type attr: str
+        :return: idle amount of the attribute
+        :rtype: float
+        """
+        if attr == 'cpu':
+            return resource.get_idle_cpu()
+        elif attr == 'memory':
+            return resource.get_idle_memory()
+        else:
+            raise NotImplementedError
+
     @staticmethod
     def deploy_iterate(entity, resources):
         """Helper that traverses a list of resources and tries to place the given
@@ -37,6 +125,70 @@ class Greedy(Solver):
                 return True
         return False
 
+    @staticmethod
+    def deploy_ranked(entity, resources, attr, worst=False):
+        """Helper that traverses a list of resources and places the given deployment
+        entity on the resource with the least (best fit) or most (worst fit) idle
+        amount of the given attribute left after placement. Ties are resolved in
+        favour of the resource that appears first in the list.
+
+        :param entity: deployment entity that should be placed
+        :type entity: :class:`continuum_deployer.resources.deployment.DeploymentEntity`
+        :param resources: list of resource entities that are valid targets
+        :type resources: list
+        :param attr: name of the attribute the ranking should be carried out with
+        :type attr: str
+        :param worst: flag to select worst fit instead of best fit, defaults to False
+        :type worst: bool, optional
+        :return: boolean flag representing the success of the placement attempt
+        :rtype: bool
+        """
+        _selected = None
+        _selected_residual = None
+        for resource in resources:
+            if not resource.check_resources_fit(entity):
+                continue
+            _residual = Greedy.get_idle_attr(
+                resource, attr) - getattr(entity, attr)
+            if _selected is None or \
+                    (worst and _residual > _selected_residual) or \
+                    (not worst and _residual < _selected_residual):
+                _selected = resource
+                _selected_residual = _residual
+
+        if _selected is None:
+            return False
+        return _selected.add_deployment(entity)
+
+    @staticmethod
+    def deploy_scored(entity, resources, score):
+        """Helper that places the given deployment entity on the resource with the
+        lowest score among the resources it fits on. Ties are resolved in favour
+        of the resource that appears first in the list.
+
+        :param entity: deployment entity that should be placed
+        :type entity: :class:`continuum_deployer.resources.deployment.DeploymentEntity`
+        :param resources: list of resource entities that are valid targets
+        :type resources: list
+        :param score: function of resource and entity that returns the score of a placement
+        :type score: callable
+        :return: boolean flag representing the success of the placement attempt
+        :rtype: bool
+        """
+        _selected = None
+        _selected_score = None
+        for resource in resources:
+            if not resource.check_resources_fit(entity):
+                continue
+            _score = score(resource, entity)
+            if _selected is None or _score < _selected_score:
+                _selected = resource
+                _selected_score = _score
+
+        if _selected is None:
+            return False
+        return _selected.add_deployment(entity)
+
     def _gen_config(self):
         return Config([
             Setting('target', [
@@ -44,26 +196,224 @@ class Greedy(Solver):
                     'cpu', description='Sorts resources and workloads by cpu for greedy matching', default=True),
                 SettingValue(
                     'memory', 'Sorts resources and workloads by memory for greedy matching'),
+                SettingValue(
+                    'min_nodes', 'Packs workloads on as few resources as possible (First/Best-Fit-Decreasing)'),
+                SettingValue(
+                    'dot_product', 'Sorts by cpu and memory weighted with the total demand of the workloads'),
+                SettingValue(
+                    'l2_norm', 'Sorts by the euclidean norm of normalized cpu and memory'),
+                SettingValue(
+                    'dominant_resource', 'Sorts by the larger share of normalized cpu and memory'),
+            ]),
+            Setting('fit', [
+                SettingValue(
+                    'first_fit', description='Places workloads on the first resource they fit on', default=True),
+                SettingValue(
+                    'best_fit', description='Places workloads on the resource with the least idle target left'),
+                SettingValue(
+                    'worst_fit', description='Places workloads on the resource with the most idle target left'),
+            ]),
+            Setting('engine', [
+                SettingValue(
+                    'python', description='Places workloads by iterating the resource objects', default=True),
+                SettingValue(
+                    'numpy', description='Places workloads with vectorized masks over resource arrays'),
             ])
         ])
 
-    def greedy_attr(self, entities, resources, attr):
+    def greedy_attr(self, entities, resources, attr, fit='first_fit'):
         entities_sorted = Greedy.sort_by_attr(entities, attr)
         resources_sorted = Greedy.sort_by_attr(resources, attr)
 
         for entity in entities_sorted:
-            if not Greedy.deploy_iterate(entity, resources_sorted):
+            if fit == 'first_fit':
+                _placed = Greedy.deploy_iterate(entity, resources_sorted)
+            elif fit == 'best_fit':
+                _placed = Greedy.deploy_ranked(
+                    entity, resources_sorted, attr)
+            elif fit == 'worst_fit':
+                _placed = Greedy.deploy_ranked(
+                    entity, resources_sorted, attr, worst=True)
+            else:
+                raise NotImplementedError
+            if not _placed:
                 self.placement_errors.append(entity)
 
+    def greedy_vector(self, entities, resources, target, fit='first_fit'):
+        """Variant of :meth:`greedy_attr` that considers cpu and memory together.
+        Workloads and resources are sorted by the size of their normalized cpu and
+        memory vector, best and worst fit rank the resources by the size of the
+        idle vector left after placement.
+
+        :param entities: deployment entities to place
+        :type entities: list
+        :param resources: resource entities to place the deployments on
+        :type resources: list
+        :param target: name of the vector target, one of :attr:`VECTOR_TARGETS`
+        :type target: str
+        :param fit: placement strategy, defaults to 'first_fit'
+        :type fit: str, optional
+        """
+        _weights = Greedy.get_vector_weights(entities, resources, target)
+        entities_sorted = Greedy.sort_by_vector(entities, target, _weights)
+        resources_sorted = Greedy.sort_by_vector(resources, target, _weights)
+
+        def _residual(resource, entity):
+            return Greedy.get_vector_size(target, resource.get_idle_cpu() - entity.cpu,
+                                          resource.get_idle_memory() - entity.memory, _weights)
+
+        def _negative_residual(resource, entity):
+            return -_residual(resource, entity)
+
+        for entity in entities_sorted:
+            if fit == 'first_fit':
+                _placed = Greedy.deploy_iterate(entity, resources_sorted)
+            elif fit == 'best_fit':
+                _placed = Greedy.deploy_scored(
+                    entity, resources_sorted, _residual)
+            elif fit == 'worst_fit':
+                _placed = Greedy.deploy_scored(
+                    entity, resources_sorted, _negative_residual)
+            else:
+                raise NotImplementedError
+            if not _placed:
+                self.placement_errors.append(entity)
+
+    def greedy_min_nodes(self, entities, resources, fit='first_fit'):
+        """Bin packing heuristic that uses as few resources as possible. Workloads are
+        sorted by their normalized size (largest share of the largest resource in any
+        dimension) and placed on the already used resources, with first fit
+        (First-Fit-Decreasing), best fit (Best-Fit-Decreasing) or worst fit. A new
+        resource is only used if the workload fits none of them, larger resources first.
+
+        :param entities: deployment entities to place
+        :type entities: list
+        :param resources: resource entities to place the deployments on
+        :type resources: list
+        :param fit: placement strategy among the used resources, defaults to 'first_fit'
+        :type fit: str, optional
+        """
+        if len(resources) == 0:
+            self.placement_errors.extend(entities)
+            return
+
+        _max_cpu = max(r.cpu for r in resources) or 1
+        _max_memory = max(r.memory for r in resources) or 1
+
+        def _size(item):
+            return max(item.cpu / _max_cpu, item.memory / _max_memory)
+
+        def _residual(resource, entity):
+            return (resource.get_idle_cpu() - entity.cpu) / _max_cpu + \
+                (resource.get_idle_memory() - entity.memory) / _max_memory
+
+        def _negative_residual(resource, entity):
+            return -_residual(resource, entity)
+
+        _used = [r for r in resources if r.get_deployments()]
+        _unused = sorted((r for r in resources if not r.get_deployments()),
+                         key=lambda r: r.cpu / _max_cpu + r.memory / _max_memory, reverse=True)
+
+        for entity in sorted(entities, key=_size, reverse=True):
+            if fit == 'first_fit':
+                _placed = Greedy.deploy_iterate(entity, _used)
+            elif fit == 'best_fit':
+                _placed = Greedy.deploy_scored(entity, _used, _residual)
+            elif fit == 'worst_fit':
+                _placed = Greedy.deploy_scored(
+                    entity, _used, _negative_residual)
+            else:
+                raise NotImplementedError
+            if _placed:
+                continue
+
+            for i, resource in enumerate(_unused):
+                if resource.add_deployment(entity):
+                    _used.append(_unused.pop(i))
+                    break
+            else:
+                self.placement_errors.append(entity)
+
+    def greedy_attr_vectorized(self, entities, resources, attr, fit='first_fit'):
+        """Array backed variant of :meth:`greedy_attr` and :meth:`greedy_vector`. Idle resources are held in
+        NumPy arrays and the target resource of each workload is selected with
+        vectorized masks. The arrays are updated with the same float operations
+        as the resource entities, therefore the placements are identical.
+        """
+        import numpy as np
+
+        if attr in Greedy.VECTOR_TARGETS:
+            _weights = Greedy.get_vector_weights(entities, resources, attr)
+            entities_sorted = Greedy.sort_by_vector(entities, attr, _weights)
+            resources_sorted = Greedy.sort_by_vector(resources, attr, _weights)
+        else:
+            entities_sorted = Greedy.sort_by_attr(entities, attr)
+            resources_sorted = Greedy.sort_by_attr(resources, attr)
+
+        if len(resources_sorted) == 0:
+            self.placement_errors.extend(entities_sorted)
+            return
+
+        _idle_cpu = np.array([r.get_idle_cpu()
+                              for r in resources_sorted], dtype=np.float64)
+        _idle_memory = np.array([r.get_idle_memory()
+                                 for r in resources_sorted], dtype=np.float64)
+        _dep_cpu = np.array([e.cpu for e in entities_sorted], dtype=np.float64)
+        _dep_memory = np.array([e.memory for e in entities_sorted],
+                               dtype=np.float64)
+
+        def _residual(j):
+            if attr == 'cpu':
+                return _idle_cpu - _dep_cpu[j]
+            elif attr == 'memory':
+                return _idle_memory - _dep_memory[j]
+            elif attr == 'dominant_resource':
+                return np.maximum((_idle_cpu - _dep_cpu[j]) * _weights[0],
+                                  (_idle_memory - _dep_memory[j]) * _weights[1])
+            elif attr in Greedy.VECTOR_TARGETS:
+                return Greedy.get_vector_size(
+                    attr, _idle_cpu - _dep_cpu[j], _idle_memory - _dep_memory[j], _weights)
+            else:
+                raise NotImplementedError
+
+        for j, entity in enumerate(entities_sorted):
+            _fits = ((_idle_cpu - _dep_cpu[j]) >= 0) & \
+                ((_idle_memory - _dep_memory[j]) >= 0)
+
+            if not _fits.any():
+                self.placement_errors.append(entity)
+                continue
+
+            if fit == 'first_fit':
+                i = int(np.argmax(_fits))
+            elif fit == 'best_fit':
+                i = int(np.argmin(np.where(_fits, _residual(j), np.inf)))
+            elif fit == 'worst_fit':
+                i = int(np.argmax(np.where(_fits, _residual(j), -np.inf)))
+            else:
+                raise NotImplementedError
+
+            resources_sorted[i].add_deployment(entity)
+            _idle_cpu[i] -= _dep_cpu[j]
+            _idle_memory[i] -= _dep_memory[j]
+
     def do_matching(self, deployment_entities, resources):
         """Does actual deployment to resource matching
         """
 
-        self.greedy_attr(
-            deployment_entities,
-            resources,
-            self.config.get_setting('target').get_value().value
-        )
+        _attr = self.config.get_setting('target').get_value().value
+        _fit = self.config.get_setting('fit').get_value().value
+
+        if _attr == 'min_nodes':
+            # no vectorized variant, the used resources change during the placement
+            self.greedy_min_nodes(deployment_entities, resources, _fit)
+        elif self.config.get_setting('engine').get_value().value == 'numpy':
+            self.greedy_attr_vectorized(
+                deployment_entities, resources, _attr, _fit)
+        elif _attr in Greedy.VECTOR_TARGETS:
+            self.greedy_vector(deployment_entities, resources, _attr, _fit)
+        else:
+            self.greedy_attr(deployment_entities, resources, _attr, _fit)
 
     def match(self):
         super(Greedy, self).match()
@@ -0,0 +1,130 @@
+import time
+
+import click
+
+from continuum_deployer.solving.greedy import Greedy
+from continuum_deployer.solving.sat import SAT
+from continuum_deployer.utils.config import Setting, SettingValue
+
+
+class Hybrid(SAT):
+    """Decomposition solver that places loose label groups with the Greedy solver and
+    only sends tight groups to the CP-SAT solver. The tightness of a group is the larger
+    share of requested cpu and memory in the idle resources of its suitable resources.
+    """
+
+    def __init__(self, deployment_entities, resources):
+        super().__init__(deployment_entities, resources)
+        # tightness and used solver per matching group
+        self.group_stats = []
+
+    def _gen_config(self):
+        _config = super()._gen_config()
+        _config.add_setting(Setting('tightness', [
+            SettingValue(
+                0.5, description='Groups that request up to 50% of their idle resources are placed greedily'),
+            SettingValue(
+                0.8, description='Groups that request up to 80% of their idle resources are placed greedily', default=True),
+            SettingValue(
+                0.9, description='Groups that request up to 90% of their idle resources are placed greedily'),
+            SettingValue(
+                1.0, description='All groups are placed greedily first, SAT only solves groups Greedy fails on'),
+        ]))
+        return _config
+
+    @staticmethod
+    def get_tightness(deployment_entities, resources):
+        """Helper that calculates the tightness of a matching group
+
+        :param deployment_entities: deployments of the group
+        :type deployment_entities: list
+        :param resources: suitable resources of the group
+        :type resources: list
+        :return: larger share of requested cpu and memory in the idle resources,
+            infinite if resources are requested but none are idle
+        :rtype: float
+        """
+        _tightness = 0
+        for demand, idle in [
+                (sum(d.cpu for d in deployment_entities),
+                 sum(r.get_idle_cpu() for r in resources)),
+                (sum(d.memory for d in deployment_entities),
+                 sum(r.get_idle_memory() for r in resources))]:
+            if demand <= 0:
+                continue
+            _tightness = max(_tightness, demand / idle if idle > 0 else float('inf'))
+        return _tightness
+
+    def _match_greedy(self, deployment_entities, resources):
+        """Helper that places a group with the Greedy solver, a partial placement is reverted
+
+        :param deployment_entities: deployments of the group
+        :type deployment_entities: list
+        :param resources: suitable resources of the group
+        :type resources: list
+        :return: True if all deployments were placed
+        :rtype: bool
+        """
+        _greedy = Greedy(deployment_entities, resources)
+        _setting = _greedy.get_config().get_setting('target')
+        _target = SAT.get_greedy_target(
+            self.config.get_setting('target').get_value().value)
+        _setting.set_value(
+            next(o for o in _setting.get_options() if o.value == _target))
+        _greedy.do_matching(deployment_entities, resources)
+        if not _greedy.get_placement_errors():
+            return True
+
+        _group = {id(d) for d in deployment_entities}
+        for resource in resources:
+            for deployment in [d for d in resource.get_deployments() if id(d) in _group]:
+                resource.remove_deployment(deployment)
+        return False
+
+    def do_matching(self, deployment_entities, resources):
+        """Places a matching group with the Greedy solver if its tightness is below the
+        threshold, otherwise or if the Greedy solver fails with the CP-SAT solver
+
+        :param deployment_entities: list of :class:`continuum_deployer.resources.deployment.DeploymentEntity` objects to place
+        :type deployment_entities: list
+        :param resources: list of :class:`continuum_deployer.resources.resource_entity.ResourceEntity` object to fill with deployments
+        :type resources: list
+        """
+        if len(deployment_entities) == 0:
+            return
+
+        _start = time.perf_counter()
+        _tightness = Hybrid.get_tightness(deployment_entities, resources)
+        _threshold = self.config.get_setting('tightness').get_value().value
+
+        _solver = 'sat'
+        if _tightness <= _threshold and self._match_greedy(deployment_entities, resources):
+            _solver = 'greedy'
+            self.instrumentation.count('groups_greedy')
+        else:
+            super().do_matching(deployment_entities, resources)
+
+        self.group_stats.append({
+            'deployments': len(deployment_entities),
+            'resources': len(resources),
+            'tightness': _tightness,
+            'solver': _solver,
+            'time': time.perf_counter() - _start,
+        })
+
+    def _get_worker_state(self):
+        return self.model_stats, self.group_stats
+
+    def _merge_worker_state(self, state):
+        self.model_stats.extend(state[0])
+        self.group_stats.extend(state[1])
+
+    def reset_matching(self):
+        super(Hybrid, self).reset_matching()
+        self.group_stats = []
+
+    def match(self):
+        super(Hybrid, self).match()
+        _greedy = sum(1 for s in self.group_stats if s['solver'] == 'greedy')
+        click.echo('Hybrid: {} of {} groups placed by Greedy, {} solved by SAT'.format(
+            _greedy, len(self.group_stats), len(self.group_stats) - _greedy), err=True)
@@ -1,9 +1,12 @@
+import math
+import time
 import click
 
 from continuum_deployer.resources.resource_entity import ResourceEntity
 from ortools.sat.python import cp_model
 
 
+from continuum_deployer.solving.greedy import Greedy
 from continuum_deployer.solving.solver import Solver
 from continuum_deployer.resources.deployment import DeploymentEntity
 from continuum_deployer.resources.resources import Resources, ResourceEntity
@@ -13,6 +16,9 @@ class CB(cp_model.CpSolverSolutionCallback):
     def __init__(self, solver):
         cp_model.CpSolverSolutionCallback.__init__(self)
         self.solver = solver
+        # wall time of the search until the first solution was found
+        self.first_solution_time = None
+        self.start_time = time.perf_counter()
 
     def on_solution_callback(self):
         # When this callback is called, the status is either FEASIBLE or OPTIMAL.
@@ -20,7 +26,9 @@ class CB(cp_model.CpSolverSolutionCallback):
         # assume (heuristically) FEASIBLE. If it is OPTIMAL, the code below would
         # anyway output a status message and we parse OPTIMAL with higher priority
         # in the log analysis.
-        print("status: LIKELY-FEASIBLE")
+        if self.first_solution_time is None:
+            self.first_solution_time = time.perf_counter() - self.start_time
+        click.echo("status: LIKELY-FEASIBLE", err=True)
 
 class SAT(Solver):
 
@@ -30,6 +38,8 @@ class SAT(Solver):
                  deployment_entities: DeploymentEntity,
                  resources: Resources):
         super().__init__(deployment_entities, resources)
+        # size and build time of the models created per matching group
+        self.model_stats = []
 
     @staticmethod
     def scale_cpu_values(entities, idle=False):
@@ -71,92 +81,547 @@ class SAT(Solver):
                 SettingValue(
                     'min_idle_memory', description='SAT solver tries to minimize idle memory resources'),
                 SettingValue(
-                    'min_idle_resources', description='SAT solver tries to minimize idle resources (cpu+memory)'),
+                    'min_idle_resources', description='SAT solver tries to minimize idle resources (cpu+memory) of the used nodes'),
                 SettingValue(
-                    'max_idle_resources', description='SAT solver tries to maximize idle resources (cpu+memory)'),
+                    'max_idle_resources', description='SAT solver tries to maximize idle resources (cpu+memory) of the used nodes'),
+                SettingValue(
+                    'min_nodes', description='SAT solver tries to minimize the number of used nodes'),
+            ]),
+            Setting('max_time', [
+                SettingValue(
+                    0, description='No time limit, solver searches until an optimal solution is found', default=True),
+                SettingValue(
+                    10, description='Stops search after 10 seconds and applies best solution found'),
+                SettingValue(
+                    60, description='Stops search after 60 seconds and applies best solution found'),
+                SettingValue(
+                    300, description='Stops search after 300 seconds and applies best solution found'),
+            ]),
+            Setting('workers', [
+                SettingValue(
+                    0, description='Number of search workers is chosen by the solver', default=True),
+                SettingValue(
+                    1, description='Single search worker, deterministic results'),
+                SettingValue(
+                    4, description='Four parallel search workers'),
+                SettingValue(
+                    8, description='Eight parallel search workers'),
+            ]),
+            Setting('relative_gap', [
+                SettingValue(
+                    0.0, description='Search until the solution is proven optimal', default=True),
+                SettingValue(
+                    0.01, description='Stops search if solution is within 1% of the best bound'),
+                SettingValue(
+                    0.05, description='Stops search if solution is within 5% of the best bound'),
+            ]),
+            Setting('objective_mode', [
+                SettingValue(
+                    'lexicographic', description='Combined targets optimize cpu first and memory second', default=True),
+                SettingValue(
+                    'weighted', description='Combined targets optimize the sum of the normalized cpu and memory shares'),
+            ]),
+            Setting('warm_start', [
+                SettingValue(
+                    'none', description='Search starts without an initial solution', default=True),
+                SettingValue(
+                    'greedy', description='Placement of the Greedy solver is used as solution hint'),
             ])
         ])
 
+    @staticmethod
+    def group_equivalent(keys):
+        """Helper function that groups indices of equal keys, e.g. to find
+        interchangeable deployments or resources. Groups are ordered by
+        the first appearance of their key.
+
+        :param keys: list of hashable keys
+        :type keys: list
+        :return: list of index lists, one per distinct key
+        :rtype: list
+        """
+        _groups = dict()
+        for index, key in enumerate(keys):
+            _groups.setdefault(key, []).append(index)
+        return list(_groups.values())
+
+    @staticmethod
+    def _max_fitting(amount, demand, capacity):
+        """Helper that calculates how many units of a demand fit into a capacity
+
+        :param amount: number of available units
+        :type amount: int
+        :param demand: demand of a single unit
+        :type demand: int
+        :param capacity: available capacity
+        :type capacity: int
+        :return: maximum number of units that fit
+        :rtype: int
+        """
+        if demand <= 0:
+            return amount if capacity >= 0 else 0
+        return min(amount, max(capacity, 0) // demand)
+
     def do_matching(self, deployment_entities, resources):
         """Actual solver implementation. Uses constraint programming to find an optimal solution
         for the deployment placing task.
 
+        Equal deployments (e.g. replicas) are combined to classes that are modelled as
+        integer counts per resource. Orderings between equal resources are excluded
+        by symmetry breaking constraints.
+
         :param deployment_entities: list of :class:`continuum_deployer.resources.deployment.DeploymentEntity` objects to place
         :type deployment_entities: list
         :param resources: list of :class:`continuum_deployer.resources.resource_entity.ResourceEntity` object to fill with deployments
         :type resources: list
         """
 
+        if len(deployment_entities) == 0:
+            return
+
+        _build_start = time.perf_counter()
+
         _model = cp_model.CpModel()
 
         _res_scaled_cpu = SAT.scale_cpu_values(resources, idle=True)
+        _res_memory = [int(res.get_idle_memory()) for res in resources]
         _dep_scaled_cpu = SAT.scale_cpu_values(deployment_entities)
+        _dep_memory = [int(dep.memory) for dep in deployment_entities]
 
-        iter_resources = range(len(_res_scaled_cpu))
-        iter_deployment = range(len(_dep_scaled_cpu))
+        # deployments with equal requests are interchangeable, all labels are equal within a group
+        _classes = SAT.group_equivalent(list(zip(_dep_scaled_cpu, _dep_memory)))
+        _class_cpu = [_dep_scaled_cpu[c[0]] for c in _classes]
+        _class_memory = [_dep_memory[c[0]] for c in _classes]
 
         # Variables
-        x = []
-        for i in iter_resources:
-            t = []
-            for j in iter_deployment:
-                t.append(_model.NewBoolVar('x[%i,%i]' % (i, j)))
-            x.append(t)
+        # number of deployments of class k placed on resource i, only created
+        # for pairs where at least one deployment fits the idle resources
+        x = dict()
+        _bounds = dict()
+        _class_vars = [[] for _ in _classes]
+        _resource_vars = [[] for _ in resources]
+        for k, _class in enumerate(_classes):
+            for i in range(len(resources)):
+                _bound = min(
+                    SAT._max_fitting(len(_class), _class_cpu[k], _res_scaled_cpu[i]),
+                    SAT._max_fitting(len(_class), _class_memory[k], _res_memory[i]))
+                if _bound == 0:
+                    continue
+                if len(_class) == 1:
+                    x[i, k] = _model.NewBoolVar('x[%i,%i]' % (i, k))
+                else:
+                    x[i, k] = _model.NewIntVar(0, _bound, 'x[%i,%i]' % (i, k))
+                _bounds[i, k] = _bound
+                _class_vars[k].append(x[i, k])
+                _resource_vars[i].append(k)
+
+        # a deployment without any candidate makes the whole group infeasible
+        if not all(_class_vars):
+            self.placement_errors.extend(deployment_entities)
+            return
 
         # Constraints
 
         # Each task is assigned to exactly one worker.
-        [_model.Add(sum(x[i][j] for i in iter_resources) == 1)
-         for j in iter_deployment]
+        for k, _class in enumerate(_classes):
+            if len(_class) == 1:
+                _model.AddExactlyOne(_class_vars[k])
+            else:
+                _model.Add(cp_model.LinearExpr.Sum(
+                    _class_vars[k]) == len(_class))
 
         # Each node is not overcommitted
-        for i in iter_resources:
-            _model.Add(sum(_dep_scaled_cpu[j] * x[i][j]
-                           for j in iter_deployment) <= _res_scaled_cpu[i])
-            _model.Add(sum(ent.memory * x[i][j]
-                           for j, ent in enumerate(deployment_entities)) <= resources[i].get_idle_memory())
-
-        # Objective: overall idle resources
-        idle_cpu = _model.NewIntVar(
-            0, sum(_res_scaled_cpu[i] for i in iter_resources), 'idle_cpu')
-        idle_ram = _model.NewIntVar(
-            0, sum(res.get_idle_memory() for i, res in enumerate(resources)), 'idle_ram')
-        _model.Add(idle_cpu == sum(_res_scaled_cpu[i] for i in iter_resources) - sum(
-            x[i][j] * _dep_scaled_cpu[j] for j in iter_deployment for i in iter_resources))
-        _model.Add(idle_ram == sum(res.get_idle_memory() for i, res in enumerate(resources)) - sum(
-            x[i][j] * dep.memory for j, dep in enumerate(deployment_entities) for i in iter_resources))
+        _resource_load = []
+        for i, _deployment_classes in enumerate(_resource_vars):
+            if not _deployment_classes:
+                _resource_load.append(None)
+                continue
+            _vars = [x[i, k] for k in _deployment_classes]
+            _model.Add(cp_model.LinearExpr.WeightedSum(
+                _vars, [_class_cpu[k] for k in _deployment_classes]) <= _res_scaled_cpu[i])
+            _model.Add(cp_model.LinearExpr.WeightedSum(
+                _vars, [_class_memory[k] for k in _deployment_classes]) <= _res_memory[i])
+            _resource_load.append(cp_model.LinearExpr.WeightedSum(
+                _vars, [_class_cpu[k] + _class_memory[k] for k in _deployment_classes]))
+
+        # Symmetry breaking: equal resources are ordered by their load. Resources
+        # used by earlier groups are not interchangeable with empty ones of the same
+        # idle resources for the usage based targets and are grouped separately.
+        _equal_groups = SAT.group_equivalent(list(zip(
+            _res_scaled_cpu, _res_memory, [bool(r.get_deployments()) for r in resources])))
+        for _equal_resources in _equal_groups:
+            for i, i_next in zip(_equal_resources, _equal_resources[1:]):
+                if _resource_load[i] is not None:
+                    _model.Add(_resource_load[i] >= _resource_load[i_next])
+
+        # Objective: idle resources
+        _vars = list(x.values())
+        _placed_cpu = cp_model.LinearExpr.WeightedSum(
+            _vars, [_class_cpu[k] for (i, k) in x])
+        _placed_memory = cp_model.LinearExpr.WeightedSum(
+            _vars, [_class_memory[k] for (i, k) in x])
+        _total_cpu = sum(_res_scaled_cpu)
+        _total_memory = sum(_res_memory)
 
         # read config and set optimization target
         _target = self.config.get_setting('target').get_value().value
-        if _target == 'max_idle_cpu':
-            _model.Maximize(idle_cpu)
-        elif _target == 'max_idle_memory':
-            _model.Maximize(idle_ram)
-        elif _target == 'min_idle_cpu':
-            _model.Minimize(idle_cpu)
-        elif _target == 'min_idle_memory':
-            _model.Minimize(idle_ram)
-        elif _target == 'min_idle_resources':
-            _model.Minimize(idle_ram)
-            _model.Minimize(idle_cpu)
-        elif _target == 'max_idle_resources':
-            _model.Maximize(idle_ram)
-            _model.Maximize(idle_cpu)
+        _minimize = _target.startswith('min_')
+        u = dict()
+        if _target in ['min_idle_resources', 'max_idle_resources', 'min_nodes']:
+            # unused resources can be powered down
+            u = self._add_usage_indicators(
+                _model, x, _bounds, _resource_vars, resources,
+                [_res_scaled_cpu, _res_memory], [_class_cpu, _class_memory])
+            # equal empty resources are already ordered by their load, used ones come first
+            for _equal_resources in _equal_groups:
+                _indicators = [u[i] for i in _equal_resources if i in u]
+                for _u, _u_next in zip(_indicators, _indicators[1:]):
+                    _model.Add(_u >= _u_next)
+
+        if _target in ['min_idle_resources', 'max_idle_resources']:
+            # idle resources of the used resources
+            _used = [i for i, r in enumerate(resources) if r.get_deployments()]
+            idle_cpu = cp_model.LinearExpr.WeightedSum(
+                list(u.values()), [_res_scaled_cpu[i] for i in u]) \
+                + sum(_res_scaled_cpu[i] for i in _used) - _placed_cpu
+            idle_ram = cp_model.LinearExpr.WeightedSum(
+                list(u.values()), [_res_memory[i] for i in u]) \
+                + sum(_res_memory[i] for i in _used) - _placed_memory
+        else:
+            # overall idle resources
+            idle_cpu = _total_cpu - _placed_cpu
+            idle_ram = _total_memory - _placed_memory
+
+        if _target == 'min_nodes':
+            # resources used by earlier groups are a constant part
+            _objectives = [cp_model.LinearExpr.Sum(list(u.values()))]
+        elif _target.endswith('_cpu'):
+            _objectives = [idle_cpu]
+        elif _target.endswith('_memory'):
+            _objectives = [idle_ram]
+        elif self.config.get_setting('objective_mode').get_value().value == 'weighted':
+            # both shares of idle resources weighted equally, the normalization by the
+            # total resources is multiplied out to keep integer coefficients
+            _gcd = math.gcd(_total_cpu, _total_memory) or 1
+            _objectives = [idle_cpu * (_total_memory // _gcd or 1)
+                           + idle_ram * (_total_cpu // _gcd or 1)]
+        else:
+            # lexicographic, cpu first
+            _objectives = [idle_cpu, idle_ram]
+
+        _hints = self.hints
+        _warm_start_time = None
+        if self.config.get_setting('warm_start').get_value().value == 'greedy':
+            _warm_start = time.perf_counter()
+            # hints of the solver (e.g. previous placements) take precedence
+            _hints = {**self._get_greedy_hints(deployment_entities, resources,
+                                               SAT.get_greedy_target(_target)),
+                      **self.hints}
+            _warm_start_time = time.perf_counter() - _warm_start
+        _num_hints = self._add_hints(
+            _model, x, _bounds, _classes, deployment_entities, resources, _hints,
+            _equal_groups, [c + m for c, m in zip(_class_cpu, _class_memory)])
+
+        self._report_model(_model, len(deployment_entities), len(resources), len(x),
+                           time.perf_counter() - _build_start)
+        self.model_stats[-1]['hints'] = _num_hints
+        self.model_stats[-1]['warm_start_time'] = _warm_start_time
+
+        if _warm_start_time is not None:
+            self.instrumentation.add_time('warm_start', _warm_start_time)
+        with self.instrumentation.timer('search'):
+            _phases, _solution, _first_solution_time = self._solve_objectives(
+                _model, _objectives, _minimize, _vars + list(u.values()))
+        if _solution is None:
+            _status = _phases[-1]
+        elif len(_phases) == len(_objectives) and set(_phases) == {'OPTIMAL'}:
+            _status = 'OPTIMAL'
+        else:
+            _status = 'FEASIBLE'
+        self.model_stats[-1]['status'] = _status
+        self.model_stats[-1]['phases'] = _phases
+        self.model_stats[-1]['time_to_first_feasible'] = _first_solution_time
+        self.instrumentation.count('groups_{}'.format(_status.lower()))
+        if _first_solution_time is not None:
+            self.instrumentation.add_time('first_feasible', _first_solution_time)
+            click.echo('First feasible solution found after {:.3f}s'.format(
+                _first_solution_time), err=True)
+
+        if _status == 'FEASIBLE':
+            click.echo(click.style(
+                '[Warning] Search stopped before optimality was proven, applying best solution found.', fg='yellow'), err=True)
+
+        if _solution is not None:
+            # expand class counts to the actual deployment entities
+            _pending = [iter(_class) for _class in _classes]
+            for (i, k), value in zip(x, _solution):
+                for _ in range(value):
+                    _deployment = deployment_entities[next(_pending[k])]
+                    # the scaled integer requests of the model can differ slightly
+                    # from the actual requests
+                    if not resources[i].add_deployment(_deployment):
+                        self.placement_errors.append(_deployment)
+        else:
+            # infeasible or no solution found within the time limit
+            self.placement_errors.extend(deployment_entities)
+
+    def _solve_objectives(self, model, objectives, minimize, variables):
+        """Helper that solves the model for one or more objectives in lexicographic order.
+        The model is reused between the phases: after each phase the objective is bound
+        to the best value found and the solution is passed as hint to the next phase.
+        The time limit applies to all phases together and is shared equally.
+
+        :param model: the model to solve
+        :type model: :class:`ortools.sat.python.cp_model.CpModel`
+        :param objectives: objectives in order of priority
+        :type objectives: list
+        :param minimize: flag to minimize instead of maximize the objectives
+        :type minimize: bool
+        :param variables: variables whose values are returned and hinted
+        :type variables: list
+        :return: status name per solved phase, values of the variables in the last
+            solution or None and the time until the first solution was found
+        :rtype: tuple
+        """
+        _start = time.perf_counter()
+        _max_time = self.config.get_setting('max_time').get_value().value
+        _phases = []
+        _solution = None
+        _first_solution_time = None
+
+        for phase, objective in enumerate(objectives):
+            if minimize:
+                model.Minimize(objective)
+            else:
+                model.Maximize(objective)
+
+            solver = self._gen_cp_solver()
+            if _max_time > 0:
+                # remaining time is shared equally by the remaining phases
+                _remaining = _max_time - (time.perf_counter() - _start)
+                if _remaining <= 0:
+                    break
+                solver.parameters.max_time_in_seconds = _remaining / \
+                    (len(objectives) - phase)
+
+            cb = CB(solver)
+            status = solver.Solve(model, cb)
+            _phases.append(solver.StatusName(status))
+            if phase == 0:
+                _first_solution_time = cb.first_solution_time
+            click.echo(solver.ResponseStats(), err=True)
+
+            if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                break
+            _solution = [solver.Value(var) for var in variables]
 
+            if phase + 1 < len(objectives):
+                _best = solver.Value(objective)
+                if minimize:
+                    model.Add(objective <= _best)
+                else:
+                    model.Add(objective >= _best)
+                model.ClearHints()
+                for var, value in zip(variables, _solution):
+                    model.AddHint(var, value)
+
+        return _phases, _solution, _first_solution_time
+
+    @staticmethod
+    def _add_usage_indicators(model, x, bounds, resource_vars, resources, capacities, demands):
+        """Helper that adds an indicator per resource that is true if the resource
+        is used by at least one deployment of the model. Resources that host
+        deployments already or have no assignment variables get no indicator.
+        The capacities of unused resources are bound to zero, which is a
+        tighter formulation than bounding the number of assignments only.
+
+        :param model: the model to add the indicators to
+        :type model: :class:`ortools.sat.python.cp_model.CpModel`
+        :param x: assignment variables by (resource, class) index
+        :type x: dict
+        :param bounds: upper bounds of the assignment variables by (resource, class) index
+        :type bounds: dict
+        :param resource_vars: class indices with assignment variables per resource
+        :type resource_vars: list
+        :param resources: resources of the model
+        :type resources: list
+        :param capacities: list of capacities per resource for each dimension (e.g. cpu and memory)
+        :type capacities: list
+        :param demands: list of demands per class for each dimension, same order as the capacities
+        :type demands: list
+        :return: usage indicators by resource index
+        :rtype: dict
+        """
+        u = dict()
+        for i, _deployment_classes in enumerate(resource_vars):
+            if not _deployment_classes or resources[i].get_deployments():
+                continue
+            u[i] = model.NewBoolVar('u[%i]' % i)
+            _vars = [x[i, k] for k in _deployment_classes]
+            for var, k in zip(_vars, _deployment_classes):
+                model.Add(var <= bounds[i, k] * u[i])
+            for _capacity, _demand in zip(capacities, demands):
+                model.Add(cp_model.LinearExpr.WeightedSum(
+                    _vars, [_demand[k] for k in _deployment_classes]) <= _capacity[i] * u[i])
+            model.Add(cp_model.LinearExpr.Sum(_vars) >= u[i])
+        return u
+
+    @staticmethod
+    def get_greedy_target(target):
+        """Helper that returns the target of the Greedy solver that comes closest to the
+        given target. The single dimension targets count the idle resources of all nodes,
+        which is the same for every placement of all deployments.
+
+        :param target: target of the SAT solver
+        :type target: str
+        :return: target of the Greedy solver
+        :rtype: str
+        """
+        if target in ['min_nodes', 'min_idle_resources']:
+            return 'min_nodes'
+        return 'cpu'
+
+    @staticmethod
+    def _get_greedy_hints(deployment_entities, resources, target='cpu'):
+        """Helper that runs the Greedy solver on copies of the idle resources
+        to get an initial placement quickly
+
+        :param deployment_entities: deployments to place
+        :type deployment_entities: list
+        :param resources: resources to place the deployments on
+        :type resources: list
+        :param target: target of the Greedy solver, defaults to 'cpu'
+        :type target: str, optional
+        :return: resource name per placed deployment name
+        :rtype: dict
+        """
+        _copies = [ResourceEntity(name=r.name, memory=r.get_idle_memory(),
+                                  cpu=r.get_idle_cpu(), labels=r.labels) for r in resources]
+        _greedy = Greedy(deployment_entities, _copies)
+        _setting = _greedy.get_config().get_setting('target')
+        _setting.set_value(
+            next(o for o in _setting.get_options() if o.value == target))
+        _greedy.do_matching(deployment_entities, _copies)
+        return {d.name: r.name for r in _copies for d in r.get_deployments()}
+
+    def _add_hints(self, model, x, bounds, classes, deployment_entities, resources, hints,
+                   equal_groups, class_load):
+        """Helper that adds placement hints as CP-SAT solution hints.
+        Only classes with at least one hinted deployment are hinted. The hinted
+        assignments of equal resources are reordered by their load, otherwise the
+        hint would contradict the symmetry breaking constraints.
+
+        :param model: the model to add the hints to
+        :type model: :class:`ortools.sat.python.cp_model.CpModel`
+        :param x: assignment variables by (resource, class) index
+        :type x: dict
+        :param bounds: upper bounds of the assignment variables by (resource, class) index
+        :type bounds: dict
+        :param classes: deployment indices per class
+        :type classes: list
+        :param deployment_entities: deployments of the model
+        :type deployment_entities: list
+        :param resources: resources of the model
+        :type resources: list
+        :param hints: resource name per deployment name
+        :type hints: dict
+        :param equal_groups: resource indices per group of equal resources
+        :type equal_groups: list
+        :param class_load: load of a single deployment per class, as used for the symmetry breaking
+        :type class_load: list
+        :return: number of hinted deployments
+        :rtype: int
+        """
+        if not hints:
+            return 0
+
+        _resource_index = {r.name: i for i, r in enumerate(resources)}
+        _counts = dict()
+        _hinted_classes = set()
+        for k, _class in enumerate(classes):
+            for j in _class:
+                i = _resource_index.get(
+                    hints.get(deployment_entities[j].name))
+                if i is not None and (i, k) in x:
+                    _counts[i, k] = _counts.get((i, k), 0) + 1
+                    _hinted_classes.add(k)
+
+        _assignments = [dict() for _ in resources]
+        for (i, k), count in _counts.items():
+            _assignments[i][k] = count
+        for _equal_resources in equal_groups:
+            _sorted = sorted((_assignments[i] for i in _equal_resources),
+                             key=lambda a: sum(class_load[k] * n for k, n in a.items()), reverse=True)
+            for i, _assignment in zip(_equal_resources, _sorted):
+                for k, count in _assignment.items():
+                    _counts[i, k] = count
+                for k in set(_assignments[i]) - set(_assignment):
+                    del _counts[i, k]
+
+        for (i, k), var in x.items():
+            if k in _hinted_classes:
+                model.AddHint(var, min(_counts.get((i, k), 0), bounds[i, k]))
+        return sum(_counts.values())
+
+    def _gen_cp_solver(self):
+        """Helper that creates a CP-SAT solver configured with the current search limits
+
+        :return: configured solver
+        :rtype: :class:`ortools.sat.python.cp_model.CpSolver`
+        """
         solver = cp_model.CpSolver()
-        #status = solver.Solve(_model)
-        cb = CB(solver)
-        status = solver.SolveWithSolutionCallback(_model, cb)
-
-        if status == cp_model.OPTIMAL:
-            for i, res in enumerate(resources):
-                for j, dep in enumerate(deployment_entities):
-                    if solver.Value(x[i][j]) == 1:
-                        res.add_deployment(dep)
-        elif status == cp_model.INFEASIBLE:
-            self.placement_errors = deployment_entities
-
-        print(solver.ResponseStats())
+
+        _max_time = self.config.get_setting('max_time').get_value().value
+        if _max_time > 0:
+            solver.parameters.max_time_in_seconds = float(_max_time)
+        _workers = self.config.get_setting('workers').get_value().value
+        if _workers > 0:
+            solver.parameters.num_search_workers = _workers
+        solver.parameters.relative_gap_limit = float(
+            self.config.get_setting('relative_gap').get_value().value)
+
+        return solver
+
+    def _report_model(self, model, num_deployments, num_resources, num_assignments, build_time):
+        """Helper that records and prints size and build time of a CP-SAT model
+
+        :param model: the built model
+        :type model: :class:`ortools.sat.python.cp_model.CpModel`
+        :param num_deployments: number of deployments in the model
+        :type num_deployments: int
+        :param num_resources: number of resources in the model
+        :type num_resources: int
+        :param num_assignments: number of deployment class to resource assignment variables
+        :type num_assignments: int
+        :param build_time: model build time in seconds
+        :type build_time: float
+        """
+        _proto = model.Proto()
+        _stats = {
+            'deployments': num_deployments,
+            'resources': num_resources,
+            'variables': len(_proto.variables),
+            'constraints': len(_proto.constraints),
+            # number of assignment variables, which dominates the model memory footprint
+            'assignments': num_assignments,
+            'build_time': build_time,
+        }
+        self.model_stats.append(_stats)
+        self.instrumentation.add_time('model_build', build_time)
+        for name in ['variables', 'constraints', 'assignments']:
+            self.instrumentation.count('model_{}'.format(name), _stats[name])
+        click.echo(('Model: {deployments} deployments x {resources} resources, {variables} variables, '
+                    '{constraints} constraints, {assignments} assignments, built in {build_time:.3f}s').format(**_stats), err=True)
+
+    def _get_worker_state(self):
+        return self.model_stats
+
+    def _merge_worker_state(self, state):
+        self.model_stats.extend(state)
+
+    def reset_matching(self):
+        super(SAT, self).reset_matching()
+        self.model_stats = []
 
     def match(self):
         super(SAT, self).match()
@@ -1,12 +1,17 @@
 import click
+import os
+import pickle
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from yapsy.IPlugin import IPlugin
 
 from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.label_index import LabelIndex
 from continuum_deployer.resources.resources import Resources, ResourceEntity
 from continuum_deployer.utils.config import Config, Setting, SettingValue
 from continuum_deployer.utils.exceptions import SolverError
+from continuum_deployer.utils.instrumentation import Instrumentation
 
 
 class Solver(IPlugin):
@@ -21,8 +26,23 @@ class Solver(IPlugin):
         self.grouped_deployments = None
         self.grouped_resources = None
         self.placement_errors = []
+        # label index over self.resources, built on first use
+        self.label_index = None
+        # preferred resource name per deployment name, solvers may use them
+        # as starting point of their search (e.g. the previous placement)
+        self.hints = dict()
+        # stage timers and counters of the matching runs
+        self.instrumentation = Instrumentation()
 
         self.config = self._gen_config()
+        # general settings are added to the solver specific ones
+        if self.config.get_setting('parallel') is None:
+            self.config.add_setting(Setting('parallel', [
+                SettingValue(
+                    'off', description='Solves label groups one after another', default=True),
+                SettingValue(
+                    'processes', description='Solves independent label groups in a process pool'),
+            ]))
 
     def _gen_config(self):
         """Generates the default configuration for the solver
@@ -121,6 +141,23 @@ class Solver(IPlugin):
             data[token] = []
         return data
 
+    @staticmethod
+    def _labels_match(resource, labels):
+        """Helper function that checks if a resource has all of the given labels
+
+        :param resource: resource to check
+        :type resource: :class:`continuum_deployer.resources.resource_entity.ResourceEntity`
+        :param labels: labels the resource must have, None matches every resource
+        :type labels: dict
+        :return: check result
+        :rtype: bool
+        """
+        if labels is None:
+            return True
+        if resource.labels is None:
+            return False
+        return labels.items() <= resource.labels.items()
+
     def _get_suitable_resources(self, resources, labels):
         """Helper function that returns resources that have all of the given resources
 
@@ -131,11 +168,13 @@ class Solver(IPlugin):
         :return: list of resources that have all given labels assigned to them
         :rtype: list
         """
+        if resources is self.resources:
+            return self.get_label_index().get_resources(labels)
+
         _suitable_resources = []
         for resource in resources:
-            if resource.labels is not None:
-                if labels.items() <= resource.labels.items():
-                    _suitable_resources.append(resource)
+            if Solver._labels_match(resource, labels):
+                _suitable_resources.append(resource)
         return _suitable_resources
 
     def group(self, entities):
@@ -171,14 +210,23 @@ class Solver(IPlugin):
         """Main matcher method that invokes some preflight checks
         and starts the label based grouped matching
         """
-        self.check_upper_bound(self.deployment_entities, self.resources)
-        self.match_labeled()
-
-    def match_labeled(self):
-        """Handles group based label matching. Functions calls actual solver implementation do_matching()
-        multiple times and takes care of the deployment constrains enforced by the assigned labels.
+        with self.instrumentation.timer('solve'):
+            self.check_upper_bound(self.deployment_entities, self.resources)
+            self.match_labeled()
+
+    def _get_matching_groups(self, deployments=None):
+        """Helper function that groups deployments by their labels and looks up
+        the suitable resources of each group. Labeled groups are ordered by their
+        token and followed by the unlabeled group.
+
+        :param deployments: deployments to group, defaults to all deployment entities
+        :type deployments: list, optional
+        :return: list of tuples with deployments and suitable resources in solving order
+        :rtype: list
         """
-        self.grouped_deployments = self.group(self.deployment_entities)
+        if deployments is None:
+            deployments = self.deployment_entities
+        self.grouped_deployments = self.group(deployments)
         self.grouped_resources = self.group(self.resources)
 
         _unlabeled_deployments = []
@@ -187,6 +235,7 @@ class Solver(IPlugin):
             _unlabeled_deployments = self.grouped_deployments.pop(
                 self.UNLABELED_TOKEN)
 
+        _groups = []
         for token in sorted(self.grouped_deployments.keys()):
             # get group labels in dict form, first can be taken as they are equal throwout a group
             _group_labels = self.grouped_deployments[token][0].labels
@@ -194,12 +243,148 @@ class Solver(IPlugin):
             _suitable_resources = self._get_suitable_resources(
                 self.resources, _group_labels)
 
-            self.do_matching(
-                self.grouped_deployments[token], _suitable_resources)
+            _groups.append(
+                (self.grouped_deployments[token], _suitable_resources))
 
         # match unlabeled deployments
-        self.do_matching(
-            _unlabeled_deployments, self.resources)
+        _groups.append((_unlabeled_deployments, self.resources))
+
+        return _groups
+
+    @staticmethod
+    def split_components(groups):
+        """Helper function that splits matching groups into independent components.
+        Groups that share at least one suitable resource end up in the same component.
+
+        :param groups: list of tuples with deployments and suitable resources
+        :type groups: list
+        :return: list of components, each a list of group indices in original order
+        :rtype: list
+        """
+        _parents = list(range(len(groups)))
+
+        def _find(index):
+            while _parents[index] != index:
+                _parents[index] = _parents[_parents[index]]
+                index = _parents[index]
+            return index
+
+        _owner = dict()
+        for index, (_, resources) in enumerate(groups):
+            for resource in resources:
+                _other = _owner.setdefault(id(resource), index)
+                _parents[_find(_other)] = _find(index)
+
+        _components = dict()
+        for index in range(len(groups)):
+            _components.setdefault(_find(index), []).append(index)
+        return sorted(_components.values(), key=lambda c: c[0])
+
+    def match_labeled(self, deployments=None):
+        """Handles group based label matching. Functions calls actual solver implementation do_matching()
+        multiple times and takes care of the deployment constrains enforced by the assigned labels.
+
+        :param deployments: deployments to place, defaults to all deployment entities
+        :type deployments: list, optional
+        """
+        with self.instrumentation.timer('grouping'):
+            _groups = [g for g in self._get_matching_groups(
+                deployments) if g[0]]
+        self.instrumentation.count('groups', len(_groups))
+        self.instrumentation.count('deployments', sum(len(g[0]) for g in _groups))
+        _errors = len(self.placement_errors)
+        try:
+            self._match_groups(_groups)
+        finally:
+            self.instrumentation.count(
+                'placement_errors', len(self.placement_errors) - _errors)
+
+    def _match_groups(self, groups):
+        """Helper that solves the matching groups, either one after another
+        or independent components in a process pool
+
+        :param groups: list of tuples with deployments and suitable resources
+        :type groups: list
+        """
+        if self.config.get_setting('parallel').get_value().value == 'processes':
+            _components = Solver.split_components(groups)
+            # one process per cpu at most, a single component is solved in place
+            _workers = min(len(_components), os.cpu_count() or 1)
+            if _workers > 1:
+                try:
+                    pickle.dumps(type(self))
+                except (pickle.PicklingError, AttributeError):
+                    click.echo(click.style(
+                        '[Warning] Solver can not be used in a process pool, solving sequentially.',
+                        fg='yellow'), err=True)
+                else:
+                    self.match_components(groups, _components, _workers)
+                    return
+
+        for deployments, resources in groups:
+            with self.instrumentation.timer('solve_group'):
+                self.do_matching(deployments, resources)
+
+    def match_components(self, groups, components, max_workers=None):
+        """Solves independent components of matching groups in a process pool and
+        merges the resulting placements back into the resource entities.
+
+        :param groups: list of tuples with deployments and suitable resources
+        :type groups: list
+        :param components: list of components as returned by :meth:`split_components`
+        :type components: list
+        :param max_workers: number of worker processes, defaults to the number of
+            components but at most the number of cpus
+        :type max_workers: int, optional
+        """
+        if max_workers is None:
+            max_workers = min(len(components), os.cpu_count() or 1)
+        _jobs = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for component in components:
+                _deployments = [d for i in component for d in groups[i][0]]
+                _resources = list({id(r): r for i in component
+                                   for r in groups[i][1]}.values())
+                _resource_index = {id(r): n for n, r in enumerate(_resources)}
+                _component_groups = []
+                _offset = 0
+                for i in component:
+                    _size = len(groups[i][0])
+                    _component_groups.append((
+                        list(range(_offset, _offset + _size)),
+                        [_resource_index[id(r)] for r in groups[i][1]]))
+                    _offset += _size
+                _future = executor.submit(
+                    _match_component, type(self), self.config, self.hints,
+                    _deployments, _resources, _component_groups)
+                _jobs.append((_deployments, _resources, _future))
+
+            for _deployments, _resources, _future in _jobs:
+                _placements, _errors, _state, _instrumentation = _future.result()
+                for resource, placed in zip(_resources, _placements):
+                    for index in placed:
+                        resource.add_deployment(_deployments[index])
+                self.placement_errors.extend(
+                    _deployments[index] for index in _errors)
+                self._merge_worker_state(_state)
+                self.instrumentation.merge(_instrumentation)
+
+    def _get_worker_state(self):
+        """Returns solver specific state of a worker process that should be
+        merged into the main solver, e.g. statistics. Can be overwritten by solvers.
+
+        :return: picklable solver state
+        :rtype: object
+        """
+        return None
+
+    def _merge_worker_state(self, state):
+        """Merges the solver specific state of a worker process, see :meth:`_get_worker_state`
+
+        :param state: state returned by the worker solver
+        :type state: object
+        """
+        pass
 
     def reset_matching(self):
         """Resets current matching state of solver
@@ -211,6 +396,82 @@ class Solver(IPlugin):
         self.grouped_deployments = None
         self.grouped_resources = None
         self.placement_errors = []
+        self.hints = dict()
+
+    def resolve(self, delta):
+        """Incrementally updates the current matching with the given changes of the input.
+        Existing placements are kept as long as they are still valid, only deployments that
+        are new, changed or lost their resource and previous placement errors are placed again.
+        The previous resources of these deployments are passed as hints to the solver.
+
+        :param delta: changes of resources and deployments since the last matching
+        :type delta: :class:`continuum_deployer.solving.delta.SolverDelta`
+        :raises SolverError: raised if a pending deployment exceeds the largest resource
+        :return: deployments that had to be placed again
+        :rtype: list
+        """
+        _previous = {d.name: r.name for r in self.resources
+                     for d in r.get_deployments()}
+
+        # resources, deployments of changed resources stay if they still fit
+        _removed = {r.name for r in delta.removed_resources}
+        _changed = {r.name: r for r in delta.changed_resources}
+        _resources = []
+        for resource in self.resources:
+            if resource.name in _removed:
+                continue
+            if resource.name in _changed:
+                _new = _changed[resource.name]
+                for deployment in resource.get_deployments():
+                    if Solver._labels_match(_new, deployment.labels):
+                        _new.add_deployment(deployment)
+                resource = _new
+            _resources.append(resource)
+        _resources.extend(delta.added_resources)
+
+        # deployments, changed deployments stay on their resource if they still fit
+        _placed = {id(d): r for r in _resources for d in r.get_deployments()}
+        _removed = {d.name for d in delta.removed_deployments}
+        _changed = {d.name: d for d in delta.changed_deployments}
+        _deployments = []
+        for deployment in self.deployment_entities:
+            _resource = _placed.get(id(deployment))
+            if deployment.name in _removed:
+                if _resource is not None:
+                    _resource.remove_deployment(deployment)
+                continue
+            if deployment.name in _changed:
+                _new = _changed[deployment.name]
+                if _resource is not None:
+                    _resource.remove_deployment(deployment)
+                    if Solver._labels_match(_resource, _new.labels):
+                        _resource.add_deployment(_new)
+                deployment = _new
+            _deployments.append(deployment)
+        _deployments.extend(delta.added_deployments)
+
+        self.resources = _resources
+        self.deployment_entities = _deployments
+        if delta.has_resource_changes():
+            self.label_index = None
+
+        _placed = {id(d) for r in _resources for d in r.get_deployments()}
+        _pending = [d for d in _deployments if id(d) not in _placed]
+        self.placement_errors = []
+        if not _pending:
+            return _pending
+
+        self.hints = {d.name: _previous[d.name]
+                      for d in _pending if d.name in _previous}
+        try:
+            self.check_upper_bound(_pending, self.resources)
+            self.match_labeled(_pending)
+        except SolverError:
+            self.placement_errors = _pending
+            raise
+        finally:
+            self.hints = dict()
+        return _pending
 
     def print_resources(self):
         for res in self.resources:
@@ -219,14 +480,85 @@ class Solver(IPlugin):
     def get_resources(self):
         return self.resources
 
-    def set_resources(self, resources):
+    def set_resources(self, resources, label_index=None):
+        """Setter for the resources to match on
+
+        :param resources: list of resource entities
+        :type resources: list
+        :param label_index: prebuilt label index over the resources, built on first use if omitted
+        :type label_index: :class:`continuum_deployer.resources.label_index.LabelIndex`, optional
+        """
         self.resources = resources
+        self.label_index = label_index
+
+    def get_label_index(self):
+        """Getter for the label index over the current resources. The index is
+        built once and must be kept valid if the resources are changed.
+
+        :return: label index over the current resources
+        :rtype: :class:`continuum_deployer.resources.label_index.LabelIndex`
+        """
+        if self.label_index is None:
+            self.label_index = LabelIndex(self.resources)
+        return self.label_index
 
     def get_placement_errors(self):
         return self.placement_errors
 
+    def get_instrumentation(self):
+        """Getter for the stage timers and counters of the solver
+
+        :return: instrumentation of the solver
+        :rtype: :class:`continuum_deployer.utils.instrumentation.Instrumentation`
+        """
+        return self.instrumentation
+
+    def set_instrumentation(self, instrumentation):
+        """Setter for the instrumentation, e.g. to share one instance with the importer and exporter
+
+        :param instrumentation: instrumentation to record to
+        :type instrumentation: :class:`continuum_deployer.utils.instrumentation.Instrumentation`
+        """
+        self.instrumentation = instrumentation
+
     def get_deployment_entities(self):
         return self.deployment_entities
 
     def set_deployment_entities(self, deployments):
         self.deployment_entities = deployments
+
+
+def _match_component(solver_class, config, hints, deployments, resources, groups):
+    """Solves one component of matching groups, runs inside a worker process.
+
+    :param solver_class: class of the solver to use
+    :type solver_class: type
+    :param config: solver config to apply
+    :type config: :class:`continuum_deployer.utils.config.Config`
+    :param hints: placement hints of the solver
+    :type hints: dict
+    :param deployments: all deployment entities of the component
+    :type deployments: list
+    :param resources: all resource entities of the component
+    :type resources: list
+    :param groups: list of tuples with deployment and resource indices per group
+    :type groups: list
+    :return: indices of newly placed deployments per resource, indices of failed deployments,
+        solver state and instrumentation
+    :rtype: tuple
+    """
+    solver = solver_class(deployments, resources)
+    solver.config = config
+    solver.hints = hints
+
+    _initial = [len(r.get_deployments()) for r in resources]
+    for deployment_indices, resource_indices in groups:
+        with solver.instrumentation.timer('solve_group'):
+            solver.do_matching([deployments[i] for i in deployment_indices],
+                               [resources[i] for i in resource_indices])
+
+    _index = {id(d): i for i, d in enumerate(deployments)}
+    _placements = [[_index[id(d)] for d in r.get_deployments()[n:]]
+                   for r, n in zip(resources, _initial)]
+    _errors = [_index[id(d)] for d in solver.get_placement_errors()]
+    return _placements, _errors, solver._get_worker_state(), solver.instrumentation
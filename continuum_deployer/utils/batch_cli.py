@@ -0,0 +1,260 @@
+import json
+import sys
+
+import click
+
+import continuum_deployer
+from continuum_deployer.utils.exceptions import ImporterError, SolverError
+from continuum_deployer.utils.file_handling import FileHandling
+from continuum_deployer.utils.instrumentation import Instrumentation
+
+
+class BatchCli:
+    """Non-interactive counterpart of the :class:`continuum_deployer.utils.match_cli.MatchCli`.
+    Runs the whole matchmaking flow without prompts and writes machine-readable results.
+    """
+
+    OUTPUT_FORMATS = ['json', 'manifest']
+
+    EXIT_OK = 0
+    # the import or the solver failed
+    EXIT_SOLVER_ERROR = 1
+    EXIT_PLACEMENT_ERRORS = 2
+
+    def __init__(self, resources_path, dsl_path, dsl_type='helm', helmtype=None, solver='0',
+                 solvermode=None, solver_options=None, importer_options=None,
+                 output_format='json', output_path=None, exporter_type='kubernetes',
+                 metrics_path=None, metrics_format='json'):
+
+        self.resources_path = resources_path
+        self.dsl_path = dsl_path
+        self.dsl_type = dsl_type
+        self.helmtype = helmtype
+        self.solver_type = solver
+        self.solvermode = solvermode
+        self.solver_options = solver_options or []
+        self.importer_options = importer_options or []
+        self.output_format = output_format
+        self.output_path = output_path
+        self.exporter_type = exporter_type
+        self.metrics_path = metrics_path
+        self.metrics_format = metrics_format
+
+        self.resources = None
+        self.importer = None
+        self.solver = None
+        # shared by the importer, solver and exporter of the run
+        self.instrumentation = Instrumentation()
+
+    @staticmethod
+    def get_importers():
+        """Helper that returns all available importers including plugins
+
+        :return: dict of importer name and class
+        :rtype: dict
+        """
+        from continuum_deployer.dsl.importer.helm import Helm
+
+        _importers = {
+            'helm': Helm,
+        }
+        for plugin in continuum_deployer.plugins.plugin_manager.getPluginsOfCategory("Importer"):
+            _importers[plugin.name.lower()] = plugin.plugin_object
+        return _importers
+
+    @staticmethod
+    def get_solvers():
+        """Helper that returns all available solvers including plugins,
+        in the same order as offered by the interactive CLI
+
+        :return: list of solver classes
+        :rtype: list
+        """
+        from continuum_deployer.solving.greedy import Greedy
+        from continuum_deployer.solving.hybrid import Hybrid
+        from continuum_deployer.solving.sat import SAT
+
+        _solvers = [Greedy, SAT, Hybrid]
+        for plugin in continuum_deployer.plugins.plugin_manager.getPluginsOfCategory("Solver"):
+            _solvers.append(plugin.plugin_object)
+        return _solvers
+
+    @staticmethod
+    def get_exporters():
+        """Helper that returns all available exporters including plugins
+
+        :return: dict of exporter name and class
+        :rtype: dict
+        """
+        from continuum_deployer.dsl.exporter.kubernetes import Kubernetes
+
+        _exporters = {
+            'kubernetes': Kubernetes,
+        }
+        for plugin in continuum_deployer.plugins.plugin_manager.getPluginsOfCategory("Exporter"):
+            _exporters[plugin.name.lower()] = plugin.plugin_object
+        return _exporters
+
+    @staticmethod
+    def apply_options(config, options):
+        """Helper that sets config values from name=value option strings
+
+        :param config: config to alter
+        :type config: :class:`continuum_deployer.utils.config.Config`
+        :param options: list of name=value strings
+        :type options: list
+        :raises click.BadParameter: raised if a setting or value does not exist
+        """
+        for option in options:
+            _name, _, _value = option.partition('=')
+            _setting = config.get_setting(_name)
+            if _setting is None:
+                raise click.BadParameter('Unknown setting {}, must be one of: {}'.format(
+                    _name, [s.name for s in config.get_settings()]))
+            _choices = [str(o.value) for o in _setting.get_options()]
+            if _value not in _choices:
+                raise click.BadParameter('Unknown value {} for setting {}, must be one of: {}'.format(
+                    _value, _name, _choices))
+            _setting.set_value(_setting.get_options()[_choices.index(_value)])
+
+    def parse_resources(self):
+        from continuum_deployer.resources.resources import Resources
+
+        _resources = Resources()
+        with self.instrumentation.timer('resource_parse'):
+            _resources.parse(FileHandling.get_file_content(self.resources_path))
+        self.instrumentation.count('resources', len(_resources.get_resources()))
+        self.resources = _resources
+
+    def parse_dsl(self):
+        self.importer = self.get_importers()[self.dsl_type]()
+        self.importer.set_instrumentation(self.instrumentation)
+        BatchCli.apply_options(self.importer.get_config(), self.importer_options)
+        self.importer.parse(self.importer.get_dsl_content(
+            self.dsl_path, self.helmtype))
+
+    @staticmethod
+    def get_index(value, name, count):
+        """Helper that parses a numeric choice like the solver or solver mode
+
+        :param value: index as int or str
+        :type value: int or str
+        :param name: name of the choice used in the error message
+        :type name: str
+        :param count: number of available choices
+        :type count: int
+        :raises click.BadParameter: raised if the value is no index of the choices
+        :return: parsed index
+        :rtype: int
+        """
+        try:
+            _index = int(value)
+        except (TypeError, ValueError):
+            _index = -1
+        if _index < 0 or _index >= count:
+            raise click.BadParameter('Unknown {} {}, must be one of: {}'.format(
+                name, value, list(range(count))))
+        return _index
+
+    def get_resource_entities(self):
+        """Hook that returns the resource entities the solver works on
+
+        :return: list of resource entities
+        :rtype: list
+        """
+        return self.resources.get_resources()
+
+    def get_label_index(self):
+        """Hook that returns the label index over the resource entities of the solver
+
+        :return: label index
+        :rtype: :class:`continuum_deployer.resources.label_index.LabelIndex`
+        """
+        return self.resources.get_label_index()
+
+    def init_solver(self):
+        _solvers = self.get_solvers()
+        _solver = _solvers[BatchCli.get_index(self.solver_type, 'solver', len(_solvers))]
+
+        self.solver = _solver(
+            self.importer.get_app_modules(), self.get_resource_entities())
+        self.solver.set_resources(
+            self.get_resource_entities(), self.get_label_index())
+        self.solver.set_instrumentation(self.instrumentation)
+
+        _config = self.solver.get_config()
+        if self.solvermode is not None:
+            _target = _config.get_setting('target')
+            _options = _target.get_options()
+            _target.set_value(_options[BatchCli.get_index(
+                self.solvermode, 'solver mode', len(_options))])
+        BatchCli.apply_options(_config, self.solver_options)
+
+    def get_results(self):
+        """Builds the machine-readable placement results
+
+        :return: placement results
+        :rtype: dict
+        """
+        return {
+            'solver': type(self.solver).__name__,
+            'config': {s.name: s.get_value().value for s in self.solver.get_config().get_settings()},
+            'placements': [
+                {
+                    'resource': resource.name,
+                    'deployments': [d.name for d in resource.get_deployments()],
+                }
+                for resource in self.solver.get_resources()
+            ],
+            'placement_errors': [d.name for d in self.solver.get_placement_errors()],
+        }
+
+    def write_results(self, output_stream):
+        if self.output_format == 'json':
+            json.dump(self.get_results(), output_stream, indent=2)
+            output_stream.write('\n')
+        elif self.output_format == 'manifest':
+            _exporter = self.get_exporters()[self.exporter_type](
+                output_stream=output_stream)
+            _exporter.set_instrumentation(self.instrumentation)
+            _exporter.export(self.solver.get_resources())
+        else:
+            raise NotImplementedError
+
+    def run(self):
+        """Runs the whole matchmaking flow
+
+        :return: exit code, see EXIT_* constants
+        :rtype: int
+        """
+        try:
+            return self._run()
+        finally:
+            if self.metrics_path is not None:
+                self.instrumentation.write(
+                    self.metrics_path, self.metrics_format)
+
+    def _run(self):
+        self.parse_resources()
+        try:
+            self.parse_dsl()
+        except ImporterError as e:
+            click.echo(click.style(e.message, fg='red'), err=True)
+            return self.EXIT_SOLVER_ERROR
+        self.init_solver()
+
+        try:
+            self.solver.match()
+        except SolverError as e:
+            click.echo(click.style(e.message, fg='red'), err=True)
+            return self.EXIT_SOLVER_ERROR
+
+        if self.output_path is None:
+            self.write_results(sys.stdout)
+        else:
+            with open(self.output_path, 'w') as file:
+                self.write_results(file)
+
+        if self.solver.get_placement_errors():
+            return self.EXIT_PLACEMENT_ERRORS
+        return self.EXIT_OK
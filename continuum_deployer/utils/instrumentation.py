@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    """Collects the durations of pipeline stages and counters, e.g. of a
+    :class:`continuum_deployer.solving.solver.Solver`, an Importer or an Exporter.
+    One instance can be shared between them to get a report of the whole pipeline.
+    """
+
+    PROMETHEUS_PREFIX = 'continuum_deployer'
+    OUTPUT_FORMATS = ['json', 'prometheus']
+
+    # tuple of thread ids and callables notified with the stage name and True/False when
+    # a timed stage of that thread starts or ends, e.g. by
+    # :class:`continuum_deployer.utils.profiling.Profiler`, the tuple is replaced on
+    # changes so running timers iterate over a consistent copy
+    _listeners = ()
+    _listeners_lock = threading.Lock()
+
+    @staticmethod
+    def add_listener(listener):
+        """Registers a callable that is called with the stage name and True when a timed
+        stage starts and False when it ends. The listener is notified of the stages of all
+        instrumentation instances, but only of those run by the registering thread, so
+        concurrent requests of the placement service do not see each other's stages.
+
+        :param listener: callable taking the stage name and a bool
+        :type listener: callable
+        """
+        with Instrumentation._listeners_lock:
+            Instrumentation._listeners = Instrumentation._listeners + \
+                ((threading.get_ident(), listener),)
+
+    @staticmethod
+    def remove_listener(listener):
+        with Instrumentation._listeners_lock:
+            Instrumentation._listeners = tuple(
+                l for l in Instrumentation._listeners if l[1] != listener)
+
+    @staticmethod
+    def _get_listeners():
+        _listeners = Instrumentation._listeners
+        if not _listeners:
+            return ()
+        _thread = threading.get_ident()
+        return [listener for thread, listener in _listeners if thread == _thread]
+
+    def __init__(self):
+        # stage name -> dict with calls, seconds and max_seconds
+        self.timers = dict()
+        # counter name -> value
+        self.counters = dict()
+
+    @contextmanager
+    def timer(self, stage):
+        """Context manager that adds the duration of the enclosed block to a stage
+
+        :param stage: name of the stage
+        :type stage: str
+        """
+        _listeners = Instrumentation._get_listeners()
+        for listener in _listeners:
+            listener(stage, True)
+        _start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - _start)
+            for listener in _listeners:
+                listener(stage, False)
+
+    def add_time(self, stage, seconds):
+        """Adds a measured duration to a stage
+
+        :param stage: name of the stage
+        :type stage: str
+        :param seconds: duration in seconds
+        :type seconds: float
+        """
+        _timer = self.timers.setdefault(
+            stage, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+        _timer['calls'] += 1
+        _timer['seconds'] += seconds
+        _timer['max_seconds'] = max(_timer['max_seconds'], seconds)
+
+    def count(self, name, value=1):
+        """Increases a counter
+
+        :param name: name of the counter
+        :type name: str
+        :param value: amount to add, defaults to 1
+        :type value: int, optional
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def get_time(self, stage):
+        """Returns the total duration of a stage, 0 if it never ran
+
+        :param stage: name of the stage
+        :type stage: str
+        :return: total duration in seconds
+        :rtype: float
+        """
+        return self.timers.get(stage, {}).get('seconds', 0.0)
+
+    def get_count(self, name):
+        return self.counters.get(name, 0)
+
+    def merge(self, other):
+        """Adds the timers and counters of another instrumentation, e.g. of a worker process
+
+        :param other: instrumentation to merge
+        :type other: :class:`Instrumentation`
+        """
+        for stage, timer in other.timers.items():
+            _timer = self.timers.setdefault(
+                stage, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            _timer['calls'] += timer['calls']
+            _timer['seconds'] += timer['seconds']
+            _timer['max_seconds'] = max(
+                _timer['max_seconds'], timer['max_seconds'])
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def reset(self):
+        self.timers = dict()
+        self.counters = dict()
+
+    def to_dict(self):
+        return {
+            'timers': {stage: dict(timer) for stage, timer in self.timers.items()},
+            'counters': dict(self.counters),
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2) + '\n'
+
+    @staticmethod
+    def _metric_name(name):
+        return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+    def to_prometheus(self):
+        """Renders the timers and counters in the Prometheus text format,
+        e.g. for the textfile collector of the node exporter
+
+        :return: metrics in the Prometheus text format
+        :rtype: str
+        """
+        _prefix = self.PROMETHEUS_PREFIX
+        _lines = []
+        if self.timers:
+            for metric, key, kind, text in [
+                    ('stage_seconds_total', 'seconds', 'counter', 'Total time spent in a stage'),
+                    ('stage_seconds_max', 'max_seconds', 'gauge', 'Longest single run of a stage'),
+                    ('stage_calls_total', 'calls', 'counter', 'Number of runs of a stage')]:
+                _lines.append('# HELP {}_{} {}'.format(_prefix, metric, text))
+                _lines.append('# TYPE {}_{} {}'.format(_prefix, metric, kind))
+                for stage in sorted(self.timers):
+                    _lines.append('{}_{}{{stage="{}"}} {}'.format(
+                        _prefix, metric, stage, self.timers[stage][key]))
+        for name in sorted(self.counters):
+            _metric = '{}_{}'.format(_prefix, Instrumentation._metric_name(name))
+            _lines.append('# TYPE {} gauge'.format(_metric))
+            _lines.append('{} {}'.format(_metric, self.counters[name]))
+        return '\n'.join(_lines) + '\n'
+
+    def write(self, path, output_format='json'):
+        """Writes the timers and counters to a file. The file is replaced atomically,
+        so collectors never read a partially written file.
+
+        :param path: path of the output file
+        :type path: str
+        :param output_format: either json or prometheus, defaults to 'json'
+        :type output_format: str, optional
+        """
+        if output_format == 'json':
+            _content = self.to_json()
+        elif output_format == 'prometheus':
+            _content = self.to_prometheus()
+        else:
+            raise NotImplementedError
+
+        _tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(_tmp_path, 'w') as file:
+            file.write(_content)
+        os.replace(_tmp_path, path)
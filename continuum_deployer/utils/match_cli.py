@@ -14,14 +14,13 @@ from prompt_toolkit.shortcuts import confirm
 import click
 
 import continuum_deployer
-from continuum_deployer import plugins
 from continuum_deployer.utils.ui import UI
 from continuum_deployer.utils.exceptions import RequirementsError, FileTypeNotSupported, ImporterError, SolverError
 from continuum_deployer.dsl.importer.importer import Importer
 from continuum_deployer.dsl.importer.helm import Helm
 from continuum_deployer.resources.resources import Resources
+from continuum_deployer.solving.delta import SolverDelta
 from continuum_deployer.solving.greedy import Greedy
-from continuum_deployer.solving.sat import SAT
 from continuum_deployer.dsl.exporter.exporter import Exporter
 from continuum_deployer.dsl.exporter.kubernetes import Kubernetes
 
@@ -34,6 +33,7 @@ class Settings:
     resources_path: str = field(default=None)
     resources_content: object = field(default=None)
     resources: object = field(default=None)
+    label_index: object = field(default=None)
     # path to the dsl file
     dsl_path: str = field(default=None)
     dsl_content: object = field(default=None)
@@ -44,6 +44,8 @@ class Settings:
     # solver options
     solver_type: int = field(default=None)
     solver: object = field(default=None)
+    # changes of the definitions since the last matching
+    delta: object = field(default=None)
     # exporter options
     exporter_type: int = field(default=None)
     exporter: object = field(default=None)
@@ -179,6 +181,7 @@ class MatchCli:
         _resources = Resources()
         _resources.parse(self.settings.resources_content)
         self.settings.resources = _resources.get_resources()
+        self.settings.label_index = _resources.get_label_index()
 
     def _read_dsl(self):
         try:
@@ -203,7 +206,12 @@ class MatchCli:
             self.ask_dsl()
 
     def _parse_dsl(self):
-        self.settings.dsl_importer.parse(self.settings.dsl_content)
+        try:
+            self.settings.dsl_importer.parse(self.settings.dsl_content)
+        except ImporterError as e:
+            click.echo(click.style(
+                '\n[Error] {} '.format(e.message), fg='red'), err=True)
+            exit(1)
         self.settings.deployment_entities = self.settings.dsl_importer.get_app_modules()
 
     def _ask_setting_options(self, config):
@@ -272,7 +280,7 @@ class MatchCli:
             'helm': Helm,
         }
 
-        for plugin in plugins.plugin_manager.getPluginsOfCategory("Importer"):
+        for plugin in continuum_deployer.plugins.plugin_manager.getPluginsOfCategory("Importer"):
             _name = plugin.name.lower()
             _importer[_name] = plugin.plugin_object
 
@@ -318,8 +326,9 @@ class MatchCli:
         self.ask_solver_type()
 
     def on_enter_solver_type(self):
-
-        global plugins
+        # ortools is only imported once a solver has to be chosen
+        from continuum_deployer.solving.hybrid import Hybrid
+        from continuum_deployer.solving.sat import SAT
 
         click.echo('\n')
 
@@ -327,11 +336,12 @@ class MatchCli:
 <b>Choose a solver for the workload placement:</b>
 \t [0] <b>Greedy Solver</b> (sorts workloads and fills targets in a greedy fashion)
 \t [1] <b>SAT Solver</b> (offers various options for mathematical optimal placements)
+\t [2] <b>Hybrid Solver</b> (places loose label groups greedily and tight ones with the SAT solver)
 '''
 
-        _solvers = [Greedy, SAT]
+        _solvers = [Greedy, SAT, Hybrid]
 
-        for plugin in plugins.plugin_manager.getPluginsOfCategory("Solver"):
+        for plugin in continuum_deployer.plugins.plugin_manager.getPluginsOfCategory("Solver"):
             _solvers.append(plugin.plugin_object)
             new_solver_option = '\t [{}] <b>{}</b> ({})'.format(
                 len(_solvers)-1, plugin.name, plugin.description)
@@ -355,6 +365,8 @@ class MatchCli:
 
         self.settings.solver = _solver(
             self.settings.deployment_entities, self.settings.resources)
+        self.settings.solver.set_resources(
+            self.settings.resources, self.settings.label_index)
 
         self.configure_solver()
 
@@ -365,8 +377,9 @@ class MatchCli:
             if setting.name == "target" and self.settings.solvermode:
                 _options = setting.get_options()
                 setting.set_value(_options[int(self.settings.solvermode)])
-            else:
+            elif setting.name == "target":
                 unset = True
+            # further settings keep their defaults if the target is preset
 
         if not unset:
             self.automatch()
@@ -419,12 +432,19 @@ class MatchCli:
         _start_matching = confirm(
             ANSI(click.style(self._TEXT_ASKSTARTMATCHING, fg=self.CLICK_PROMPT_FG_COLOR)))
 
-        # clear already matched resources (necessary for rerun)
-        self.settings.solver.reset_matching()
+        _delta = self.settings.delta
+        self.settings.delta = None
+        if _delta is None:
+            # clear already matched resources (necessary for rerun)
+            self.settings.solver.reset_matching()
 
         if _start_matching:
             try:
-                self.settings.solver.match()
+                if _delta is None:
+                    self.settings.solver.match()
+                else:
+                    # only re-place what is affected by the altered definitions
+                    self.settings.solver.resolve(_delta)
             except SolverError as e:
                 click.echo(click.style(e.message, fg='red'), err=True)
                 self.ask_alter()
@@ -463,6 +483,9 @@ class MatchCli:
     def on_enter_alter_definitions(self):
         click.echo('\n')
 
+        _resources = self.settings.solver.get_resources()
+        _deployments = self.settings.solver.get_deployment_entities()
+
         _alter_resources = confirm(
             ANSI(click.style(self._TEXT_ASKALTERRESOURCES, fg=self.CLICK_PROMPT_FG_COLOR)))
         if _alter_resources:
@@ -470,18 +493,33 @@ class MatchCli:
             self._edit_file_with_editor(self.settings.resources_path)
             self._read_resources_file()
             self._parse_resources()
-            self.settings.solver.set_resources(self.settings.resources)
+            _resources = self.settings.resources
 
         _alter_deployments = confirm(
             ANSI(click.style(self._TEXT_ASKALTERWORKLOADS, fg=self.CLICK_PROMPT_FG_COLOR)))
         if _alter_deployments:
+            _contents = self.settings.dsl_content
+            if not isinstance(_contents, list):
+                _contents = [_contents]
+            if not all(isinstance(c, str) for c in _contents):
+                # streamed content is consumed, editing requires the whole content
+                _parse_mode = self.settings.dsl_importer.get_config().get_setting('parse_mode')
+                if _parse_mode is not None:
+                    _parse_mode.set_value(_parse_mode.get_default())
+                self._read_dsl()
+            if isinstance(self.settings.dsl_content, list):
+                # contents of multiple paths or charts are edited as one multi document YAML
+                self.settings.dsl_content = '\n---\n'.join(self.settings.dsl_content)
             # open editor
             self.settings.dsl_content = self._edit_content_with_editor(
                 self.settings.dsl_content)
             self.settings.dsl_importer.reset_app_modules()
             self._parse_dsl()
-            self.settings.solver.set_deployment_entities(
-                self.settings.deployment_entities)
+            _deployments = self.settings.deployment_entities
+
+        self.settings.delta = SolverDelta.diff(
+            self.settings.solver.get_resources(), _resources,
+            self.settings.solver.get_deployment_entities(), _deployments)
 
         self.start_matching()
 
@@ -492,7 +530,7 @@ class MatchCli:
             'kubernetes': Kubernetes,
         }
 
-        for plugin in plugins.plugin_manager.getPluginsOfCategory("Exporter"):
+        for plugin in continuum_deployer.plugins.plugin_manager.getPluginsOfCategory("Exporter"):
             _name = plugin.name.lower()
             _importer[_name] = plugin.plugin_object
 
@@ -0,0 +1,354 @@
+import io
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.resources.resources import Resources
+from continuum_deployer.utils.batch_cli import BatchCli
+from continuum_deployer.utils.exceptions import ImporterError, RequirementsError, SolverError
+
+
+class Inventory:
+    """Parsed resource inventory that is kept warm by the placement service.
+    The parsed resources and their label index are never changed by placement requests,
+    every request works on fresh copies instead.
+    """
+
+    def __init__(self, name, definition):
+        self.name = name
+        self.resources = Resources()
+        try:
+            self.resources.parse(definition)
+        except SystemExit:
+            # the resources parser reports malformed definitions on its own and exits
+            raise click.BadParameter(
+                'Malformed resource definition for inventory {}'.format(name))
+
+    def get_copies(self):
+        """Creates fresh copies of the inventory resources without placed deployments
+
+        :return: copied resource entities and a label index over them that shares
+            the postings of the inventory index
+        :rtype: tuple
+        """
+        _copies = [ResourceEntity(name=r.name, memory=r.memory, cpu=r.cpu, labels=r.labels)
+                   for r in self.resources.get_resources()]
+        return _copies, self.resources.get_label_index().bind(_copies)
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'resources': len(self.resources.get_resources()),
+        }
+
+
+class PlacementRequest(BatchCli):
+    """Single placement request handled by the :class:`PlacementService`.
+    Runs the batch flow on copies of a warm inventory and on DSL content
+    that is either sent with the request or read from a path.
+    """
+
+    def __init__(self, inventory, request, dsl_root=None):
+        super().__init__(
+            None, PlacementRequest.resolve_dsl_path(request.get('deployment_path'), dsl_root),
+            dsl_type=request.get('dsltype', 'helm'),
+            helmtype=request.get('type'),
+            solver=str(request.get('solver', '0')),
+            solvermode=request.get('solver_mode'),
+            solver_options=request.get('config'),
+            importer_options=request.get('importer_config'),
+            output_format=request.get('format', 'json'),
+            exporter_type=request.get('exporter', 'kubernetes'))
+        self.inventory = inventory
+        self.dsl_content = request.get('deployment')
+        self.label_index = None
+
+        if self.dsl_content is None and self.dsl_path is None:
+            raise click.BadParameter(
+                'Either deployment or deployment_path has to be given')
+        if self.output_format not in self.OUTPUT_FORMATS:
+            raise click.BadParameter('Unknown format {}, must be one of: {}'.format(
+                self.output_format, self.OUTPUT_FORMATS))
+
+    @staticmethod
+    def resolve_dsl_path(dsl_path, dsl_root):
+        """Helper that resolves the deployment paths of a request below the DSL root
+        directory of the service, paths that lead outside of it are rejected
+
+        :param dsl_path: path or list of paths relative to the DSL root
+        :type dsl_path: str or list
+        :param dsl_root: DSL root directory, path requests are rejected if not set
+        :type dsl_root: str
+        :raises click.BadParameter: raised if path requests are disabled or a path leads outside the root
+        :return: resolved path or list of paths
+        :rtype: str or list
+        """
+        if dsl_path is None:
+            return None
+        if dsl_root is None:
+            raise click.BadParameter(
+                'deployment_path requests are disabled, the service has no DSL root directory')
+
+        _root = os.path.realpath(dsl_root)
+        _resolved = []
+        for path in (dsl_path if isinstance(dsl_path, list) else [dsl_path]):
+            if not isinstance(path, str):
+                raise click.BadParameter('Invalid deployment_path {}'.format(path))
+            _path = os.path.realpath(os.path.join(_root, path))
+            if os.path.commonpath([_root, _path]) != _root:
+                raise click.BadParameter(
+                    'deployment_path {} is outside of the DSL root directory'.format(path))
+            _resolved.append(_path)
+        return _resolved if isinstance(dsl_path, list) else _resolved[0]
+
+    def parse_resources(self):
+        self.resources, self.label_index = self.inventory.get_copies()
+
+    def parse_dsl(self):
+        if self.dsl_content is None:
+            super().parse_dsl()
+            return
+
+        _importers = self.get_importers()
+        if self.dsl_type not in _importers:
+            raise click.BadParameter('Unknown DSL type {}, must be one of: {}'.format(
+                self.dsl_type, list(_importers)))
+        self.importer = _importers[self.dsl_type]()
+        self.importer.set_instrumentation(self.instrumentation)
+        BatchCli.apply_options(self.importer.get_config(), self.importer_options)
+        _content = self.dsl_content
+        _parse_mode = self.importer.get_config().get_setting('parse_mode')
+        if _parse_mode is not None and _parse_mode.get_value().value == 'streaming':
+            _content = io.BytesIO(_content.encode())
+        self.importer.parse(_content)
+
+    def get_resource_entities(self):
+        return self.resources
+
+    def get_label_index(self):
+        return self.label_index
+
+    def run(self):
+        """Runs the whole matchmaking flow
+
+        :raises SolverError: raised if the solver fails
+        :return: placement results and the requested output, the output is
+            the results for the json format and the manifest str otherwise
+        :rtype: tuple
+        """
+        self.parse_resources()
+        self.parse_dsl()
+        self.init_solver()
+        self.solver.match()
+
+        if self.output_format == 'json':
+            return self.get_results(), self.get_results()
+        _output = io.StringIO()
+        self.write_results(_output)
+        return self.get_results(), _output.getvalue()
+
+
+class PlacementService:
+    """Long-running placement service that keeps parsed resource inventories,
+    their label indexes and the loaded plugins in memory and handles placement
+    requests concurrently.
+    """
+
+    def __init__(self, dsl_root=None):
+        self.inventories = dict()
+        # directory that deployment_path requests are resolved in,
+        # path requests are rejected if not set
+        self.dsl_root = dsl_root
+        self._lock = threading.Lock()
+
+    def add_inventory(self, name, definition):
+        """Parses and stores a resource inventory, replaces an existing one with the same name
+
+        :param name: name of the inventory used by placement requests
+        :type name: str
+        :param definition: str with plain YAML resource definitions
+        :type definition: str
+        :return: the stored inventory
+        :rtype: :class:`Inventory`
+        """
+        _inventory = Inventory(name, definition)
+        with self._lock:
+            self.inventories[name] = _inventory
+        return _inventory
+
+    def remove_inventory(self, name):
+        with self._lock:
+            return self.inventories.pop(name, None) is not None
+
+    def get_inventory(self, name):
+        with self._lock:
+            _inventory = self.inventories.get(name)
+        if _inventory is None:
+            raise click.BadParameter('Unknown inventory {}, must be one of: {}'.format(
+                name, sorted(self.inventories)))
+        return _inventory
+
+    def get_inventories(self):
+        with self._lock:
+            return [i.describe() for i in self.inventories.values()]
+
+    def place(self, request):
+        """Handles a single placement request
+
+        :param request: placement request, see README for the fields
+        :type request: dict
+        :return: placement results and the requested output
+        :rtype: tuple
+        """
+        _inventory = self.get_inventory(request.get('resources', 'default'))
+        try:
+            return PlacementRequest(_inventory, request, self.dsl_root).run()
+        except SystemExit:
+            # components that report errors on their own and exit must not end the service
+            raise click.BadParameter('Malformed placement request')
+
+    def create_server(self, host='127.0.0.1', port=8080, socket_path=None):
+        """Creates the HTTP server of the service, listening either on
+        TCP or on an Unix domain socket
+
+        :param host: host to listen on
+        :type host: str
+        :param port: port to listen on
+        :type port: int
+        :param socket_path: path of the Unix domain socket, used instead of host and port
+        :type socket_path: str, optional
+        :return: server ready to serve_forever()
+        :rtype: :class:`socketserver.BaseServer`
+        """
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            _server = ThreadingUnixHTTPServer(socket_path, PlacementRequestHandler)
+        else:
+            _server = ThreadingHTTPServer((host, port), PlacementRequestHandler)
+        _server.service = self
+        return _server
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = self.server_address
+        self.server_port = 0
+
+
+class PlacementRequestHandler(BaseHTTPRequestHandler):
+    """HTTP interface of the :class:`PlacementService`
+
+    - GET /health
+    - GET /resources
+    - PUT /resources/<name> with the YAML resource definitions as body
+    - DELETE /resources/<name>
+    - POST /place with a JSON placement request as body
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        # Unix domain sockets have no client address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return 'unix'
+
+    def log_message(self, format, *args):
+        click.echo('{} - {}'.format(self.address_string(), format % args), err=True)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+
+    def _send(self, status, body, content_type='application/json'):
+        if content_type == 'application/json':
+            body = json.dumps(body, indent=2) + '\n'
+        _body = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(_body)))
+        self.end_headers()
+        self.wfile.write(_body)
+
+    def _send_error(self, status, message):
+        self._send(status, {'error': message})
+
+    def _inventory_name(self):
+        _parts = self.path.strip('/').split('/')
+        if len(_parts) == 2 and _parts[0] == 'resources':
+            return _parts[1]
+        return None
+
+    def do_GET(self):
+        _service = self.server.service
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/resources':
+            self._send(200, _service.get_inventories())
+        else:
+            self._send_error(404, 'Unknown path {}'.format(self.path))
+
+    def do_PUT(self):
+        _name = self._inventory_name()
+        if _name is None:
+            self._send_error(404, 'Unknown path {}'.format(self.path))
+            return
+        try:
+            _inventory = self.server.service.add_inventory(
+                _name, self._read_body())
+        except click.BadParameter as e:
+            self._send_error(400, e.message)
+            return
+        except Exception as e:
+            self._send_error(400, 'Invalid resource definition: {}'.format(e))
+            return
+        self._send(200, _inventory.describe())
+
+    def do_DELETE(self):
+        _name = self._inventory_name()
+        if _name is None or not self.server.service.remove_inventory(_name):
+            self._send_error(404, 'Unknown inventory {}'.format(_name))
+            return
+        self._send(200, {'name': _name})
+
+    def do_POST(self):
+        if self.path != '/place':
+            self._send_error(404, 'Unknown path {}'.format(self.path))
+            return
+        try:
+            _request = json.loads(self._read_body())
+        except ValueError as e:
+            self._send_error(400, 'Invalid JSON request: {}'.format(e))
+            return
+        if not isinstance(_request, dict):
+            self._send_error(400, 'Invalid JSON request: object expected')
+            return
+
+        try:
+            _results, _output = self.server.service.place(_request)
+        except click.BadParameter as e:
+            self._send_error(400, e.message)
+            return
+        except (ImporterError, RequirementsError) as e:
+            self._send_error(400, e.message)
+            return
+        except SolverError as e:
+            self._send_error(422, e.message)
+            return
+        except Exception as e:
+            self._send_error(500, 'Placement failed: {}'.format(e))
+            return
+
+        if isinstance(_output, dict):
+            self._send(200, _output)
+        else:
+            self._send(200, _output, content_type='application/yaml')
@@ -0,0 +1,194 @@
+import cProfile
+import os
+import pstats
+import tracemalloc
+
+from continuum_deployer.utils.instrumentation import Instrumentation
+
+
+class Profiler:
+    """Profiles a whole command with cProfile and tracemalloc and writes the reports
+    to a directory:
+
+    - ``profile.pstats``: cProfile statistics, e.g. for ``python -m pstats`` or snakeviz
+    - ``profile.collapsed``: collapsed stacks for flamegraph.pl or speedscope
+    - ``allocations.txt``: top allocation sites in total and per instrumented stage
+
+    cProfile only records caller and callee pairs, the collapsed stacks are therefore
+    approximated by splitting the time of a function between its callers in proportion
+    to the time spent in each call edge. Allocations are attributed to the innermost
+    running stage, i.e. nested stages are reported separately from their parent stage.
+    Like cProfile itself, only the thread that started profiling is covered, stages run
+    in other threads or worker processes are not profiled.
+    """
+
+    PSTATS_FILE = 'profile.pstats'
+    COLLAPSED_FILE = 'profile.collapsed'
+    ALLOCATIONS_FILE = 'allocations.txt'
+    # allocations outside of any instrumented stage, e.g. module imports
+    NO_STAGE = '(no stage)'
+
+    # number of frames kept per allocation traceback
+    TRACEMALLOC_FRAMES = 1
+    # number of allocation sites reported in total and per stage
+    TOP_ALLOCATIONS = 10
+    # stacks are cut at this depth and below this share of the total time
+    MAX_STACK_DEPTH = 64
+    MIN_STACK_SHARE = 0.0001
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.profile = cProfile.Profile()
+        # names of the running stages, innermost last
+        self._stages = []
+        # stage name -> dict of allocation site -> [size, count]
+        self.stage_allocations = dict()
+        # stage name -> largest traced memory during one run of the stage
+        self.stage_peaks = dict()
+        self._running = False
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tracemalloc.start(self.TRACEMALLOC_FRAMES)
+        self._running = True
+        Instrumentation.add_listener(self._on_stage)
+        self.profile.enable()
+
+    def stop(self):
+        """Stops profiling and writes the reports
+
+        :return: paths of the written reports
+        :rtype: list
+        """
+        self.profile.disable()
+        self._running = False
+        Instrumentation.remove_listener(self._on_stage)
+        self._collect_allocations()
+        tracemalloc.stop()
+
+        _stats = pstats.Stats(self.profile)
+        _paths = [os.path.join(self.output_dir, name) for name in
+                  [self.PSTATS_FILE, self.COLLAPSED_FILE, self.ALLOCATIONS_FILE]]
+        _stats.dump_stats(_paths[0])
+        with open(_paths[1], 'w') as file:
+            for stack, microseconds in sorted(Profiler.collapse(_stats).items()):
+                file.write('{} {}\n'.format(stack, microseconds))
+        with open(_paths[2], 'w') as file:
+            file.write(self.format_allocations())
+        return _paths
+
+    def _collect_allocations(self):
+        """Adds the allocations since the last stage start or end that are still
+        alive to the innermost running stage and clears the traces. Only the traces
+        of the last segment are grouped, so the cost grows with the number of
+        allocations and not with the number of stages.
+        """
+        _stage = self._stages[-1] if self._stages else self.NO_STAGE
+        _allocations = self.stage_allocations.setdefault(_stage, dict())
+        for statistic in tracemalloc.take_snapshot().statistics('lineno'):
+            _entry = _allocations.setdefault(str(statistic.traceback), [0, 0])
+            _entry[0] += statistic.size
+            _entry[1] += statistic.count
+        self.stage_peaks[_stage] = max(
+            self.stage_peaks.get(_stage, 0), tracemalloc.get_traced_memory()[1])
+        tracemalloc.clear_traces()
+
+    def _on_stage(self, stage, started):
+        if not self._running:
+            # end of a stage that was still running when profiling stopped
+            return
+        self.profile.disable()
+        try:
+            self._collect_allocations()
+            if started:
+                self._stages.append(stage)
+            elif stage in self._stages:
+                # stages that started before profiling are not on the stack
+                del self._stages[len(self._stages) - 1 - self._stages[::-1].index(stage)]
+        finally:
+            self.profile.enable()
+
+    @staticmethod
+    def _format_site(site, size, count):
+        return '{:>12.1f} KiB {:>10} blocks  {}'.format(size / 1024, count, site)
+
+    def format_allocations(self):
+        """Formats the top allocation sites in total and of each stage. Sizes are the
+        memory allocated during a stage and still alive at its end.
+
+        :return: report text
+        :rtype: str
+        """
+        _total = dict()
+        for allocations in self.stage_allocations.values():
+            for site, (size, count) in allocations.items():
+                _entry = _total.setdefault(site, [0, 0])
+                _entry[0] += size
+                _entry[1] += count
+
+        _lines = []
+        for title, allocations in [('Total', _total)] + sorted(self.stage_allocations.items()):
+            if _lines:
+                _lines.append('')
+            if title in self.stage_peaks:
+                _lines.append('Stage {}: top {} allocation sites, peak {:.1f} KiB'.format(
+                    title, self.TOP_ALLOCATIONS, self.stage_peaks[title] / 1024))
+            else:
+                _lines.append('{}: top {} allocation sites'.format(
+                    title, self.TOP_ALLOCATIONS))
+            _sites = sorted(allocations.items(), key=lambda x: x[1][0], reverse=True)
+            for site, (size, count) in _sites[:self.TOP_ALLOCATIONS]:
+                _lines.append(Profiler._format_site(site, size, count))
+        return '\n'.join(_lines) + '\n'
+
+    @staticmethod
+    def _frame_name(func):
+        _filename, _line, _name = func
+        if _filename == '~':
+            # built-in functions
+            return _name.replace(';', ':')
+        return '{} ({}:{})'.format(_name, os.path.basename(_filename), _line).replace(';', ':')
+
+    @staticmethod
+    def collapse(stats):
+        """Approximates collapsed stacks from the caller graph of cProfile statistics
+
+        :param stats: cProfile statistics
+        :type stats: :class:`pstats.Stats`
+        :return: semicolon separated stacks mapped to their own time in microseconds
+        :rtype: dict
+        """
+        _callees = dict()
+        for func, (_, _, _, _, callers) in stats.stats.items():
+            for caller, edge in callers.items():
+                # edge holds the cumulative time of func when called by caller
+                _callees.setdefault(caller, []).append((func, edge[3]))
+
+        _roots = [f for f, s in stats.stats.items() if not s[4]]
+        _total = sum(stats.stats[f][3] for f in _roots) or 1.0
+        _stacks = dict()
+
+        # iterative depth first search, a frame gets the share of its time that
+        # was spent in calls from the path leading to it
+        _pending = [((f,), stats.stats[f][3]) for f in _roots]
+        while _pending:
+            _path, _time = _pending.pop()
+            _func = _path[-1]
+            _cumulative = stats.stats[_func][3]
+            _share = _time / _cumulative if _cumulative > 0 else 0.0
+
+            _own = stats.stats[_func][2] * _share
+            if _own > 0:
+                _stack = ';'.join(Profiler._frame_name(f) for f in _path)
+                _stacks[_stack] = _stacks.get(_stack, 0.0) + _own
+
+            if len(_path) >= Profiler.MAX_STACK_DEPTH:
+                continue
+            for callee, edge_time in _callees.get(_func, []):
+                _callee_time = edge_time * _share
+                if callee in _path or _callee_time / _total < Profiler.MIN_STACK_SHARE:
+                    continue
+                _pending.append((_path + (callee,), _callee_time))
+
+        return {stack: int(seconds * 1e6) for stack, seconds in _stacks.items()
+                if int(seconds * 1e6) > 0}
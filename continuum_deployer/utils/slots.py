@@ -0,0 +1,46 @@
+import dataclasses
+import functools
+
+
+def add_slots(cls):
+    """Class decorator that recreates a dataclass with ``__slots__`` for its fields,
+    like ``dataclass(slots=True)`` of Python 3.10. Instances then have no ``__dict__``,
+    which saves about half of the memory of small entities before Python 3.11 and
+    about a quarter since. Has to be applied after (above) the ``dataclass`` decorator.
+
+    :param cls: dataclass to add slots to
+    :type cls: type
+    :return: new class with the same fields and methods
+    :rtype: type
+    """
+    if '__slots__' in cls.__dict__:
+        raise TypeError('{} already specifies __slots__'.format(cls.__name__))
+
+    _fields = tuple(f.name for f in dataclasses.fields(cls))
+    _namespace = dict(cls.__dict__)
+    _namespace['__slots__'] = _fields
+    # the default values are kept by the generated __init__, the class attributes
+    # would conflict with the slot descriptors
+    for name in _fields:
+        _namespace.pop(name, None)
+    _namespace.pop('__dict__', None)
+    _namespace.pop('__weakref__', None)
+
+    # fields that are not set by __init__ read their default from the class attribute,
+    # which no longer exists, they are therefore set before __init__ runs
+    _defaults = tuple((f.name, f.default) for f in dataclasses.fields(cls)
+                      if not f.init and f.default is not dataclasses.MISSING)
+    if _defaults:
+        _init = _namespace['__init__']
+
+        @functools.wraps(_init)
+        def __init__(self, *args, **kwargs):
+            for name, value in _defaults:
+                object.__setattr__(self, name, value)
+            _init(self, *args, **kwargs)
+
+        _namespace['__init__'] = __init__
+
+    _cls = type(cls)(cls.__name__, cls.__bases__, _namespace)
+    _cls.__qualname__ = cls.__qualname__
+    return _cls
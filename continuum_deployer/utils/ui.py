@@ -1,8 +1,6 @@
 # pylint: disable=W1401
 
 import click
-import pydoc
-from progress.bar import Bar
 
 
 class UI():
@@ -26,6 +24,8 @@ class UI():
             prefix (str): Label infront of progress bar
             percent (int): Percentage representing the progress
         """
+        from progress.bar import Bar
+
         with Bar(prefix, max=100, suffix='%(percent)d%%') as bar:
             bar.next(percent)
 
@@ -51,4 +51,6 @@ class UI():
 
     @staticmethod
     def page(text):
+        import pydoc
+
         pydoc.pager(text)
@@ -0,0 +1,48 @@
+import yaml
+
+# use the C-accelerated libyaml bindings if PyYAML was built with them
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+
+class YamlHandling:
+    """Helper class that bundles YAML loading and dumping trough the fastest available backend"""
+
+    LIBYAML = SafeLoader is not yaml.SafeLoader
+
+    @staticmethod
+    def load(stream):
+        """Loads a single YAML document
+
+        :param stream: plain YAML str or stream
+        :type stream: str
+        :return: parsed document
+        :rtype: object
+        """
+        # see default loader deprecation
+        # https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
+        return yaml.load(stream, Loader=SafeLoader)
+
+    @staticmethod
+    def load_all(stream):
+        """Loads all documents of a multi-document YAML input
+
+        :param stream: plain YAML str or stream
+        :type stream: str
+        :return: generator of parsed documents
+        :rtype: generator
+        """
+        return yaml.load_all(stream, Loader=SafeLoader)
+
+    @staticmethod
+    def dump(data):
+        """Dumps data to a YAML str
+
+        :param data: data to dump
+        :type data: object
+        :return: YAML representation of the data
+        :rtype: str
+        """
+        return yaml.dump(data, Dumper=SafeDumper)
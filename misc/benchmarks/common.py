@@ -0,0 +1,47 @@
+"""Shared helpers of the benchmark scripts. The scripts import this module as a sibling,
+which works as Python puts the directory of the executed script on the module path.
+"""
+
+import random
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.utils.batch_cli import BatchCli
+
+
+def generate(num_deployments, num_resources, seed=1,
+             deployment_cpu=(0.1, 0.25, 0.5, 1), deployment_memory=(128, 256, 512),
+             resource_cpu=(1, 2, 4), resource_memory=(1024, 2048, 4096)):
+    """Generates unlabeled deployments and nodes with sizes drawn from the given choices
+
+    :param num_deployments: number of deployments
+    :type num_deployments: int
+    :param num_resources: number of nodes
+    :type num_resources: int
+    :param seed: seed of the generator
+    :type seed: int
+    :return: list of deployment entities and list of resource entities
+    :rtype: tuple
+    """
+    _random = random.Random(seed)
+    deployments = [DeploymentEntity(name='deployment-{}'.format(i),
+                                    cpu=_random.choice(deployment_cpu),
+                                    memory=_random.choice(deployment_memory))
+                   for i in range(num_deployments)]
+    resources = [ResourceEntity(name='node-{}'.format(i),
+                                cpu=_random.choice(resource_cpu),
+                                memory=_random.choice(resource_memory))
+                 for i in range(num_resources)]
+    return deployments, resources
+
+
+def set_options(solver, options):
+    """Sets config values of a solver
+
+    :param solver: solver to configure
+    :type solver: :class:`continuum_deployer.solving.solver.Solver`
+    :param options: list of (name, value) tuples
+    :type options: list
+    """
+    BatchCli.apply_options(solver.get_config(),
+                           ['{}={}'.format(name, value) for name, value in options])
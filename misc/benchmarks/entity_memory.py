@@ -0,0 +1,65 @@
+"""Measures the memory per DeploymentEntity and ResourceEntity object and compares the
+slotted entities with equal dataclasses that keep their fields in a __dict__.
+
+Deployments are created like the replicas of the Helm importer, i.e. they share their
+yaml definition and labels, so the numbers show the overhead of the objects themselves.
+"""
+
+import dataclasses
+import gc
+import tracemalloc
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+
+
+def unslotted(cls):
+    """Creates a dataclass with the same fields as the given entity but without slots"""
+    _fields = []
+    for f in dataclasses.fields(cls):
+        if f.default_factory is not dataclasses.MISSING:
+            _field = dataclasses.field(default_factory=f.default_factory, init=f.init)
+        else:
+            _field = dataclasses.field(default=f.default, init=f.init)
+        _fields.append((f.name, f.type, _field))
+    return dataclasses.make_dataclass('Dict' + cls.__name__, _fields)
+
+
+def measure(create, count):
+    """Returns the bytes allocated per object that are still alive after creation"""
+    gc.collect()
+    tracemalloc.start()
+    _objects = [create(i) for i in range(count)]
+    _size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the objects is not part of the entity size
+    _size -= _objects.__sizeof__()
+    del _objects
+    return _size / count
+
+
+def main():
+    _count = 100000
+    _yaml = {'kind': 'Deployment', 'metadata': {'name': 'app'}}
+    _labels = {'zone': 'zone-a'}
+
+    def _deployment(cls):
+        return lambda i: cls(name='app-{}'.format(i), cpu=0.25, memory=256,
+                             labels=_labels, yaml=_yaml, replica=i)
+
+    def _resource(cls):
+        return lambda i: cls(name='node-{}'.format(i), cpu=4, memory=8192, labels=_labels)
+
+    # names are created for both variants, their size is the same
+    _names = measure(lambda i: 'app-{}'.format(i), _count)
+
+    print('{:<18} {:>14} {:>14} {:>8}'.format('entity', '__dict__ B/obj', 'slots B/obj', 'saved'))
+    for cls, create in [(DeploymentEntity, _deployment), (ResourceEntity, _resource)]:
+        _before = measure(create(unslotted(cls)), _count) - _names
+        _after = measure(create(cls), _count) - _names
+        print('{:<18} {:>14.0f} {:>14.0f} {:>7.0%}'.format(
+            cls.__name__, _before, _after, 1 - _after / _before))
+
+
+if __name__ == "__main__":
+    main()
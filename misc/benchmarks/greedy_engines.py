@@ -0,0 +1,34 @@
+"""Compares the object based and the NumPy array based engine of the Greedy solver."""
+
+import time
+
+from continuum_deployer.solving.greedy import Greedy
+
+from common import generate, set_options
+
+
+def run(engine, fit, num_deployments, num_resources, seed=1):
+    deployments, resources = generate(num_deployments, num_resources, seed)
+
+    solver = Greedy(deployments, resources)
+    set_options(solver, [('engine', engine), ('fit', fit)])
+
+    _start = time.perf_counter()
+    solver.match()
+    return time.perf_counter() - _start
+
+
+def main():
+    print('{:>10} {:>12} {:>10} {:>12} {:>12} {:>8}'.format(
+        'fit', 'deployments', 'resources', 'python [s]', 'numpy [s]', 'speedup'))
+    for fit in ['first_fit', 'best_fit']:
+        for num_resources in [100, 1000, 5000]:
+            num_deployments = num_resources * 2
+            _python = run('python', fit, num_deployments, num_resources)
+            _numpy = run('numpy', fit, num_deployments, num_resources)
+            print('{:>10} {:>12} {:>10} {:>12.4f} {:>12.4f} {:>7.1f}x'.format(
+                fit, num_deployments, num_resources, _python, _numpy, _python/_numpy))
+
+
+if __name__ == "__main__":
+    main()
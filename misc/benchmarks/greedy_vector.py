@@ -0,0 +1,58 @@
+"""Compares the single attribute targets and the vector targets of the Greedy solver
+on workloads that are skewed in either cpu or memory. The fleet has more nodes than
+needed, the number of used nodes shows the packing density of each target.
+"""
+
+import random
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.solving.greedy import Greedy
+
+from common import set_options
+
+TARGETS = ['cpu', 'memory', 'dot_product', 'l2_norm', 'dominant_resource', 'min_nodes']
+
+
+def generate(num_deployments, num_resources, seed=1):
+    _random = random.Random(seed)
+    deployments = []
+    for i in range(num_deployments):
+        if _random.random() < 0.5:
+            # cpu heavy
+            _cpu, _memory = _random.choice([1, 1.5, 2]), _random.choice([128, 256])
+        else:
+            # memory heavy
+            _cpu, _memory = _random.choice([0.1, 0.25]), _random.choice([1024, 1536, 2048])
+        deployments.append(DeploymentEntity(
+            name='deployment-{}'.format(i), cpu=_cpu, memory=_memory))
+    resources = [ResourceEntity(name='node-{}'.format(i),
+                                cpu=_random.choice([2, 4]),
+                                memory=_random.choice([2048, 4096]))
+                 for i in range(num_resources)]
+    return deployments, resources
+
+
+def run(target, fit, num_deployments, num_resources):
+    deployments, resources = generate(num_deployments, num_resources)
+    solver = Greedy(deployments, resources)
+    set_options(solver, [('target', target), ('fit', fit)])
+    solver.match()
+    assert not solver.get_placement_errors()
+    return sum(1 for r in solver.get_resources() if r.get_deployments())
+
+
+def main():
+    print('{:>12} {:>10} {:>20} {:>12} {:>12}'.format(
+        'deployments', 'resources', 'target', 'first_fit', 'best_fit'))
+    for num_deployments in [100, 500, 2000]:
+        num_resources = num_deployments
+        for target in TARGETS:
+            print('{:>12} {:>10} {:>20} {:>12} {:>12}'.format(
+                num_deployments, num_resources, target,
+                run(target, 'first_fit', num_deployments, num_resources),
+                run(target, 'best_fit', num_deployments, num_resources)))
+
+
+if __name__ == "__main__":
+    main()
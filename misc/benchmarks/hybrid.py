@@ -0,0 +1,73 @@
+"""Compares the SAT solver with the Hybrid solver on many label groups of which only
+a few are tight, i.e. request most of the idle resources of their suitable nodes.
+"""
+
+import contextlib
+import io
+import random
+import time
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.solving.hybrid import Hybrid
+from continuum_deployer.solving.sat import SAT
+
+from common import set_options
+
+
+def generate(num_groups, tight_share, nodes_per_group=10, seed=1):
+    _random = random.Random(seed)
+    deployments = []
+    resources = []
+    for g in range(num_groups):
+        _labels = {'group': str(g)}
+        _nodes = [ResourceEntity(name='node-{}-{}'.format(g, i),
+                                 cpu=_random.choice([2, 4]),
+                                 memory=_random.choice([2048, 4096]),
+                                 labels=_labels)
+                  for i in range(nodes_per_group)]
+        resources.extend(_nodes)
+        # tight groups request most of the cpu of their nodes, loose groups half of it
+        _share = 0.85 if _random.random() < tight_share else 0.5
+        _budget = sum(n.cpu for n in _nodes) * _share
+        i = 0
+        while _budget > 0:
+            _cpu = _random.choice([0.25, 0.5, 1])
+            deployments.append(DeploymentEntity(name='deployment-{}-{}'.format(g, i),
+                                                cpu=_cpu, memory=_random.choice([128, 256, 512]),
+                                                labels=_labels))
+            _budget -= _cpu
+            i += 1
+    return deployments, resources
+
+
+def run(solver_class, num_groups, tight_share):
+    deployments, resources = generate(num_groups, tight_share)
+    solver = solver_class(deployments, resources)
+    set_options(solver, [('target', 'min_idle_resources'), ('max_time', 10), ('workers', 8)])
+
+    _start = time.perf_counter()
+    # the solver statistics are not of interest here
+    with contextlib.redirect_stderr(io.StringIO()):
+        solver.match()
+    _duration = time.perf_counter() - _start
+
+    _nodes = sum(1 for r in solver.get_resources() if r.get_deployments())
+    _sat_groups = len(solver.model_stats)
+    return _duration, _nodes, _sat_groups, len(solver.get_placement_errors())
+
+
+def main():
+    print('{:>8} {:>12} {:>8} {:>10} {:>8} {:>12} {:>8}'.format(
+        'groups', 'deployments', 'solver', 'time [s]', 'nodes', 'sat groups', 'errors'))
+    for num_groups in [10, 50, 100]:
+        _num_deployments = len(generate(num_groups, 0.1)[0])
+        for solver_class in [SAT, Hybrid]:
+            _duration, _nodes, _sat_groups, _errors = run(solver_class, num_groups, 0.1)
+            print('{:>8} {:>12} {:>8} {:>10.3f} {:>8} {:>12} {:>8}'.format(
+                num_groups, _num_deployments, solver_class.__name__, _duration, _nodes,
+                _sat_groups, _errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measures the startup time of the CLI. Reports the wall time of some
+commands and the slowest imports of the CLI entrypoint as reported by
+`python -X importtime`.
+"""
+
+import subprocess
+import sys
+import time
+
+COMMANDS = [
+    ['-c', 'pass'],
+    ['-c', 'import continuum_deployer'],
+    ['-m', 'continuum_deployer.app', 'version'],
+    ['-m', 'continuum_deployer.app', '--help'],
+    ['-m', 'continuum_deployer.app', 'parse-resources', '-f', 'examples/resources/default.yaml'],
+]
+
+
+def timed_run(arguments, repeat=5):
+    _best = None
+    for _ in range(repeat):
+        _start = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _duration = time.perf_counter() - _start
+        _best = _duration if _best is None else min(_best, _duration)
+    return _best
+
+
+def import_times(module):
+    """Runs `python -X importtime` for the given module
+
+    :return: list of (cumulative time in us, module name) sorted descending
+    :rtype: list
+    """
+    _result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                             check=True, capture_output=True, text=True)
+    _times = []
+    for line in _result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, _cumulative, _name = line[len('import time:'):].split('|')
+        _times.append((int(_cumulative), _name.rstrip()))
+    return sorted(_times, reverse=True)
+
+
+def main():
+    print('{:<90} {:>10}'.format('command', 'wall [ms]'))
+    for arguments in COMMANDS:
+        print('{:<90} {:>10.1f}'.format(
+            ' '.join(['python'] + arguments), timed_run(arguments) * 1000))
+
+    print()
+    print('{:<60} {:>16}'.format('import of continuum_deployer.app', 'cumulative [ms]'))
+    for _cumulative, _name in import_times('continuum_deployer.app')[:20]:
+        print('{:<60} {:>16.1f}'.format(_name, _cumulative / 1000))
+
+    # heavy dependencies must only be imported by the commands that need them
+    _imported = {n.strip() for _, n in import_times('continuum_deployer.app')}
+    for module in ['ortools', 'numpy', 'prompt_toolkit', 'transitions', 'yaml']:
+        print('{:<60} {:>16}'.format(
+            module, 'imported' if module in _imported else 'deferred'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compares the number of used nodes of the min_nodes target of the Greedy solver
+(First-Fit-Decreasing and Best-Fit-Decreasing), the SAT solver and the Simulated
+Annealing plugin with the cpu target of the Greedy solver. The lower bound is the number of nodes needed to hold the total
+requested cpu and memory if the largest nodes are used first.
+"""
+
+import contextlib
+import io
+import time
+
+import continuum_deployer
+from continuum_deployer.solving.greedy import Greedy
+from continuum_deployer.solving.sat import SAT
+
+from common import generate, set_options
+
+VARIANTS = [
+    ('greedy cpu', Greedy, [('target', 'cpu'), ('fit', 'first_fit')]),
+    ('greedy ffd', Greedy, [('target', 'min_nodes'), ('fit', 'first_fit')]),
+    ('greedy bfd', Greedy, [('target', 'min_nodes'), ('fit', 'best_fit')]),
+    ('sat', SAT, [('target', 'min_nodes'), ('warm_start', 'greedy'),
+                  ('max_time', 10), ('workers', 8)]),
+    ('annealing', 'Simulated Annealing', [('target', 'min_nodes'), ('max_time', 5)]),
+]
+
+
+def lower_bound(deployments, resources):
+    _bound = 0
+    for attr in ['cpu', 'memory']:
+        _demand = sum(getattr(d, attr) for d in deployments)
+        _nodes = 0
+        for capacity in sorted((getattr(r, attr) for r in resources), reverse=True):
+            if _demand <= 0:
+                break
+            _demand -= capacity
+            _nodes += 1
+        _bound = max(_bound, _nodes)
+    return _bound
+
+
+def run(solver_class, options, num_deployments, num_resources):
+    deployments, resources = generate(
+        num_deployments, num_resources, deployment_cpu=[0.1, 0.25, 0.5, 1, 1.5],
+        deployment_memory=[128, 256, 512, 1024], resource_cpu=[2, 4],
+        resource_memory=[2048, 4096])
+    if isinstance(solver_class, str):
+        solver_class = continuum_deployer.plugins.plugin_manager.getPluginByName(
+            solver_class, 'Solver').plugin_object
+    solver = solver_class(deployments, resources)
+    set_options(solver, options)
+
+    _start = time.perf_counter()
+    # the solver statistics are not of interest here
+    with contextlib.redirect_stderr(io.StringIO()):
+        solver.match()
+    _duration = time.perf_counter() - _start
+
+    _nodes = sum(1 for r in solver.get_resources() if r.get_deployments())
+    return _duration, _nodes, len(solver.get_placement_errors()), lower_bound(deployments, resources)
+
+
+def main():
+    print('{:>12} {:>10} {:>12} {:>10} {:>8} {:>12} {:>8}'.format(
+        'deployments', 'resources', 'variant', 'time [s]', 'nodes', 'lower bound', 'errors'))
+    for num_resources in [20, 50, 100, 200]:
+        num_deployments = num_resources * 2
+        for name, solver_class, options in VARIANTS:
+            _duration, _nodes, _errors, _bound = run(
+                solver_class, options, num_deployments, num_resources)
+            print('{:>12} {:>10} {:>12} {:>10.3f} {:>8} {:>12} {:>8}'.format(
+                num_deployments, num_resources, name, _duration, _nodes, _bound, _errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compares the incremental capacity accounting of the ResourceEntity with
+the former implementation that re-sums all placed deployments on each fit check.
+"""
+
+import time
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.solving.greedy import Greedy
+
+
+class ResummingResourceEntity(ResourceEntity):
+    """Resource entity with the former fit check that re-sums all deployments"""
+
+    def check_resources_fit(self, entity):
+        available_cpu = self.cpu
+        available_memory = self.memory
+        deployments_proposal = self.deployments + [entity]
+        for deployment in deployments_proposal:
+            available_cpu -= deployment.cpu
+            available_memory -= deployment.memory
+
+        return available_memory >= 0 and available_cpu >= 0
+
+
+def run(resource_class, num_deployments, num_resources):
+    deployments = [DeploymentEntity(name='deployment-{}'.format(i), cpu=0.01, memory=8)
+                   for i in range(num_deployments)]
+    resources = [resource_class(name='node-{}'.format(i), cpu=num_deployments/100,
+                                memory=num_deployments*8) for i in range(num_resources)]
+
+    solver = Greedy(deployments, resources)
+    _start = time.perf_counter()
+    solver.match()
+    _duration = time.perf_counter() - _start
+
+    assert not solver.get_placement_errors()
+    return _duration
+
+
+def main():
+    print('{:>12} {:>10} {:>14} {:>14} {:>8}'.format(
+        'deployments', 'resources', 're-sum [s]', 'counters [s]', 'speedup'))
+    for num_deployments in [100, 1000, 5000, 10000]:
+        num_resources = 4
+        _resumming = run(ResummingResourceEntity,
+                         num_deployments, num_resources)
+        _counters = run(ResourceEntity, num_deployments, num_resources)
+        print('{:>12} {:>10} {:>14.4f} {:>14.4f} {:>7.1f}x'.format(
+            num_deployments, num_resources, _resumming, _counters, _resumming/_counters))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compares the packings of the combined SAT targets. The previous implementation of
+min_idle_resources called Minimize() twice, so only the idle cpu over all nodes was
+optimized, which is the same as the min_idle_cpu target. It is used as baseline for
+the lexicographic and the weighted objective mode.
+"""
+
+import contextlib
+import io
+import time
+
+from continuum_deployer.solving.sat import SAT
+
+from common import generate, set_options
+
+VARIANTS = [
+    ('baseline', 'min_idle_cpu', 'lexicographic'),
+    ('lexicographic', 'min_idle_resources', 'lexicographic'),
+    ('weighted', 'min_idle_resources', 'weighted'),
+]
+
+
+def run(target, objective_mode, num_deployments, num_resources, seed=1):
+    deployments, resources = generate(num_deployments, num_resources, seed)
+
+    solver = SAT(deployments, resources)
+    set_options(solver, [('target', target), ('objective_mode', objective_mode),
+                        ('warm_start', 'greedy'), ('max_time', 10), ('workers', 8)])
+
+    _start = time.perf_counter()
+    # the solver statistics are not of interest here
+    with contextlib.redirect_stderr(io.StringIO()):
+        solver.match()
+    _duration = time.perf_counter() - _start
+
+    _used = [r for r in solver.get_resources() if r.get_deployments()]
+    return (_duration, len(_used), sum(r.get_idle_cpu() for r in _used),
+            sum(r.get_idle_memory() for r in _used), solver.model_stats[0]['status'])
+
+
+def main():
+    print('{:>12} {:>10} {:>14} {:>10} {:>8} {:>12} {:>14} {:>10}'.format(
+        'deployments', 'resources', 'variant', 'time [s]', 'nodes', 'idle cpu', 'idle memory', 'status'))
+    for num_resources in [20, 50, 100]:
+        num_deployments = num_resources * 2
+        for name, target, objective_mode in VARIANTS:
+            _duration, _nodes, _idle_cpu, _idle_memory, _status = run(
+                target, objective_mode, num_deployments, num_resources)
+            print('{:>12} {:>10} {:>14} {:>10.3f} {:>8} {:>12.2f} {:>14} {:>10}'.format(
+                num_deployments, num_resources, name, _duration, _nodes, _idle_cpu, _idle_memory, _status))
+
+
+if __name__ == "__main__":
+    main()
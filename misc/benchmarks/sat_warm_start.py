@@ -0,0 +1,43 @@
+"""Compares cold SAT searches with searches that are warm started from a
+Greedy placement (setting warm_start=greedy) under a time limit.
+"""
+
+import contextlib
+import io
+import time
+
+from continuum_deployer.solving.sat import SAT
+
+from common import generate, set_options
+
+
+def run(warm_start, num_deployments, num_resources, seed=1):
+    deployments, resources = generate(num_deployments, num_resources, seed)
+
+    solver = SAT(deployments, resources)
+    set_options(solver, [('warm_start', warm_start), ('max_time', 10), ('workers', 8)])
+
+    _start = time.perf_counter()
+    # the solver statistics are not of interest here
+    with contextlib.redirect_stderr(io.StringIO()):
+        solver.match()
+    _duration = time.perf_counter() - _start
+    _stats = solver.model_stats[0]
+    return _duration, _stats['time_to_first_feasible'], _stats['status'], len(solver.get_placement_errors())
+
+
+def main():
+    print('{:>12} {:>10} {:>8} {:>10} {:>16} {:>10} {:>8}'.format(
+        'deployments', 'resources', 'warm', 'total [s]', 'first sol. [s]', 'status', 'errors'))
+    for num_resources in [50, 200, 500]:
+        num_deployments = num_resources * 4
+        for warm_start in ['none', 'greedy']:
+            _total, _first, _status, _errors = run(
+                warm_start, num_deployments, num_resources)
+            print('{:>12} {:>10} {:>8} {:>10.3f} {:>16} {:>10} {:>8}'.format(
+                num_deployments, num_resources, warm_start, _total,
+                '-' if _first is None else '{:.3f}'.format(_first), _status, _errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Synthetic scale benchmark of the import, solving and export stages.
+
+Seeded generators create node fleets (sizes, label distribution) and workload manifests
+(replica counts, cpu or memory skew) from 10 to 100k workloads. The script times
+`Helm.parse`, `Solver.match_labeled` of the selected solvers and `Kubernetes.export`
+and writes the results as CSV or JSON. A previous JSON result can be passed as baseline,
+the script exits with 1 if a stage got slower than the given tolerance.
+
+    python misc/benchmarks/scale.py --sizes 10,1000,100000 -f json -o results.json
+    python misc/benchmarks/scale.py -f json --baseline results.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+from continuum_deployer.dsl.exporter.kubernetes import Kubernetes
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.utils.exceptions import RequirementsError
+from continuum_deployer.utils.yaml_handling import YamlHandling
+
+from common import set_options
+
+FIELDS = ['stage', 'solver', 'size', 'deployments', 'resources',
+          'seconds', 'placement_errors', 'status']
+
+SOLVERS = {
+    'greedy': ('continuum_deployer.solving.greedy', 'Greedy', []),
+    'greedy_numpy': ('continuum_deployer.solving.greedy', 'Greedy', [('engine', 'numpy')]),
+    'sat': ('continuum_deployer.solving.sat', 'SAT', [('max_time', 10), ('workers', 8)]),
+    'hybrid': ('continuum_deployer.solving.hybrid', 'Hybrid', [('max_time', 10), ('workers', 8)]),
+}
+
+ZONES = ['zone-a', 'zone-b', 'zone-c']
+
+
+def generate_fleet(num_resources, seed=1, label_share=0.3):
+    """Generates a node fleet, a share of the nodes is labeled with one of the zones
+
+    :param num_resources: number of nodes
+    :type num_resources: int
+    :param seed: seed of the generator
+    :type seed: int
+    :param label_share: share of labeled nodes
+    :type label_share: float
+    :return: list of resource entities
+    :rtype: list
+    """
+    _random = random.Random(seed)
+    _resources = []
+    for i in range(num_resources):
+        _labels = None
+        if _random.random() < label_share:
+            _labels = {'zone': _random.choice(ZONES)}
+        _resources.append(ResourceEntity(name='node-{}'.format(i),
+                                         cpu=_random.choice([2, 4, 8, 16]),
+                                         memory=_random.choice([4096, 8192, 16384, 32768]),
+                                         labels=_labels))
+    return _resources
+
+
+def generate_manifest(num_deployments, seed=1, max_replicas=8, skew=0.3, label_share=0.1):
+    """Generates a multi document manifest of Kubernetes Deployments with about the
+    given number of replicas in total
+
+    :param num_deployments: number of replicas in total
+    :type num_deployments: int
+    :param seed: seed of the generator
+    :type seed: int
+    :param max_replicas: largest replica count of a Deployment
+    :type max_replicas: int
+    :param skew: share of Deployments that are either cpu or memory heavy
+    :type skew: float
+    :param label_share: share of Deployments with a zone node selector
+    :type label_share: float
+    :return: list of Deployment documents
+    :rtype: list
+    """
+    _random = random.Random(seed)
+    _docs = []
+    _remaining = num_deployments
+    while _remaining > 0:
+        _replicas = min(_remaining, _random.randint(1, max_replicas))
+        _remaining -= _replicas
+        _cpu = _random.choice([100, 250, 500, 1000])
+        _memory = _random.choice([128, 256, 512, 1024])
+        if _random.random() < skew:
+            if _random.random() < 0.5:
+                _cpu *= 4
+            else:
+                _memory *= 4
+        _spec = {
+            'containers': [{
+                'name': 'app',
+                'image': 'nginx:1.19',
+                'resources': {'requests': {'cpu': '{}m'.format(_cpu),
+                                           'memory': '{}Mi'.format(_memory)}},
+            }],
+        }
+        if _random.random() < label_share:
+            _spec['nodeSelector'] = {'zone': _random.choice(ZONES)}
+        _docs.append({
+            'apiVersion': 'apps/v1',
+            'kind': 'Deployment',
+            'metadata': {'name': 'app-{}'.format(len(_docs))},
+            'spec': {
+                'replicas': _replicas,
+                'selector': {'matchLabels': {'app': 'app-{}'.format(len(_docs))}},
+                'template': {'metadata': {'labels': {'app': 'app-{}'.format(len(_docs))}},
+                             'spec': _spec},
+            },
+        })
+    return _docs
+
+
+def to_deployments(docs):
+    """Creates the deployment entities of the generated documents without the Helm importer
+
+    :param docs: generated Deployment documents
+    :type docs: list
+    :return: list of deployment entities
+    :rtype: list
+    """
+    _deployments = []
+    for doc in docs:
+        _spec = doc['spec']['template']['spec']
+        _requests = _spec['containers'][0]['resources']['requests']
+        _deployment = DeploymentEntity(name=doc['metadata']['name'],
+                                       cpu=int(_requests['cpu'].rstrip('m')) / 1000,
+                                       memory=int(int(_requests['memory'].rstrip('Mi')) * 1.048576),
+                                       labels=_spec.get('nodeSelector'), yaml=doc)
+        if doc['spec']['replicas'] == 1:
+            _deployments.append(_deployment)
+            continue
+        for i in range(doc['spec']['replicas']):
+            _deployments.append(DeploymentEntity(
+                name='{}-{}'.format(_deployment.name, i), cpu=_deployment.cpu,
+                memory=_deployment.memory, labels=_deployment.labels, yaml=doc, replica=i))
+    return _deployments
+
+
+def timed(function, repeat):
+    """Runs a function repeatedly and returns the best duration and the last result"""
+    _best = None
+    _result = None
+    for _ in range(repeat):
+        _start = time.perf_counter()
+        _result = function()
+        _duration = time.perf_counter() - _start
+        _best = _duration if _best is None else min(_best, _duration)
+    return _best, _result
+
+
+def bench_parse(manifest, repeat):
+    from continuum_deployer.dsl.importer.helm import Helm
+
+    def _parse():
+        _helm = Helm()
+        _helm.parse(manifest)
+        return _helm.get_app_modules()
+
+    return timed(_parse, repeat)
+
+
+def bench_solver(name, deployments, fleet_seed, num_resources, repeat):
+    _module, _class, _options = SOLVERS[name]
+    _solver_class = getattr(__import__(_module, fromlist=[_class]), _class)
+
+    def _match():
+        _resources = generate_fleet(num_resources, fleet_seed)
+        _solver = _solver_class(deployments, _resources)
+        set_options(_solver, _options)
+        _start = time.perf_counter()
+        _solver.match_labeled()
+        return time.perf_counter() - _start, _solver
+
+    _best = None
+    _solver = None
+    # solver statistics are written to stderr
+    with contextlib.redirect_stderr(io.StringIO()):
+        for _ in range(repeat):
+            _duration, _solver = _match()
+            _best = _duration if _best is None else min(_best, _duration)
+    return _best, _solver
+
+
+def bench_export(resources, repeat):
+    return timed(lambda: Kubernetes(output_stream=io.StringIO()).export(resources), repeat)
+
+
+def run(sizes, solvers, max_sizes, seed, workloads_per_node, repeat):
+    _results = []
+
+    def _record(stage, solver, size, deployments, resources, seconds=None,
+                placement_errors=None, status='ok'):
+        _results.append({'stage': stage, 'solver': solver, 'size': size,
+                         'deployments': deployments, 'resources': resources,
+                         'seconds': seconds, 'placement_errors': placement_errors,
+                         'status': status})
+        _line = '{:<8} {:<14} {:>8} {:>10} {:>10} {:>10} {}'.format(
+            stage, solver or '', size, deployments, resources,
+            '{:.4f}'.format(seconds) if seconds is not None else '-', status)
+        print(_line, file=sys.stderr)
+
+    for size in sizes:
+        _num_resources = max(1, size // workloads_per_node)
+        _docs = generate_manifest(size, seed)
+        _manifest = ''.join('---\n' + YamlHandling.dump(doc) for doc in _docs)
+        _deployments = to_deployments(_docs)
+
+        try:
+            _seconds, _parsed = bench_parse(_manifest, repeat)
+            _record('parse', None, size, len(_parsed), 0, _seconds)
+        except RequirementsError as e:
+            _record('parse', None, size, len(_deployments), 0,
+                    status='skipped: {}'.format(e.message))
+
+        _placed = None
+        for name in solvers:
+            if size > max_sizes.get(name, size):
+                _record('match', name, size, len(_deployments), _num_resources,
+                        status='skipped: larger than {}'.format(max_sizes[name]))
+                continue
+            _seconds, _solver = bench_solver(
+                name, _deployments, seed, _num_resources, repeat)
+            _record('match', name, size, len(_deployments), _num_resources, _seconds,
+                    len(_solver.get_placement_errors()))
+            if _placed is None:
+                _placed = _solver.get_resources()
+
+        if _placed is not None:
+            _seconds, _ = bench_export(_placed, repeat)
+            _record('export', None, size, sum(len(r.get_deployments()) for r in _placed),
+                    len(_placed), _seconds)
+    return _results
+
+
+def compare(results, baseline, tolerance):
+    """Compares the stage durations with a baseline
+
+    :return: list of regression messages
+    :rtype: list
+    """
+    _key = ('stage', 'solver', 'size')
+    _baseline = {tuple(r[k] for k in _key): r for r in baseline['results']}
+    _regressions = []
+    for result in results:
+        _previous = _baseline.get(tuple(result[k] for k in _key))
+        if _previous is None or result['seconds'] is None or not _previous['seconds']:
+            continue
+        _ratio = result['seconds'] / _previous['seconds']
+        if _ratio > 1 + tolerance:
+            _regressions.append('{} {} {}: {:.4f}s -> {:.4f}s ({:+.0%})'.format(
+                result['stage'], result['solver'] or '', result['size'],
+                _previous['seconds'], result['seconds'], _ratio - 1))
+    return _regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='10,100,1000,10000,100000',
+                        help='comma separated numbers of workloads')
+    parser.add_argument('--solvers', default='greedy,greedy_numpy,sat',
+                        help='comma separated solvers, any of {}'.format(', '.join(SOLVERS)))
+    parser.add_argument('--max-size', action='append', default=[],
+                        help='largest size of a solver as solver=size, '
+                             'defaults to greedy=10000 and sat=1000 and hybrid=10000')
+    parser.add_argument('--workloads-per-node', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per stage, the best duration is reported')
+    parser.add_argument('-f', '--format', choices=['csv', 'json'], default='csv')
+    parser.add_argument('-o', '--output', default=None, help='output file, defaults to stdout')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown compared with the baseline')
+    args = parser.parse_args()
+
+    _max_sizes = {'greedy': 10000, 'sat': 1000, 'hybrid': 10000}
+    for item in args.max_size:
+        _name, _, _size = item.partition('=')
+        _max_sizes[_name] = int(_size)
+    _solvers = [s for s in args.solvers.split(',') if s]
+    for name in _solvers:
+        if name not in SOLVERS:
+            parser.error('unknown solver {}'.format(name))
+
+    _results = run([int(s) for s in args.sizes.split(',')], _solvers, _max_sizes,
+                   args.seed, args.workloads_per_node, args.repeat)
+
+    _output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'json':
+            json.dump({
+                'python': platform.python_version(),
+                'libyaml': YamlHandling.LIBYAML,
+                'seed': args.seed,
+                'workloads_per_node': args.workloads_per_node,
+                'results': _results,
+            }, _output, indent=2)
+            _output.write('\n')
+        else:
+            _writer = csv.DictWriter(_output, fieldnames=FIELDS)
+            _writer.writeheader()
+            _writer.writerows(_results)
+    finally:
+        if _output is not sys.stdout:
+            _output.close()
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            _regressions = compare(_results, json.load(file), args.tolerance)
+        for regression in _regressions:
+            print('[Regression] {}'.format(regression), file=sys.stderr)
+        if _regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
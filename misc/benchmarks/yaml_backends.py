@@ -0,0 +1,51 @@
+"""Compares the pure Python and the libyaml (C) backend of PyYAML on the
+example charts for loading and dumping.
+"""
+
+import glob
+import time
+
+import yaml
+
+
+def timed(function, repeat=3):
+    _best = None
+    for _ in range(repeat):
+        _start = time.perf_counter()
+        _result = function()
+        _duration = time.perf_counter() - _start
+        _best = _duration if _best is None else min(_best, _duration)
+    return _best, _result
+
+
+def main():
+    if not yaml.__with_libyaml__:
+        print('PyYAML is built without libyaml, only the pure Python backend is available')
+        return
+
+    _files = sorted(glob.glob('examples/charts/**/*.yaml', recursive=True))
+    _files = [f for f in _files if '/templates/' not in f]
+
+    print('{:<50} {:>10} {:>10} {:>8} {:>10} {:>10} {:>8}'.format(
+        'file', 'load [s]', 'cload [s]', 'speedup', 'dump [s]', 'cdump [s]', 'speedup'))
+    for path in _files:
+        with open(path, 'r') as file:
+            _content = file.read()
+
+        _load, _docs = timed(lambda: list(
+            yaml.load_all(_content, Loader=yaml.SafeLoader)))
+        _cload, _cdocs = timed(lambda: list(
+            yaml.load_all(_content, Loader=yaml.CSafeLoader)))
+        assert _docs == _cdocs
+
+        _dump, _ = timed(lambda: [yaml.dump(d, Dumper=yaml.SafeDumper)
+                                  for d in _docs])
+        _cdump, _ = timed(lambda: [yaml.dump(d, Dumper=yaml.CSafeDumper)
+                                   for d in _docs])
+
+        print('{:<50} {:>10.4f} {:>10.4f} {:>7.1f}x {:>10.4f} {:>10.4f} {:>7.1f}x'.format(
+            path, _load, _cload, _load/_cload, _dump, _cdump, _dump/_cdump))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import pstats
+import subprocess
+import sys
+import threading
+
+from click.testing import CliRunner
+
+import continuum_deployer
+from continuum_deployer.app import cli
+from continuum_deployer.utils.instrumentation import Instrumentation
+
+
+def test_heavy_imports_deferred():
+    _check = ('import sys, continuum_deployer.app; '
+              'print(sorted(m for m in ("ortools", "numpy", "prompt_toolkit", "transitions", "yapsy.PluginManager") '
+              'if m in sys.modules))')
+    _result = subprocess.run([sys.executable, '-c', _check],
+                             check=True, capture_output=True, text=True)
+    assert _result.stdout.strip() == '[]'
+
+
+def test_plugins_loaded_on_access():
+    assert continuum_deployer.plugins.get_plugin_manager() is not None
+    assert continuum_deployer.plugins is continuum_deployer.plugins
+
+
+def test_version():
+    _result = CliRunner().invoke(cli, ['version'])
+    assert _result.exit_code == 0
+    assert continuum_deployer.app_version in _result.output
+
+
+def test_profile(tmp_path):
+    _result = CliRunner().invoke(cli, [
+        '--profile', str(tmp_path), 'solve', '-r', './examples/resources/default.yaml',
+        '-d', './tests/yaml/deployments.yaml', '-f', 'manifest', '-o', str(tmp_path / 'results.yaml')])
+    assert _result.exit_code == 0
+
+    _stats = pstats.Stats(str(tmp_path / 'profile.pstats'))
+    assert any(f[2] == 'match_labeled' for f in _stats.stats)
+
+    _stacks = (tmp_path / 'profile.collapsed').read_text().splitlines()
+    assert any('match_labeled' in line for line in _stacks)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in _stacks)
+
+    _allocations = (tmp_path / 'allocations.txt').read_text()
+    for stage in ['resource_parse', 'import', 'solve', 'export']:
+        assert 'Stage {}:'.format(stage) in _allocations
+
+
+def test_solve_invalid_solver():
+    _result = CliRunner().invoke(cli, [
+        'solve', '-r', './examples/resources/default.yaml',
+        '-d', './tests/yaml/deployments.yaml', '-s', '-1'])
+    assert _result.exit_code == 2
+
+
+def test_instrumentation_listener_threads():
+    _stages = []
+
+    def _listener(stage, started):
+        _stages.append((stage, started))
+
+    def _run(stage):
+        with Instrumentation().timer(stage):
+            pass
+
+    Instrumentation.add_listener(_listener)
+    try:
+        _thread = threading.Thread(target=_run, args=('other',))
+        _thread.start()
+        _thread.join()
+        _run('own')
+    finally:
+        Instrumentation.remove_listener(_listener)
+    _run('removed')
+
+    # stages of other threads are not reported
+    assert _stages == [('own', True), ('own', False)]
@@ -0,0 +1,76 @@
+import json
+
+import click
+import pytest
+
+from continuum_deployer.utils.batch_cli import BatchCli
+from continuum_deployer.utils.yaml_handling import YamlHandling
+
+
+def test_batch_solve_json(tmp_path):
+    output = tmp_path / 'results.json'
+    batch_cli = BatchCli('./examples/resources/default.yaml', './tests/yaml/deployments.yaml',
+                         solver='1', solver_options=['max_time=10', 'workers=1'],
+                         output_path=str(output))
+
+    assert batch_cli.run() == BatchCli.EXIT_OK
+
+    results = json.loads(output.read_text())
+    assert results['solver'] == 'SAT'
+    assert results['config']['max_time'] == 10
+    assert results['placement_errors'] == []
+    assert sorted(d for p in results['placements'] for d in p['deployments']) == \
+        sorted(m.name for m in batch_cli.importer.get_app_modules())
+
+
+def test_batch_solve_manifest(tmp_path):
+    output = tmp_path / 'results.yaml'
+    batch_cli = BatchCli('./examples/resources/default.yaml', './tests/yaml/replicas.yaml',
+                         importer_options=['parse_mode=streaming'], output_format='manifest',
+                         output_path=str(output))
+
+    # one replica does not fit the resources
+    assert batch_cli.run() == BatchCli.EXIT_PLACEMENT_ERRORS
+
+    manifests = list(YamlHandling.load_all(output.read_text()))
+    assert len(manifests) == 5
+
+
+def test_batch_solve_metrics(tmp_path):
+    metrics = tmp_path / 'metrics.json'
+    batch_cli = BatchCli('./examples/resources/default.yaml', './tests/yaml/deployments.yaml',
+                         solver='1', solver_options=['max_time=10', 'workers=1'],
+                         output_path=str(tmp_path / 'results.json'), metrics_path=str(metrics))
+
+    assert batch_cli.run() == BatchCli.EXIT_OK
+
+    results = json.loads(metrics.read_text())
+    for stage in ['resource_parse', 'import', 'solve', 'grouping', 'model_build', 'search']:
+        assert results['timers'][stage]['calls'] >= 1
+    assert results['counters']['deployments'] == len(batch_cli.importer.get_app_modules())
+    assert results['counters']['placement_errors'] == 0
+
+
+def test_batch_solve_metrics_prometheus(tmp_path):
+    metrics = tmp_path / 'metrics.prom'
+    batch_cli = BatchCli('./examples/resources/default.yaml', './tests/yaml/replicas.yaml',
+                         output_path=str(tmp_path / 'results.json'),
+                         metrics_path=str(metrics), metrics_format='prometheus')
+
+    # metrics are written although a replica does not fit the resources
+    assert batch_cli.run() == BatchCli.EXIT_PLACEMENT_ERRORS
+
+    lines = metrics.read_text().splitlines()
+    assert '# TYPE continuum_deployer_stage_seconds_total counter' in lines
+    assert any(line.startswith('continuum_deployer_stage_calls_total{stage="solve"} 1')
+               for line in lines)
+    assert 'continuum_deployer_placement_errors 1' in lines
+
+
+@pytest.mark.parametrize('solver, solvermode', [('-1', None), ('x', None), ('9', None), ('0', '42')])
+def test_batch_solve_invalid_solver(solver, solvermode):
+    batch_cli = BatchCli('./examples/resources/default.yaml', './tests/yaml/deployments.yaml',
+                         solver=solver, solvermode=solvermode)
+
+    with pytest.raises(click.BadParameter):
+        batch_cli.run()
@@ -0,0 +1,77 @@
+import io
+
+from continuum_deployer.dsl.exporter.kubernetes import Kubernetes
+from continuum_deployer.dsl.importer.documents import DocumentReference
+from continuum_deployer.dsl.importer.helm import Helm
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.utils.batch_cli import BatchCli
+from continuum_deployer.utils.yaml_handling import YamlHandling
+
+
+def test_kubernetes_export():
+    extractor = Helm()
+    extractor.parse(open('./tests/yaml/multi_component.yaml', 'r'))
+    modules = extractor.get_app_modules()
+
+    resources = [ResourceEntity(name='test-node-1', memory=4096, cpu=4),
+                 ResourceEntity(name='test-node-2', memory=4096, cpu=4)]
+    resources[0].add_deployment(modules[0])
+    resources[1].add_deployment(modules[1])
+
+    output = io.StringIO()
+    Kubernetes(output_stream=output).export(resources)
+    manifests = list(YamlHandling.load_all(output.getvalue()))
+
+    assert len(manifests) == 2
+    for manifest, resource in zip(manifests, resources):
+        assert manifest['spec']['template']['spec']['nodeSelector'] == {
+            'kubernetes.io/hostname': resource.name}
+
+
+def test_kubernetes_export_replicas():
+    extractor = Helm()
+    extractor.parse(open('./tests/yaml/replicas.yaml', 'r'))
+    modules = extractor.get_app_modules()[:3]
+    _template = YamlHandling.dump(modules[0].yaml)
+
+    resources = [ResourceEntity(name='test-node-{}'.format(i), memory=4096, cpu=4)
+                 for i in range(3)]
+    for module, resource in zip(modules, resources):
+        resource.add_deployment(module)
+
+    output = io.StringIO()
+    Kubernetes(output_stream=output).export(resources)
+    manifests = list(YamlHandling.load_all(output.getvalue()))
+
+    assert [m['metadata']['name'] for m in manifests] == [
+        'nginx-deployment-1-0', 'nginx-deployment-1-1', 'nginx-deployment-1-2']
+    assert [m['spec']['template']['spec']['nodeSelector']['kubernetes.io/hostname']
+            for m in manifests] == ['test-node-0', 'test-node-1', 'test-node-2']
+    assert all(m['spec']['replicas'] == 1 for m in manifests)
+    # shared template is left untouched
+    assert YamlHandling.dump(modules[0].yaml) == _template
+
+
+def test_kubernetes_export_streamed_replicas(monkeypatch):
+    extractor = Helm()
+    BatchCli.apply_options(extractor.get_config(), ['parse_mode=streaming'])
+    extractor.parse(extractor.get_dsl_content('./tests/yaml/replicas.yaml', 'yaml'))
+    modules = extractor.get_app_modules()[:3]
+
+    resources = [ResourceEntity(name='test-node-{}'.format(i), memory=4096, cpu=4)
+                 for i in range(3)]
+    for module, resource in zip(modules, resources):
+        resource.add_deployment(module)
+
+    _loads = []
+    _load = DocumentReference.load
+    monkeypatch.setattr(DocumentReference, 'load', lambda self: _loads.append(self) or _load(self))
+
+    output = io.StringIO()
+    Kubernetes(output_stream=output).export(resources)
+    manifests = list(YamlHandling.load_all(output.getvalue()))
+
+    # the shared source document is loaded once for all replicas
+    assert len(_loads) == 1
+    assert [m['metadata']['name'] for m in manifests] == [
+        'nginx-deployment-1-0', 'nginx-deployment-1-1', 'nginx-deployment-1-2']
@@ -1,5 +1,11 @@
+import gzip
+import io
+import os
 import pytest
+from continuum_deployer.dsl.importer.documents import iter_documents
 from continuum_deployer.dsl.importer.helm import Helm
+from continuum_deployer.utils.batch_cli import BatchCli
+from continuum_deployer.utils.exceptions import ImporterError
 
 
 @pytest.fixture(scope="function")
@@ -49,3 +55,178 @@ def test_k8s_memory_calc(extractor):
 
     for memory in _memory_values:
         assert Helm.parse_k8s_memory_value(memory[0]) == memory[1]
+
+
+def _set_streaming(extractor):
+    BatchCli.apply_options(extractor.get_config(), ['parse_mode=streaming'])
+
+
+@pytest.mark.parametrize('path', ['./tests/yaml/deployments.yaml',
+                                  './tests/yaml/multi_component.yaml',
+                                  './tests/yaml/replicas.yaml'])
+def test_streaming_extract(path):
+    full = Helm()
+    full.parse(open(path, 'r'))
+
+    streaming = Helm()
+    _set_streaming(streaming)
+    streaming.parse(streaming.get_dsl_content(path, 'yaml'))
+
+    modules = streaming.get_app_modules()
+    assert len(modules) == len(full.get_app_modules())
+    for module, expected in zip(modules, full.get_app_modules()):
+        assert module.yaml is None
+        assert module.source.path is not None
+        assert (module.name, module.cpu, module.memory, module.labels) == \
+            (expected.name, expected.cpu, expected.memory, expected.labels)
+        assert module.get_yaml() == expected.yaml
+
+
+def test_streaming_extract_pipe():
+    extractor = Helm()
+    _set_streaming(extractor)
+
+    with open('./tests/yaml/multi_component.yaml', 'r') as file:
+        # str input is not seekable by path, documents are kept compressed
+        extractor.parse(file.read())
+
+    modules = extractor.get_app_modules()
+    assert len(modules) == 2
+    assert modules[0].source.data is not None
+    assert modules[0].get_yaml()['kind'] == 'StatefulSet'
+
+
+def test_iter_documents():
+    stream = io.StringIO(
+        '# Source: first\nkind: A\n---\n# Source: second\nkind: B\n--- # comment\nkind: C\n----\n')
+
+    documents = list(iter_documents(stream))
+
+    assert [d[0] for d in documents] == [
+        '# Source: first\nkind: A\n',
+        '---\n# Source: second\nkind: B\n',
+        '--- # comment\nkind: C\n----\n',
+    ]
+    assert [d[1].read() for d in documents] == [d[0] for d in documents]
+
+
+def test_replicas_share_template(extractor):
+    stream = open('./tests/yaml/replicas.yaml', 'r')
+
+    extractor.parse(stream)
+    modules = extractor.get_app_modules()
+
+    assert [m.name for m in modules[:3]] == [
+        'nginx-deployment-1-0', 'nginx-deployment-1-1', 'nginx-deployment-1-2']
+    assert [m.replica for m in modules[:4]] == [0, 1, 2, None]
+    assert modules[0].yaml is modules[1].yaml is modules[2].yaml
+
+
+_FAKE_HELM = '''#!/bin/sh
+if [ "$1" = "version" ]; then echo v3.0.0; exit 0; fi
+name=$(basename "$2" .tgz)
+if [ "$name" = "broken" ]; then echo "chart is broken" >&2; exit 1; fi
+echo "start $name $(date +%s.%N)" >> "$HELM_LOG"
+sleep 0.3
+echo "end $name $(date +%s.%N)" >> "$HELM_LOG"
+cat <<DOC
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: $name
+spec:
+  replicas: 2
+  template:
+    spec:
+      containers:
+      - name: app
+        resources:
+          requests:
+            cpu: 100m
+            memory: 64Mi
+DOC
+'''
+
+
+@pytest.fixture(scope="function")
+def charts(tmp_path, monkeypatch):
+    _bin = tmp_path / 'bin'
+    _bin.mkdir()
+    (_bin / 'helm').write_text(_FAKE_HELM)
+    (_bin / 'helm').chmod(0o755)
+    monkeypatch.setenv('PATH', '{}:{}'.format(_bin, os.environ['PATH']))
+    monkeypatch.setenv('HELM_LOG', str(tmp_path / 'helm.log'))
+
+    _charts = tmp_path / 'charts'
+    for name in ['d-chart', 'b-chart', 'c-chart']:
+        (_charts / name).mkdir(parents=True)
+        (_charts / name / 'Chart.yaml').write_text('name: {}\n'.format(name))
+    (_charts / 'a-chart.tgz').write_bytes(gzip.compress(b''))
+    (_charts / 'values.yaml').write_text('{}\n')
+    return _charts
+
+
+@pytest.mark.parametrize('parse_mode', ['full', 'streaming'])
+def test_chart_directory_extract(charts, parse_mode):
+    extractor = Helm()
+    BatchCli.apply_options(extractor.get_config(), ['parse_mode=' + parse_mode])
+
+    extractor.parse(extractor.get_dsl_content(
+        [str(charts / 'd-chart'), str(charts)], 'chart'))
+
+    # merged in the order of the given paths and the names in the directory
+    assert [m.name for m in extractor.get_app_modules()] == [
+        '{}-chart-{}'.format(c, i) for c in 'dabcd' for i in range(2)]
+    assert extractor.get_instrumentation().get_count('rendered_charts') == 5
+
+    # helm processes ran concurrently
+    _log = [line.split() for line in (charts.parent / 'helm.log').read_text().splitlines()]
+    _first_end = min(float(t) for event, _, t in _log if event == 'end')
+    assert sum(1 for event, _, t in _log if event == 'start' and float(t) < _first_end) > 1
+
+
+def test_chart_render_error(charts):
+    (charts / 'broken').mkdir()
+    (charts / 'broken' / 'Chart.yaml').write_text('name: broken\n')
+
+    extractor = Helm()
+    with pytest.raises(ImporterError) as e:
+        extractor.get_dsl_content(str(charts), 'chart')
+    assert e.value.message == '{}: chart is broken\n'.format(charts / 'broken')
+
+    (charts / 'empty').mkdir()
+    with pytest.raises(ImporterError):
+        extractor.get_dsl_content(str(charts / 'empty'), 'chart')
+
+
+@pytest.mark.parametrize('parse_mode', ['full', 'streaming'])
+def test_alter_chart_directory(charts, parse_mode, monkeypatch):
+    from continuum_deployer.solving.greedy import Greedy
+    from continuum_deployer.utils import match_cli
+
+    extractor = Helm()
+    BatchCli.apply_options(extractor.get_config(), ['parse_mode=' + parse_mode])
+    cli = match_cli.MatchCli(None, str(charts), None, 'chart', None, None)
+    cli.settings.dsl_importer = extractor
+    cli._read_dsl()
+    cli._parse_dsl()
+    cli.settings.solver = Greedy(cli.settings.deployment_entities, [])
+
+    _edited = []
+
+    def _edit(content):
+        _edited.append(content)
+        return content.replace('name: d-chart', 'name: e-chart')
+
+    # resources are kept, deployments are edited
+    _answers = iter([False, True])
+    monkeypatch.setattr(match_cli, 'confirm', lambda message: next(_answers))
+    monkeypatch.setattr(match_cli.click, 'edit', _edit)
+    monkeypatch.setattr(cli, 'start_matching', lambda: None)
+    cli.on_enter_alter_definitions()
+
+    # the rendered charts are edited as one multi document YAML
+    assert len(_edited) == 1 and _edited[0].count('kind: Deployment') == 4
+    assert [m.name for m in cli.settings.deployment_entities] == [
+        '{}-chart-{}'.format(c, i) for c in 'abce' for i in range(2)]
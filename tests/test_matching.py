@@ -1,11 +1,23 @@
+import random
 import pytest
+import continuum_deployer
+from continuum_deployer.solving import solver as solver_module
 from continuum_deployer.solving.solver import Solver
+from continuum_deployer.solving.delta import SolverDelta
 from continuum_deployer.solving.greedy import Greedy
+from continuum_deployer.solving.sat import SAT
+from continuum_deployer.solving.hybrid import Hybrid
 from continuum_deployer.resources.deployment import DeploymentEntity
 from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.utils.batch_cli import BatchCli
 from continuum_deployer.utils.exceptions import SolverError
 
 
+def _set_options(matcher, options):
+    BatchCli.apply_options(matcher.get_config(),
+                           ['{}={}'.format(name, value) for name, value in options])
+
+
 def test_upper_bound_cpu_detection():
     matcher = Solver(
         [DeploymentEntity(name='test-deployment', memory=1024, cpu=2)],
@@ -157,3 +169,529 @@ def test_greedy_matcher_with_labels():
     for i, res in enumerate(resources_matched):
         for exp_deploy in expected_results[i]:
             assert exp_deploy in res.get_deployments()
+
+
+def _random_instance(seed, num_deployments, num_resources):
+    _random = random.Random(seed)
+    deployments = [
+        DeploymentEntity(name='test-deployment-{}'.format(i),
+                         memory=_random.choice([128, 256, 512, 1024]),
+                         cpu=_random.choice([0.1, 0.25, 0.5, 1, 2]))
+        for i in range(num_deployments)
+    ]
+    resources = [
+        ResourceEntity(name='test-node-{}'.format(i),
+                       memory=_random.choice([1024, 2048, 4096]),
+                       cpu=_random.choice([1, 2, 4]))
+        for i in range(num_resources)
+    ]
+    return deployments, resources
+
+
+def _placements_of(matcher):
+    return [[d.name for d in r.get_deployments()] for r in matcher.get_resources()], \
+        [d.name for d in matcher.get_placement_errors()]
+
+
+@pytest.mark.parametrize('target', ['cpu', 'memory', 'dot_product', 'l2_norm', 'dominant_resource'])
+@pytest.mark.parametrize('fit', ['first_fit', 'best_fit', 'worst_fit'])
+def test_greedy_numpy_engine_equivalence(target, fit):
+
+    results = []
+    for engine in ['python', 'numpy']:
+        deployments, resources = _random_instance(42, 60, 12)
+        matcher = Greedy(deployments, resources)
+        _set_options(matcher, [('target', target), ('fit', fit), ('engine', engine)])
+        matcher.match()
+        results.append(_placements_of(matcher))
+
+    assert results[0] == results[1]
+
+
+def test_greedy_best_fit():
+    deployment = DeploymentEntity(name='test-deployment', memory=256, cpu=1)
+
+    matcher = Greedy(
+        [deployment],
+        [
+            ResourceEntity(name='test-node-1', memory=1024, cpu=4),
+            ResourceEntity(name='test-node-2', memory=1024, cpu=2),
+            ResourceEntity(name='test-node-3', memory=1024, cpu=1),
+        ]
+    )
+    _set_options(matcher, [('fit', 'best_fit')])
+    matcher.match()
+
+    assert deployment in matcher.get_resources()[2].get_deployments()
+
+
+def test_sat_solver():
+
+    deployments = [
+        DeploymentEntity(name='test-deployment-1', memory=1024, cpu=1),
+        DeploymentEntity(name='test-deployment-2', memory=512, cpu=2),
+        DeploymentEntity(name='test-deployment-3', memory=256, cpu=0.5),
+    ]
+
+    matcher = SAT(
+        deployments,
+        [
+            ResourceEntity(name='test-node-1', memory=1024, cpu=1),
+            ResourceEntity(name='test-node-2', memory=1024, cpu=3),
+            ResourceEntity(name='test-node-3', memory=128, cpu=4),
+        ]
+    )
+    matcher.match()
+    resources_matched = matcher.get_resources()
+
+    assert not matcher.get_placement_errors()
+    assert deployments[0] in resources_matched[0].get_deployments()
+    assert deployments[1] in resources_matched[1].get_deployments()
+    assert deployments[2] in resources_matched[1].get_deployments()
+
+
+def test_sat_solver_pruned_model():
+
+    matcher = SAT(
+        [
+            DeploymentEntity(name='test-deployment-1', memory=1024, cpu=1),
+            DeploymentEntity(name='test-deployment-2', memory=128, cpu=2),
+        ],
+        [
+            ResourceEntity(name='test-node-1', memory=1024, cpu=1),
+            ResourceEntity(name='test-node-2', memory=512, cpu=3),
+        ]
+    )
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    # only one feasible node per deployment, no variables for the other pairs
+    assert matcher.model_stats[0]['variables'] == 2
+
+
+def test_sat_solver_infeasible_group():
+
+    deployments = [
+        DeploymentEntity(name='test-deployment-1', memory=1024, cpu=1),
+        DeploymentEntity(name='test-deployment-2', memory=1024, cpu=1),
+    ]
+
+    matcher = SAT(
+        deployments,
+        [ResourceEntity(name='test-node-1', memory=1024, cpu=2)]
+    )
+    matcher.match()
+
+    assert matcher.get_placement_errors() == deployments
+    assert matcher.get_resources()[0].get_deployments() == []
+
+
+def test_sat_solver_replica_classes():
+
+    deployments = [DeploymentEntity(name='test-deployment-{}'.format(i), memory=256, cpu=0.5)
+                   for i in range(40)]
+    deployments.append(DeploymentEntity(
+        name='test-deployment-large', memory=1024, cpu=2))
+
+    matcher = SAT(
+        deployments,
+        [ResourceEntity(name='test-node-{}'.format(i), memory=2048, cpu=4)
+         for i in range(6)]
+    )
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    # one count variable per class and node instead of one per deployment and node
+    assert matcher.model_stats[0]['assignments'] == 2 * 6
+    _placed = [d for r in matcher.get_resources() for d in r.get_deployments()]
+    assert sorted(d.name for d in _placed) == sorted(
+        d.name for d in deployments)
+    for resource in matcher.get_resources():
+        assert resource.get_idle_cpu() >= 0
+        assert resource.get_idle_memory() >= 0
+
+
+def test_sat_solver_search_limits():
+
+    matcher = SAT(
+        [DeploymentEntity(name='test-deployment', memory=256, cpu=0.5)],
+        [ResourceEntity(name='test-node', memory=1024, cpu=1)]
+    )
+    _set_options(matcher, [('max_time', 10), ('workers', 1), ('relative_gap', 0.05)])
+
+    solver = matcher._gen_cp_solver()
+    assert solver.parameters.max_time_in_seconds == 10
+    assert solver.parameters.num_search_workers == 1
+    assert solver.parameters.relative_gap_limit == 0.05
+
+    matcher.match()
+    assert not matcher.get_placement_errors()
+    assert matcher.model_stats[0]['status'] == 'OPTIMAL'
+
+
+def _labeled_instance():
+    deployments = []
+    resources = []
+    for zone in ['a', 'b', 'c']:
+        for i in range(4):
+            deployments.append(DeploymentEntity(name='test-deployment-{}-{}'.format(zone, i),
+                                                memory=512, cpu=1, labels={'zone': zone}))
+        for i in range(2):
+            resources.append(ResourceEntity(name='test-node-{}-{}'.format(zone, i),
+                                            memory=1024, cpu=2, labels={'zone': zone}))
+    # cannot be placed, zone d has only a single node for two deployments
+    deployments.append(DeploymentEntity(name='test-deployment-d-0',
+                                        memory=1024, cpu=2, labels={'zone': 'd'}))
+    deployments.append(DeploymentEntity(name='test-deployment-d-1',
+                                        memory=1024, cpu=2, labels={'zone': 'd'}))
+    resources.append(ResourceEntity(name='test-node-d-0',
+                                    memory=1024, cpu=2, labels={'zone': 'd'}))
+    return deployments, resources
+
+
+def test_split_components():
+    deployments, resources = _labeled_instance()
+    groups = [
+        ([deployments[0]], resources[0:2]),
+        ([deployments[4]], resources[2:4]),
+        ([deployments[8]], resources[1:3]),
+        ([deployments[12]], resources[6:7]),
+    ]
+
+    assert Solver.split_components(groups) == [[0, 1, 2], [3]]
+
+
+@pytest.mark.parametrize('solver', [Greedy, SAT])
+def test_parallel_matching(solver):
+
+    results = []
+    for parallel in ['off', 'processes']:
+        deployments, resources = _labeled_instance()
+        matcher = solver(deployments, resources)
+        _set_options(matcher, [('parallel', parallel)])
+        matcher.match()
+        _placements, _errors = _placements_of(matcher)
+        results.append((_placements, sorted(_errors)))
+
+    assert results[0] == results[1]
+    assert 'test-deployment-d-1' in results[1][1]
+
+
+def test_parallel_matching_workers(monkeypatch):
+    _workers = []
+
+    class _Executor(solver_module.ProcessPoolExecutor):
+        def __init__(self, max_workers=None):
+            _workers.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(solver_module, 'ProcessPoolExecutor', _Executor)
+    monkeypatch.setattr(solver_module.os, 'cpu_count', lambda: 2)
+
+    deployments, resources = _labeled_instance()
+    matcher = Greedy(deployments, resources)
+    _set_options(matcher, [('parallel', 'processes')])
+    matcher.match()
+    assert _workers == [2]
+
+    # a single cpu solves all components in place
+    monkeypatch.setattr(solver_module.os, 'cpu_count', lambda: 1)
+    matcher.reset_matching()
+    matcher.match()
+    assert _workers == [2]
+
+
+def test_solver_delta_diff():
+    deployments, resources = _random_instance(5, 10, 4)
+    new_deployments, new_resources = _random_instance(5, 10, 4)
+    new_deployments[2].cpu = new_deployments[2].cpu + 1
+    del new_deployments[3]
+    new_deployments.append(DeploymentEntity(name='test-deployment-new', memory=128, cpu=0.1))
+    new_resources[0].labels = {'zone': 'a'}
+
+    delta = SolverDelta.diff(resources, new_resources, deployments, new_deployments)
+
+    assert [d.name for d in delta.added_deployments] == ['test-deployment-new']
+    assert [d.name for d in delta.removed_deployments] == ['test-deployment-3']
+    assert delta.changed_deployments == [new_deployments[2]]
+    assert delta.changed_resources == [new_resources[0]]
+    assert not delta.added_resources and not delta.removed_resources
+    assert SolverDelta.diff(resources, resources, deployments, deployments).is_empty()
+
+
+@pytest.mark.parametrize('solver', [Greedy, SAT])
+def test_resolve_keeps_valid_placements(solver):
+    deployments, resources = _random_instance(7, 20, 10)
+    matcher = solver(deployments, resources)
+    if solver is SAT:
+        _set_options(matcher, [('workers', 1)])
+    matcher.match()
+    assert not matcher.get_placement_errors()
+
+    _before = {d.name: r.name for r in matcher.get_resources()
+               for d in r.get_deployments()}
+    _removed_resource = matcher.get_resources()[0]
+    _changed = DeploymentEntity(name=deployments[5].name, memory=deployments[5].memory,
+                                cpu=deployments[5].cpu)
+    delta = SolverDelta(
+        removed_resources=[_removed_resource],
+        added_resources=[ResourceEntity(name='test-node-new', memory=4096, cpu=4)],
+        removed_deployments=[deployments[6]],
+        changed_deployments=[_changed],
+        added_deployments=[DeploymentEntity(name='test-deployment-new', memory=128, cpu=0.1)])
+
+    pending = matcher.resolve(delta)
+
+    assert not matcher.get_placement_errors()
+    assert sorted(d.name for d in pending) == sorted(
+        [d.name for d in _removed_resource.get_deployments()] + ['test-deployment-new'])
+    _after = {d.name: r.name for r in matcher.get_resources()
+              for d in r.get_deployments()}
+    assert deployments[6].name not in _after
+    assert _after[_changed.name] == _before[_changed.name]
+    for name, resource in _before.items():
+        if resource != _removed_resource.name and name != deployments[6].name:
+            assert _after[name] == resource
+    assert _changed in matcher.get_deployment_entities()
+    assert all(r.get_idle_cpu() >= 0 and r.get_idle_memory() >= 0
+               for r in matcher.get_resources())
+
+
+def test_resolve_sat_hints():
+    deployments, resources = _labeled_instance()
+    matcher = SAT(deployments[:-2], resources)
+    _set_options(matcher, [('workers', 1)])
+    matcher.match()
+
+    # replaced node, its deployments are hinted to the new node with the same name
+    _resource = resources[0]
+    _placed = [d.name for d in _resource.get_deployments()]
+    _replaced = ResourceEntity(name=_resource.name, memory=2048, cpu=4, labels=_resource.labels)
+    pending = matcher.resolve(SolverDelta(removed_resources=[_resource],
+                                          added_resources=[_replaced]))
+
+    assert sorted(d.name for d in pending) == sorted(_placed)
+    assert not matcher.get_placement_errors()
+    assert matcher.model_stats[-1]['hints'] == len(_placed)
+    assert sorted(d.name for d in _replaced.get_deployments()) == sorted(_placed)
+
+
+def test_sat_solver_greedy_warm_start():
+    deployments, resources = _random_instance(11, 40, 16)
+    matcher = SAT(deployments, resources)
+    _set_options(matcher, [('warm_start', 'greedy'), ('workers', 1)])
+    matcher.match()
+
+    _greedy = Greedy(*_random_instance(11, 40, 16))
+    _greedy.match()
+
+    _stats = matcher.model_stats[0]
+    assert not matcher.get_placement_errors()
+    assert _stats['hints'] == 40 - len(_greedy.get_placement_errors())
+    assert _stats['warm_start_time'] is not None
+    assert _stats['time_to_first_feasible'] is not None
+
+
+@pytest.mark.parametrize('mode', ['lexicographic', 'weighted'])
+def test_sat_solver_min_idle_resources(mode):
+    deployments = [DeploymentEntity(name='test-deployment-{}'.format(i), memory=256, cpu=0.5)
+                   for i in range(4)]
+    resources = [
+        ResourceEntity(name='test-node-1', memory=2048, cpu=4),
+        ResourceEntity(name='test-node-2', memory=1024, cpu=2),
+        ResourceEntity(name='test-node-3', memory=1024, cpu=2),
+    ]
+    matcher = SAT(deployments, resources)
+    _set_options(matcher, [('target', 'min_idle_resources'), ('objective_mode', mode)])
+    matcher.match()
+
+    # all deployments fit on one of the small nodes, leaving the least idle resources
+    _used = [r.name for r in matcher.get_resources() if r.get_deployments()]
+    assert len(_used) == 1 and _used[0] != 'test-node-1'
+    assert matcher.model_stats[0]['status'] == 'OPTIMAL'
+    assert len(matcher.model_stats[0]['phases']) == (2 if mode == 'lexicographic' else 1)
+
+
+def test_sat_solver_max_idle_resources():
+    deployments = [DeploymentEntity(name='test-deployment-{}'.format(i), memory=256, cpu=0.5)
+                   for i in range(3)]
+    resources = [ResourceEntity(name='test-node-{}'.format(i), memory=1024, cpu=2)
+                 for i in range(3)]
+    matcher = SAT(deployments, resources)
+    _set_options(matcher, [('target', 'max_idle_resources')])
+    matcher.match()
+
+    # deployments are spread over all nodes
+    assert all(len(r.get_deployments()) == 1 for r in matcher.get_resources())
+
+
+def test_sat_solver_scaled_overcommit():
+    # the scaled cpu requests are truncated, all three deployments fit in the model
+    deployments = [DeploymentEntity(name='test-deployment-{}'.format(i), memory=100, cpu=0.3339)
+                   for i in range(3)]
+    resources = [ResourceEntity(name='test-node', memory=1000, cpu=1)]
+    matcher = SAT(deployments, resources)
+    matcher.match()
+
+    assert len(resources[0].get_deployments()) == 2
+    assert matcher.get_placement_errors() == [
+        d for d in deployments if d not in resources[0].get_deployments()]
+
+
+def _used_node_instance():
+    # the labeled group uses node b, which keeps the same idle resources as the empty node a
+    deployments = [DeploymentEntity(name='test-deployment-1', memory=100, cpu=1,
+                                    labels={'zone': 'b'}),
+                   DeploymentEntity(name='test-deployment-2', memory=100, cpu=1)]
+    resources = [ResourceEntity(name='test-node-a', memory=1000, cpu=4),
+                 ResourceEntity(name='test-node-b', memory=1100, cpu=5, labels={'zone': 'b'})]
+    return deployments, resources
+
+
+def test_sat_solver_min_idle_resources_used_node():
+    deployments, resources = _used_node_instance()
+    matcher = SAT(deployments, resources)
+    _set_options(matcher, [('target', 'min_idle_resources')])
+    matcher.match()
+
+    # the used node has as much idle resources as the empty one and has to be preferred
+    assert not resources[0].get_deployments()
+    assert len(resources[1].get_deployments()) == 2
+    assert all(s['status'] == 'OPTIMAL' for s in matcher.model_stats)
+
+
+def _fleet_instance():
+    deployments = [DeploymentEntity(name='test-deployment-{}'.format(i), memory=m, cpu=c)
+                   for i, (c, m) in enumerate([(1.5, 512), (1, 1024), (0.5, 1536), (1.5, 512),
+                                               (0.5, 512), (1, 512)])]
+    resources = [ResourceEntity(name='test-node-{}'.format(i), memory=2048, cpu=2)
+                 for i in range(6)]
+    return deployments, resources
+
+
+@pytest.mark.parametrize('fit', ['first_fit', 'best_fit'])
+def test_greedy_min_nodes(fit):
+    deployments, resources = _fleet_instance()
+    matcher = Greedy(deployments, resources)
+    _set_options(matcher, [('target', 'min_nodes'), ('fit', fit)])
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    # total demand needs at least 3 nodes, largest normalized workloads are packed first
+    assert sum(1 for r in matcher.get_resources() if r.get_deployments()) == 3
+
+
+def test_sat_solver_min_nodes():
+    deployments, resources = _fleet_instance()
+    matcher = SAT(deployments, resources)
+    _set_options(matcher, [('target', 'min_nodes')])
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    assert sum(1 for r in matcher.get_resources() if r.get_deployments()) == 3
+    assert matcher.model_stats[0]['status'] == 'OPTIMAL'
+
+
+def test_sat_solver_min_nodes_used_node():
+    deployments, resources = _used_node_instance()
+    matcher = SAT(deployments, resources)
+    _set_options(matcher, [('target', 'min_nodes')])
+    matcher.match()
+
+    # the node used by the labeled group takes the unlabeled deployment as well
+    assert sum(1 for r in matcher.get_resources() if r.get_deployments()) == 1
+    assert all(s['status'] == 'OPTIMAL' for s in matcher.model_stats)
+
+
+def _skewed_instance():
+    deployments = [DeploymentEntity(name='test-deployment-{}'.format(i), memory=m, cpu=c)
+                   for i, (c, m) in enumerate([(0.25, 1536), (0.5, 256), (1, 1536), (1.5, 256),
+                                               (0.25, 256)])]
+    resources = [ResourceEntity(name='test-node-{}'.format(i), memory=2048, cpu=2)
+                 for i in range(2)]
+    return deployments, resources
+
+
+@pytest.mark.parametrize('target,errors', [('cpu', 1), ('memory', 1), ('dot_product', 0),
+                                           ('l2_norm', 0), ('dominant_resource', 0)])
+def test_greedy_vector_targets(target, errors):
+    # sorting by a single attribute leaves no resource with enough of the other one
+    deployments, resources = _skewed_instance()
+    matcher = Greedy(deployments, resources)
+    _set_options(matcher, [('target', target)])
+    matcher.match()
+
+    assert len(matcher.get_placement_errors()) == errors
+
+
+def _annealing():
+    # plugins are loaded from their file, importing continuum_deployer.plugins.<name>
+    # would shadow the plugin loader
+    return continuum_deployer.plugins.plugin_manager.getPluginByName(
+        'Simulated Annealing', 'Solver').plugin_object
+
+
+def test_annealing_min_nodes():
+    deployments, resources = _random_instance(11, 40, 16)
+    greedy = Greedy(deployments, resources)
+    _set_options(greedy, [('target', 'min_nodes'), ('fit', 'best_fit')])
+    greedy.match()
+    _greedy_nodes = sum(1 for r in greedy.get_resources() if r.get_deployments())
+
+    deployments, resources = _random_instance(11, 40, 16)
+    matcher = _annealing()(deployments, resources)
+    _set_options(matcher, [('max_moves', 100000)])
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    assert sorted(d.name for r in resources for d in r.get_deployments()) == \
+        sorted(d.name for d in deployments)
+    for resource in resources:
+        assert resource.get_idle_cpu() >= 0 and resource.get_idle_memory() >= 0
+    assert sum(1 for r in resources if r.get_deployments()) <= _greedy_nodes
+    assert matcher.search_stats[0]['best_energy'] <= matcher.search_stats[0]['initial_energy']
+
+
+def test_annealing_balance():
+    deployments, resources = _fleet_instance()
+    matcher = _annealing()(deployments, resources)
+    _set_options(matcher, [('target', 'balance'), ('max_moves', 100000)])
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    for resource in matcher.get_resources():
+        assert len(resource.get_deployments()) == 1
+
+
+def test_hybrid_solver_groups():
+    deployments = [DeploymentEntity(name='test-loose-{}'.format(i), memory=256, cpu=0.5,
+                                    labels={'zone': 'a'}) for i in range(4)] + \
+        [DeploymentEntity(name='test-tight-{}'.format(i), memory=900, cpu=0.9,
+                          labels={'zone': 'b'}) for i in range(4)]
+    resources = [ResourceEntity(name='test-node-a-{}'.format(i), memory=4096, cpu=4,
+                                labels={'zone': 'a'}) for i in range(2)] + \
+        [ResourceEntity(name='test-node-b-{}'.format(i), memory=2048, cpu=2,
+                        labels={'zone': 'b'}) for i in range(2)]
+
+    matcher = Hybrid(deployments, resources)
+    matcher.match()
+
+    assert not matcher.get_placement_errors()
+    for resource in resources:
+        assert all(d.labels.items() <= resource.labels.items()
+                   for d in resource.get_deployments())
+    assert sorted((s['tightness'], s['solver']) for s in matcher.group_stats) == \
+        [(0.25, 'greedy'), (0.9, 'sat')]
+    assert len(matcher.model_stats) == 1
+
+
+def test_hybrid_solver_greedy_fallback():
+    deployments, resources = _skewed_instance()
+    matcher = Hybrid(deployments, resources)
+    _set_options(matcher, [('tightness', 1.0)])
+    matcher.match()
+
+    # Greedy fails on the skewed instance, its partial placement is reverted
+    assert not matcher.get_placement_errors()
+    assert sum(len(r.get_deployments()) for r in resources) == len(deployments)
+    assert [s['solver'] for s in matcher.group_stats] == ['sat']
@@ -19,3 +19,11 @@ def test_plugin_load_type_solver():
         assert issubclass(plugin.plugin_object, Solver)
         assert plugin.description == 'This is a demo solver'
         assert plugin.name == 'Demo Solver'
+
+
+def test_default_plugins_loaded():
+    pl = PluginLoader()
+    pl.load_plugins()
+
+    _solvers = {p.name: p.plugin_object for p in pl.plugin_manager.getPluginsOfCategory("Solver")}
+    assert issubclass(_solvers['Simulated Annealing'], Solver)
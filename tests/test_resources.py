@@ -0,0 +1,172 @@
+import copy
+import pickle
+
+import pytest
+
+from continuum_deployer.resources.deployment import DeploymentEntity
+from continuum_deployer.resources.label_index import LabelIndex
+from continuum_deployer.resources.resource_entity import ResourceEntity
+from continuum_deployer.resources.resources import Resources
+from continuum_deployer.solving.solver import Solver
+
+
+def test_usage_counters():
+    resource = ResourceEntity(name='test-node', memory=1024, cpu=2)
+
+    assert resource.add_deployment(
+        DeploymentEntity(name='test-deployment-1', memory=512, cpu=1.5))
+    assert resource.add_deployment(
+        DeploymentEntity(name='test-deployment-2', memory=256, cpu=0.5))
+
+    assert resource.get_used_cpu() == 2
+    assert resource.get_used_memory() == 768
+    assert resource.get_idle_cpu() == 0
+    assert resource.get_idle_memory() == 256
+
+    # cpu exhausted, memory would still fit
+    assert not resource.add_deployment(
+        DeploymentEntity(name='test-deployment-3', memory=1, cpu=0.1))
+    assert len(resource.get_deployments()) == 2
+
+
+def test_usage_counters_late_init():
+    # resources parser sets attributes after object creation
+    resource = ResourceEntity()
+    resource.cpu = 1
+    resource.memory = 512
+
+    assert resource.check_resources_fit(
+        DeploymentEntity(name='test-deployment', memory=512, cpu=1))
+    assert resource.get_idle_memory() == 512
+
+
+def test_remove_deployment():
+    resource = ResourceEntity(name='test-node', memory=1024, cpu=2)
+    deployment = DeploymentEntity(name='test-deployment-1', memory=1024, cpu=2)
+    other = DeploymentEntity(name='test-deployment-2', memory=1024, cpu=2)
+
+    assert resource.add_deployment(deployment)
+    assert not resource.check_resources_fit(other)
+
+    assert not resource.remove_deployment(other)
+    assert resource.remove_deployment(deployment)
+    assert resource.get_idle_cpu() == 2
+    assert resource.get_idle_memory() == 1024
+    assert resource.add_deployment(other)
+
+    small = DeploymentEntity(name='test-deployment-3', memory=256, cpu=0.5)
+    resource = ResourceEntity(name='test-node', memory=1024, cpu=2)
+    resource.add_deployment(small)
+    resource.add_deployment(DeploymentEntity(name='test-deployment-4', memory=512, cpu=1))
+    assert resource.remove_deployment(small)
+    assert (resource.get_used_cpu(), resource.get_used_memory()) == (1, 512)
+    assert (resource.get_idle_cpu(), resource.get_idle_memory()) == (1, 512)
+
+
+def test_clear_deployments():
+    resource = ResourceEntity(name='test-node', memory=1024, cpu=2)
+    resource.add_deployment(
+        DeploymentEntity(name='test-deployment', memory=1024, cpu=2))
+
+    resource.clear_deployments()
+
+    assert resource.get_deployments() == []
+    assert resource.get_used_cpu() == 0
+    assert resource.get_idle_memory() == 1024
+
+
+def _labeled_resources():
+    return [
+        ResourceEntity(name='test-node-1', memory=1024, cpu=1,
+                       labels={'zone': 'a', 'arch': 'arm'}),
+        ResourceEntity(name='test-node-2', memory=1024, cpu=1),
+        ResourceEntity(name='test-node-3', memory=1024, cpu=1,
+                       labels={'zone': 'b', 'arch': 'arm'}),
+        ResourceEntity(name='test-node-4', memory=1024, cpu=1,
+                       labels={'zone': 'a', 'arch': 'x86', 'tier': 'edge'}),
+    ]
+
+
+def test_slotted_entities():
+    deployment = DeploymentEntity(name='test-deployment', memory=512, cpu=1.5,
+                                  labels={'zone': 'a'}, replica=0)
+    resource = ResourceEntity(name='test-node', memory=1024, cpu=2)
+    resource.add_deployment(deployment)
+
+    for entity in [deployment, resource]:
+        assert not hasattr(entity, '__dict__')
+        with pytest.raises(AttributeError):
+            entity.unknown = True
+
+    assert copy.copy(deployment) == deployment
+    assert copy.deepcopy(resource) == resource
+    _resource = pickle.loads(pickle.dumps(resource))
+    assert _resource == resource
+    assert _resource.get_idle_cpu() == 0.5
+    assert ResourceEntity(name='test-node', memory=1024, cpu=2).get_used_cpu() == 0
+
+
+def test_label_index():
+    resources = _labeled_resources()
+    index = LabelIndex(resources)
+
+    def _names(labels):
+        return [r.name for r in index.get_resources(labels)]
+
+    assert _names({'zone': 'a'}) == ['test-node-1', 'test-node-4']
+    assert _names({'arch': 'arm'}) == ['test-node-1', 'test-node-3']
+    assert _names({'zone': 'a', 'arch': 'arm'}) == ['test-node-1']
+    assert _names({'zone': 'c'}) == []
+    assert _names({}) == ['test-node-1', 'test-node-3', 'test-node-4']
+
+    index.remove(resources[0])
+    assert _names({'zone': 'a'}) == ['test-node-4']
+
+    resources[3].labels = {'zone': 'b'}
+    index.update(resources[3])
+    assert _names({'zone': 'b'}) == ['test-node-3', 'test-node-4']
+    assert _names({'tier': 'edge'}) == []
+
+
+def test_label_index_matches_scan():
+    resources = _labeled_resources()
+    solver = Solver([], resources)
+
+    for labels in [{'zone': 'a'}, {'arch': 'arm', 'zone': 'b'}, {'tier': 'edge'}, {'foo': 'bar'}]:
+        assert solver._get_suitable_resources(resources, labels) == \
+            solver._get_suitable_resources(list(resources), labels)
+
+
+def test_resources_label_index():
+    resources = Resources()
+    resources.parse(open('./examples/resources/default.yaml', 'r'))
+    index = resources.get_label_index()
+
+    assert [r.name for r in index.get_resources({'cloud': 'public'})] == [
+        'node-3']
+
+    _node = resources.get_resources()[0]
+    resources.set_labels(_node, {'cloud': 'public'})
+    assert [r.name for r in index.get_resources({'cloud': 'public'})] == [
+        'node-1', 'node-3']
+
+    resources.remove_resource(_node)
+    assert len(resources.get_resources()) == 2
+    assert [r.name for r in index.get_resources({'cloud': 'public'})] == [
+        'node-3']
+
+
+def test_label_index_bind():
+    resources = _labeled_resources()
+    index = LabelIndex(resources)
+    index.remove(resources[1])
+
+    copies = [ResourceEntity(name=r.name, memory=r.memory, cpu=r.cpu, labels=r.labels)
+              for r in resources if r is not resources[1]]
+    bound = index.bind(copies)
+
+    _found = bound.get_resources({'zone': 'a'})
+    assert [r.name for r in _found] == ['test-node-1', 'test-node-4']
+    assert _found[0] is copies[0]
+    with pytest.raises(RuntimeError):
+        bound.add(resources[1])
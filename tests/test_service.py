@@ -0,0 +1,125 @@
+import http.client
+import json
+import threading
+
+import click
+import pytest
+
+from continuum_deployer.utils.placement_service import PlacementService
+
+
+@pytest.fixture
+def service():
+    service = PlacementService()
+    with open('./examples/resources/default.yaml') as file:
+        service.add_inventory('default', file.read())
+    return service
+
+
+@pytest.fixture
+def server(service):
+    server = service.create_server('127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    content = response.read().decode()
+    connection.close()
+    return response.status, content
+
+
+def test_service_place_keeps_inventory(service):
+    with open('./tests/yaml/deployments.yaml') as file:
+        deployments = file.read()
+
+    for _ in range(2):
+        results, _ = service.place({'deployment': deployments})
+        assert results['placement_errors'] == []
+
+    inventory = service.get_inventory('default')
+    assert all(not r.get_deployments() for r in inventory.resources.get_resources())
+
+
+def test_service_http(server):
+    with open('./tests/yaml/deployments.yaml') as file:
+        deployments = file.read()
+
+    status, content = _request(server, 'GET', '/health')
+    assert status == 200 and json.loads(content) == {'status': 'ok'}
+
+    requests = [json.dumps({'deployment': deployments, 'solver': s, 'config': c})
+                for s, c in (('0', []), ('1', ['max_time=10', 'workers=1']))] * 2
+    responses = [None] * len(requests)
+
+    def _place(i):
+        responses[i] = _request(server, 'POST', '/place', requests[i])
+
+    threads = [threading.Thread(target=_place, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for status, content in responses:
+        results = json.loads(content)
+        assert status == 200
+        assert results['placement_errors'] == []
+
+    status, content = _request(server, 'POST', '/place',
+                               json.dumps({'resources': 'unknown', 'deployment': deployments}))
+    assert status == 400 and 'unknown' in json.loads(content)['error']
+
+
+def test_service_http_inventory(server):
+    with open('./examples/resources/default.yaml') as file:
+        status, content = _request(server, 'PUT', '/resources/edge', file.read())
+    assert status == 200
+
+    status, content = _request(server, 'GET', '/resources')
+    assert sorted(i['name'] for i in json.loads(content)) == ['default', 'edge']
+
+    status, _ = _request(server, 'DELETE', '/resources/edge')
+    assert status == 200
+    status, _ = _request(server, 'DELETE', '/resources/edge')
+    assert status == 404
+
+
+def test_service_place_unnamed_deployment(server):
+    deployment = ('apiVersion: apps/v1\nkind: Deployment\nmetadata: {}\n'
+                  'spec:\n  template:\n    spec:\n      containers: []\n')
+
+    status, content = _request(server, 'POST', '/place',
+                               json.dumps({'deployment': deployment}))
+    assert status == 400 and 'No name' in json.loads(content)['error']
+
+    status, _ = _request(server, 'GET', '/health')
+    assert status == 200
+
+
+def test_service_place_deployment_path(service):
+    with pytest.raises(click.BadParameter):
+        service.place({'deployment_path': 'deployments.yaml', 'type': 'yaml'})
+
+    service.dsl_root = './tests/yaml'
+    results, _ = service.place({'deployment_path': 'deployments.yaml', 'type': 'yaml'})
+    assert results['placement_errors'] == []
+
+    for path in ['../../examples/resources/default.yaml', '/etc/passwd', ['deployments.yaml', '../yaml/../../setup.py']]:
+        with pytest.raises(click.BadParameter):
+            service.place({'deployment_path': path, 'type': 'yaml'})
+
+
+@pytest.mark.parametrize('request_fields', [{'solver': '-3'}, {'solver': 'x'}, {'solver_mode': '42'}])
+def test_service_place_invalid_solver(server, request_fields):
+    with open('./tests/yaml/deployments.yaml') as file:
+        request = dict(request_fields, deployment=file.read())
+
+    status, content = _request(server, 'POST', '/place', json.dumps(request))
+    assert status == 400 and 'Unknown solver' in json.loads(content)['error']